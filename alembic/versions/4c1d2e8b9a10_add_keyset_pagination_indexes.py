@@ -0,0 +1,28 @@
+"""Add keyset pagination indexes
+
+Revision ID: 4c1d2e8b9a10
+Revises: 90a7866faf0b
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d2e8b9a10'
+down_revision: Union[str, None] = '90a7866faf0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_client_date_id', 'orders', ['client_id_key', 'date', 'id_key'], unique=False)
+    op.create_index('ix_reviews_product_id_key', 'reviews', ['product_id', 'id_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reviews_product_id_key', table_name='reviews')
+    op.drop_index('ix_orders_client_date_id', table_name='orders')
@@ -0,0 +1,55 @@
+"""Add product_ratings aggregate table
+
+Revision ID: b5e7c9d0f213
+Revises: 8f3a6b2c1d47
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e7c9d0f213'
+down_revision: Union[str, None] = '8f3a6b2c1d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'product_ratings',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('count_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id_key'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+
+    # Backfill from existing reviews (same half-up buckets as ReviewRepository)
+    op.execute("""
+        INSERT INTO product_ratings
+            (product_id, review_count, rating_sum, count_1, count_2, count_3, count_4, count_5)
+        SELECT product_id,
+               count(*),
+               sum(rating),
+               sum(CASE WHEN rating < 1.5 THEN 1 ELSE 0 END),
+               sum(CASE WHEN rating >= 1.5 AND rating < 2.5 THEN 1 ELSE 0 END),
+               sum(CASE WHEN rating >= 2.5 AND rating < 3.5 THEN 1 ELSE 0 END),
+               sum(CASE WHEN rating >= 3.5 AND rating < 4.5 THEN 1 ELSE 0 END),
+               sum(CASE WHEN rating >= 4.5 THEN 1 ELSE 0 END)
+        FROM reviews
+        GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('product_ratings')
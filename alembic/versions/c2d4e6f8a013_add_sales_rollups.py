@@ -0,0 +1,69 @@
+"""Add daily sales rollup tables
+
+Revision ID: c2d4e6f8a013
+Revises: b5e7c9d0f213
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d4e6f8a013'
+down_revision: Union[str, None] = 'b5e7c9d0f213'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table(
+        'sales_daily_category',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'category_id')
+    )
+    op.create_index('ix_sales_daily_category_category_day', 'sales_daily_category', ['category_id', 'day'])
+    op.create_table(
+        'sales_daily_product',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_index('ix_sales_daily_product_product_day', 'sales_daily_product', ['product_id', 'day'])
+    op.create_table(
+        'analytics_refresh_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # The rollups are filled by the first refresh (full rebuild, no high-water mark yet)
+    op.create_index('ix_orders_updated_at', 'orders', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_updated_at', table_name='orders')
+    op.drop_table('analytics_refresh_state')
+    op.drop_index('ix_sales_daily_product_product_day', table_name='sales_daily_product')
+    op.drop_table('sales_daily_product')
+    op.drop_index('ix_sales_daily_category_category_day', table_name='sales_daily_category')
+    op.drop_table('sales_daily_category')
+    op.drop_table('sales_daily')
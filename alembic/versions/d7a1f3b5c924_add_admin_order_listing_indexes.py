@@ -0,0 +1,28 @@
+"""Add admin order listing indexes
+
+Revision ID: d7a1f3b5c924
+Revises: c2d4e6f8a013
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a1f3b5c924'
+down_revision: Union[str, None] = 'c2d4e6f8a013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination over (date, id_key) DESC with and without a status filter
+    op.create_index('ix_orders_status_date_id', 'orders', ['status', 'date', 'id_key'])
+    op.create_index('ix_orders_date_id', 'orders', ['date', 'id_key'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_date_id', table_name='orders')
+    op.drop_index('ix_orders_status_date_id', table_name='orders')
@@ -0,0 +1,32 @@
+"""Add bill sequences
+
+Revision ID: f1c5a9e3d702
+Revises: e3b8d2f6a417
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c5a9e3d702'
+down_revision: Union[str, None] = 'e3b8d2f6a417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-day counter behind FACT-YYYYMMDD-NNNNNN bill numbers
+    op.create_table(
+        'bill_sequences',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('last_number', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bill_sequences')
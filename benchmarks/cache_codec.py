@@ -0,0 +1,114 @@
+"""
+Cache codec benchmark
+
+Compares how a cached 100-product page is stored in Redis:
+
+- legacy: JSON text (what CacheService stored before the binary codec)
+- orjson / msgpack, each uncompressed and with zlib (and lz4 if installed)
+  above the configured threshold, as written by utils/cache_codec.py
+
+For every case it reports the encoded size, the memory Redis reports for the
+key (MEMORY USAGE, when a Redis server is reachable) and the encode/decode
+time per page.
+
+Usage:
+    python benchmarks/cache_codec.py [--products 100] [--iterations 500]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: F401  (import order: models before config.database)
+from config import redis_config
+from config.constants import CacheConfig
+from utils.cache_codec import COMPRESSORS, SERIALIZERS, CacheCodec
+
+WORDS = (
+    "algodón remera talle color negro blanco azul pantalón jean campera abrigo "
+    "liviano invierno verano lavable secado rápido costuras reforzadas bolsillos "
+    "cierre metálico suela goma cuero sintético garantía envío gratis stock "
+    "disponible medidas ancho largo peso material importado nacional oferta"
+).split()
+
+
+def build_page(count: int):
+    """Page shaped like ProductService.get_all() output (model_dump of ProductSchema)"""
+    rng = random.Random(42)
+    now = datetime(2024, 1, 31, 12, 0, 0)
+    return [
+        {
+            "id_key": i,
+            "name": " ".join(rng.choices(WORDS, k=3)).capitalize(),
+            "description": " ".join(rng.choices(WORDS, k=60)),
+            "price": round(rng.uniform(500, 50000), 2),
+            "stock": rng.randint(0, 500),
+            "category_id": rng.randint(1, 12),
+            "sku": f"SKU-{i:06d}",
+            "image_url": f"https://cdn.example.com/products/{i}.jpg",
+            "created_at": (now - timedelta(days=i)).isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def timeit(fn, arg, iterations: int) -> float:
+    """Microseconds per call"""
+    fn(arg)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def memory_usage(client, payload: bytes):
+    """Bytes Redis uses for a key holding the payload, or None without Redis"""
+    if client is None:
+        return None
+    key = "bench:cache_codec"
+    client.set(key, payload)
+    try:
+        return client.memory_usage(key, samples=0)
+    finally:
+        client.delete(key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    page = build_page(args.products)
+    client = redis_config.get_binary_redis_client()
+
+    cases = [("legacy json text", lambda value: json.dumps(value).encode(), json.loads)]
+    for serializer in (entry[0] for entry in SERIALIZERS.values()):
+        for compression in (entry[0] for entry in COMPRESSORS.values()):
+            codec = CacheCodec(serializer, compression)
+            cases.append((codec.name, codec.encode, codec.decode))
+
+    print(f"{args.products}-product page, compression threshold {CacheConfig.COMPRESS_THRESHOLD} bytes"
+          f"{'' if client is not None else ' (Redis not reachable: no MEMORY USAGE)'}")
+    print(f"{'codec':<20}{'bytes':>10}{'redis mem':>12}{'ratio':>8}{'enc us':>10}{'dec us':>10}")
+    baseline = None
+    for name, encode, decode in cases:
+        encoded = encode(page)
+        baseline = len(encoded) if baseline is None else baseline
+        memory = memory_usage(client, encoded)
+        print(
+            f"{name:<20}{len(encoded):>10}{memory if memory is not None else '-':>12}"
+            f"{len(encoded) / baseline:>8.2f}"
+            f"{timeit(encode, page, args.iterations):>10.1f}"
+            f"{timeit(decode, encoded, args.iterations):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+JSON encoding microbenchmark
+
+Compares the cost of turning a 100-product page into response bytes:
+
+- legacy: per-row dict building with the float() price conversion loop that
+  product_controller used, then FastAPI's jsonable_encoder and stdlib json
+  (what JSONResponse.render does)
+- default response class: jsonable_encoder, then AppJSONResponse (orjson),
+  which is what routes returning plain dicts now go through
+- direct orjson: rows returned as-is and encoded once by AppJSONResponse,
+  as the conditional-cache catalog routes do
+
+It also times the CacheService codec (stdlib json vs orjson) on the same page.
+
+Usage:
+    python benchmarks/json_encoding.py [--products 100] [--iterations 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from utils import json_codec
+from utils.json_codec import AppJSONResponse
+
+COLUMNS = (
+    "id_key", "name", "description", "price", "stock", "category_id", "sku",
+    "image_url", "created_at", "updated_at", "average_rating", "review_count",
+)
+
+
+def build_rows(count: int):
+    """Rows shaped like the SELECT of GET /products (price as NUMERIC)"""
+    now = datetime(2024, 1, 31, 12, 0, 0)
+    return [
+        (
+            i,
+            f"Producto {i}",
+            "Descripción larga del producto con detalles de materiales y talles. " * 4,
+            Decimal("1999.90") + i,
+            10 + i,
+            i % 7,
+            f"SKU-{i:06d}",
+            f"https://cdn.example.com/products/{i}.jpg",
+            now - timedelta(days=i),
+            now,
+            4.5,
+            i * 3,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy(rows) -> bytes:
+    products = []
+    for row in rows:
+        product_dict = {}
+        for i, column in enumerate(COLUMNS):
+            value = row[i]
+            if column == "price" and value is not None:
+                try:
+                    value = float(value)
+                except Exception:
+                    value = 0.0
+            product_dict[column] = value
+        products.append(product_dict)
+    content = jsonable_encoder({"success": True, "products": products, "count": len(products)})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def default_response_class(rows) -> bytes:
+    products = [dict(zip(COLUMNS, row)) for row in rows]
+    content = jsonable_encoder({"success": True, "products": products, "count": len(products)})
+    return AppJSONResponse(content).body
+
+
+def direct_orjson(rows) -> bytes:
+    products = [dict(zip(COLUMNS, row)) for row in rows]
+    return AppJSONResponse({"success": True, "products": products, "count": len(products)}).body
+
+
+def timeit(fn, arg, iterations: int) -> float:
+    """Microseconds per call"""
+    fn(arg)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = build_rows(args.products)
+
+    print(f"Response encoding, {args.products}-product page")
+    print(f"{'case':<32}{'us/page':>10}{'speedup':>10}{'bytes':>10}")
+    baseline = None
+    for name, fn in (
+        ("legacy (loop + stdlib json)", legacy),
+        ("jsonable_encoder + orjson", default_response_class),
+        ("direct orjson", direct_orjson),
+    ):
+        per_call = timeit(fn, rows, args.iterations)
+        baseline = per_call if baseline is None else baseline
+        print(f"{name:<32}{per_call:>10.1f}{baseline / per_call:>9.1f}x{len(fn(rows)):>10}")
+
+    # CacheService stores the service layer's dicts (datetimes already ISO strings)
+    page = jsonable_encoder([dict(zip(COLUMNS, row)) for row in rows])
+    encoded_json = json.dumps(page)
+    encoded_orjson = json_codec.dumps(page)
+
+    print(f"\nCache codec, {args.products}-product page")
+    print(f"{'case':<32}{'us/op':>10}")
+    for name, fn, arg in (
+        ("json.dumps", json.dumps, page),
+        ("orjson dumps", json_codec.dumps, page),
+        ("json.loads", json.loads, encoded_json),
+        ("orjson loads", json_codec.loads, encoded_orjson),
+    ):
+        print(f"{name:<32}{timeit(fn, arg, args.iterations):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
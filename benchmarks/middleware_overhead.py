@@ -0,0 +1,182 @@
+"""
+Middleware overhead microbenchmark
+
+Measures the per-request cost of RequestIDMiddleware and RateLimiterMiddleware
+by driving the ASGI app in-process (no server, no sockets), and compares it
+with the previous BaseHTTPMiddleware-based implementations reproduced below.
+
+Usage:
+    python benchmarks/middleware_overhead.py [--requests 5000]
+
+The rate limiter uses the configured Redis (REDIS_URL / REDIS_HOST). If Redis
+is not reachable, fakeredis is used when installed; otherwise the rate
+limiter cases are skipped.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import models  # noqa: F401  (import order: models before config.database)
+from config import redis_config
+from middleware.rate_limiter import RateLimiterMiddleware
+from middleware.request_id_middleware import RequestIDMiddleware, request_id_var
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    """Previous implementation (BaseHTTPMiddleware), kept for comparison"""
+
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get('X-Request-ID') or str(uuid.uuid4())
+        request.state.request_id = request_id
+        request_id_var.set(request_id)
+        start_time = time.time()
+        try:
+            response = await call_next(request)
+            duration_ms = round((time.time() - start_time) * 1000, 2)
+            response.headers['X-Request-ID'] = request_id
+            response.headers['X-Response-Time'] = f"{duration_ms}ms"
+            return response
+        finally:
+            request_id_var.set(None)
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    """Previous implementation: pipeline INCR/EXPIRE, then a separate GET"""
+
+    def __init__(self, app, calls: int, period: int, redis_client):
+        super().__init__(app)
+        self.calls = calls
+        self.period = period
+        self.redis_client = redis_client
+
+    async def dispatch(self, request, call_next):
+        key = f"rate_limit:{request.client.host if request.client else 'unknown'}"
+        pipe = self.redis_client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, self.period)
+        pipe.execute()
+        response = await call_next(request)
+        current = self.redis_client.get(key)
+        remaining = self.calls if current is None else max(0, self.calls - int(current))
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        return response
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def build_app(*middleware_factories) -> Starlette:
+    app = Starlette(routes=[Route("/ping", endpoint)])
+    for factory in middleware_factories:
+        cls, *options = factory
+        app.add_middleware(cls, **(options[0] if options else {}))
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    """Send `requests` GET /ping through the app and return microseconds per request"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def send(message):
+        pass
+
+    async def request_once():
+        body_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            # Like a server: the body once, then block until the client goes away
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        await app(dict(scope), receive, send)
+
+    # Warm up (route compilation, middleware stack build)
+    for _ in range(min(200, requests)):
+        await request_once()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request_once()
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def resolve_redis():
+    client = redis_config.get_redis_client()
+    if client is not None:
+        return client, "redis"
+    try:
+        import fakeredis
+    except ImportError:
+        return None, None
+    return fakeredis.FakeRedis(decode_responses=True), "fakeredis"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    calls = args.requests * 10  # never actually limit during the benchmark
+    os.environ["RATE_LIMIT_CALLS"] = str(calls)
+
+    cases = [
+        ("baseline (no middleware)", build_app()),
+        ("request-id legacy", build_app((LegacyRequestIDMiddleware,))),
+        ("request-id asgi", build_app((RequestIDMiddleware,))),
+    ]
+
+    redis_client, backend = resolve_redis()
+    if redis_client is not None:
+        redis_config.redis_client = redis_client
+        cases += [
+            (f"rate-limit legacy ({backend})", build_app(
+                (LegacyRateLimiterMiddleware, {"calls": calls, "period": 60, "redis_client": redis_client}))),
+            (f"rate-limit asgi ({backend})", build_app(
+                (RateLimiterMiddleware, {"calls": calls, "period": 60}))),
+        ]
+    else:
+        print("Redis not available and fakeredis not installed: skipping rate limiter cases")
+
+    baseline = None
+    print(f"{'case':<36}{'us/req':>10}{'overhead':>12}")
+    for name, app in cases:
+        if redis_client is not None:
+            redis_client.flushdb()
+        per_request = asyncio.run(drive(app, args.requests))
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<36}{per_request:>10.1f}{per_request - baseline:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Sync vs asyncio Redis client throughput benchmark
+
+Drives an in-process ASGI app with concurrent requests. Each request does
+what a catalog read does on the hot path: one rate limit check plus a few
+cache reads and a cache write. The two cases differ only in the client:
+
+- sync: RateLimitEngine.hit() and CacheService.get()/set() called from the
+  async handler, as before (each round-trip blocks the event loop)
+- async: ahit() and aget()/aset() over the redis.asyncio pool, so other
+  requests make progress while one waits on Redis
+
+Usage:
+    python benchmarks/redis_clients.py [--requests 5000] [--concurrency 50] [--reads 3]
+
+Needs a reachable Redis (REDIS_HOST / REDIS_PORT). The gap grows with the
+round-trip time, so run it against the deployment's Redis rather than a
+local one to see realistic numbers. With fakeredis (no sockets, no
+latency) both cases measure only client overhead, so it is not used here.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every read must reach Redis: the L1 cache would hide the client difference
+os.environ.setdefault("CACHE_L1_ENABLED", "false")
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+import models  # noqa: F401  (import order: models before config.database)
+from config import redis_config
+from middleware.rate_limit_engine import RateLimitEngine, RateLimitPolicy
+from services.cache_service import CacheService
+
+KEYS = [f"bench:redis_clients:{i}" for i in range(16)]
+
+
+def build_app(reads: int, requests: int) -> Starlette:
+    cache = CacheService()
+    engine = RateLimitEngine(key_prefix="bench:rate_limit")
+    policy = RateLimitPolicy(name="bench", calls=requests * 10, period=60)
+
+    for key in KEYS:
+        cache.set(key, {"id": key, "payload": "x" * 512}, ttl=300)
+
+    async def sync_endpoint(request):
+        engine.hit(policy, "127.0.0.1")
+        for i in range(reads):
+            cache.get(KEYS[i % len(KEYS)])
+        cache.set("bench:redis_clients:last", {"path": "sync"}, ttl=60)
+        return PlainTextResponse("ok")
+
+    async def async_endpoint(request):
+        await engine.ahit(policy, "127.0.0.1")
+        for i in range(reads):
+            await cache.aget(KEYS[i % len(KEYS)])
+        await cache.aset("bench:redis_clients:last", {"path": "async"}, ttl=60)
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[Route("/sync", sync_endpoint), Route("/async", async_endpoint)])
+
+
+async def drive(app, path: str, requests: int, concurrency: int) -> float:
+    """Send `requests` GET `path` from `concurrency` workers and return requests per second"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def send(message):
+        pass
+
+    async def request_once():
+        body_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        await app(dict(scope), receive, send)
+
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request_once()
+
+    # Warm up (connection pool, script registration)
+    for _ in range(min(100, requests)):
+        await request_once()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    app = build_app(args.reads, args.requests)
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, "
+          f"1 rate limit check + {args.reads} reads + 1 write per request")
+    print(f"{'client':<12}{'req/s':>10}{'speedup':>10}")
+    baseline = None
+    for name, path in (("sync", "/sync"), ("asyncio", "/async")):
+        throughput = await drive(app, path, args.requests, args.concurrency)
+        baseline = throughput if baseline is None else baseline
+        print(f"{name:<12}{throughput:>10.0f}{throughput / baseline:>9.1f}x")
+
+    await redis_config.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if redis_config.get_redis_client() is None or redis_config.get_async_redis_client() is None:
+        print("Redis not reachable (REDIS_HOST / REDIS_PORT): nothing to compare")
+        return
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ try:
         engine,
         SessionLocal,
         get_db,
+        AsyncSessionLocal,
+        get_async_db,
+        get_pool_stats,
         create_tables,
         check_connection,
         initialize_models,
@@ -34,6 +37,9 @@ __all__ = [
     'engine',
     'SessionLocal', 
     'get_db',
+    'AsyncSessionLocal',
+    'get_async_db',
+    'get_pool_stats',
     'create_tables',
     'check_connection',
     'initialize_models',
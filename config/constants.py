@@ -84,6 +84,15 @@ class DatabaseConfig:
     DEFAULT_POOL_TIMEOUT = 10  # seconds (fail fast for high concurrency)
     DEFAULT_POOL_RECYCLE = 3600  # 1 hour
 
+    # Engine profile: "pooled", "pgbouncer-transaction" or "nullpool"
+    ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "pooled").strip().lower()
+    POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+    MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(DEFAULT_MAX_OVERFLOW)))
+    POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", str(DEFAULT_POOL_TIMEOUT)))
+    POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", str(DEFAULT_POOL_RECYCLE)))
+    SSLMODE = os.getenv("DB_SSLMODE", "require")
+    CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
 # Pagination-related constants
 class PaginationConfig:
     """Pagination-related constants"""
@@ -101,6 +110,103 @@ class CacheConfig:
     PRODUCT_ITEM_TTL = 300  # 5 minutes
     CATEGORY_LIST_TTL = 3600  # 1 hour (rarely changes)
     CATEGORY_ITEM_TTL = 3600  # 1 hour
+    # In-process L1 cache (in front of Redis, or alone when Redis is down)
+    L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "true").lower() == "true"
+    L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2048"))
+    L1_TTL = int(os.getenv("CACHE_L1_TTL", "30"))  # cap while Redis is the source of truth
+    INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+    # Tag generations (O(1) invalidation of groups of keys)
+    TAG_KEY_PREFIX = os.getenv("CACHE_TAG_KEY_PREFIX", "cache:tag")
+    TAG_REFRESH_INTERVAL = int(os.getenv("CACHE_TAG_REFRESH_INTERVAL", "30"))  # re-read mirrored generations
+    # Authenticated principal (client loaded from a JWT) cache
+    PRINCIPAL_TTL = int(os.getenv("AUTH_PRINCIPAL_TTL", "60"))
+    # Stale-while-revalidate for get_or_set: entries stay servable STALE_TTL
+    # seconds past their (jittered) TTL while one caller refreshes them
+    STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "60"))
+    TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))  # +/- fraction of the TTL
+    EARLY_RECOMPUTE_BETA = float(os.getenv("CACHE_EARLY_RECOMPUTE_BETA", "1.0"))  # 0 disables
+    # Background stale-while-revalidate refreshes (sync get_or_set)
+    REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+    REFRESH_MAX_PENDING = int(os.getenv("CACHE_REFRESH_MAX_PENDING", "64"))  # queued + running
+    # Misses wait this long for a concurrent computation of the same key
+    MISS_WAIT = float(os.getenv("CACHE_MISS_WAIT", "0.5"))  # seconds, 0 disables
+    MISS_POLL_INTERVAL = 0.05  # seconds between cache reads while another worker computes
+    # Binary entry codec (utils/cache_codec.py)
+    CODEC = os.getenv("CACHE_CODEC", "orjson")  # orjson | msgpack
+    COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")  # zlib | lz4 | none
+    COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))  # bytes
+    COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", "1"))  # favour speed
+
+# HTTP conditional caching (ETag / If-None-Match) for public catalog reads
+class HttpCacheConfig:
+    """ETag validators and Cache-Control policies for catalog endpoints"""
+    ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    VALIDATOR_TTL = int(os.getenv("HTTP_CACHE_VALIDATOR_TTL", "120"))  # cached ETag lifetime
+    KEY_PREFIX = "http:etag"
+    # Cache-Control max-age (seconds) browsers and nginx may serve without revalidating
+    PRODUCT_LIST_MAX_AGE = int(os.getenv("HTTP_CACHE_PRODUCT_LIST_MAX_AGE", "30"))
+    PRODUCT_ITEM_MAX_AGE = int(os.getenv("HTTP_CACHE_PRODUCT_ITEM_MAX_AGE", "60"))
+    REVIEWS_MAX_AGE = int(os.getenv("HTTP_CACHE_REVIEWS_MAX_AGE", "60"))
+
+# Per-request SQL instrumentation
+class QueryStatsConfig:
+    """Request-scoped SQL query collector and N+1 detection"""
+    ENABLED = os.getenv("SQL_STATS_ENABLED", "true").lower() == "true"
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))  # same statement per request
+    MAX_OFFENDERS = int(os.getenv("SQL_STATS_MAX_OFFENDERS", "200"))  # fingerprints kept for the report
+    STATEMENT_MAX_LENGTH = 300  # normalized SQL shown in logs and reports
+
+# Password hashing executor constants
+class PasswordHashConfig:
+    """Password hashing (PBKDF2) executor configuration"""
+    ITERATIONS = 100000
+    WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))  # waiting jobs before 429
+    RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))  # seconds
+
+# Rate limiting constants
+class RateLimitConfig:
+    """Rate limiting engine configuration"""
+    ENABLED = RATE_LIMIT_ENABLED
+    DEFAULT_CALLS = int(os.getenv("RATE_LIMIT_CALLS", str(RATE_LIMIT_REQUESTS)))
+    DEFAULT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", str(RATE_LIMIT_PERIOD)))
+    KEY_PREFIX = os.getenv("RATE_LIMIT_KEY_PREFIX", "rate_limit")
+    # Reverse proxies in front of the app that append to X-Forwarded-For
+    # (Render: 1). 0 ignores the header and limits by the socket peer.
+    TRUSTED_PROXY_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "1"))
+    # Per-process fallback (used while Redis is unavailable)
+    LOCAL_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_LOCAL_MAX_BUCKETS", "10000"))
+    # Per-route policies: "METHOD /path-prefix=calls/period", comma separated
+    ROUTE_POLICIES = os.getenv(
+        "RATE_LIMIT_ROUTES",
+        "POST /api/v1/orders=10/60,"
+        "POST /api/v1/clients=5/60,"
+        "POST /api/v1/reviews=3/60,"
+        "GET /api/v1/products/search=30/60,"
+        "POST /api/v1/auth/login=10/60,"
+        "POST /api/v1/auth/register=5/60"
+    )
+
+# Sales analytics rollups
+class AnalyticsConfig:
+    """Sales analytics rollup configuration"""
+    # Background incremental refresh period (per worker, see run_refresh_loop)
+    REFRESH_INTERVAL = int(os.getenv("ANALYTICS_REFRESH_INTERVAL", "60"))
+    # Re-scan orders updated this many seconds before the high-water mark, so
+    # transactions that committed late with an older updated_at are not missed
+    REFRESH_OVERLAP = int(os.getenv("ANALYTICS_REFRESH_OVERLAP", "300"))
+    MAX_RANGE_DAYS = int(os.getenv("ANALYTICS_MAX_RANGE_DAYS", "366"))
+    TOP_PRODUCTS_LIMIT = 10
+
+# Idempotency-Key support
+class IdempotencyConfig:
+    """Idempotency key store configuration"""
+    KEY_PREFIX = os.getenv("IDEMPOTENCY_KEY_PREFIX", "idempotency")
+    TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))  # keep first responses 24 hours
+    LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))  # in-flight claim lifetime
+    WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10"))  # seconds a duplicate waits
+    POLL_INTERVAL = 0.1
+    MAX_KEY_LENGTH = 255
 
 # Validation-related constants
 class ValidationConfig:
@@ -2,9 +2,13 @@ import os
 import logging
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 from models.base_model import Base  
+from config.db_pool import (
+    async_database_url, async_pool_stats, engine_options, pool_stats, resolve_profile
+)
+from config.query_stats import query_collector
 
 load_dotenv()
 
@@ -20,16 +24,12 @@ if database_url.startswith("postgres://"):
 
 logger.info(f"🔗 Conectando a la base de datos: {database_url[:50]}...")
 
-engine = create_engine(
-    database_url,
-    echo=False,
-    poolclass=NullPool,
-    pool_pre_ping=True,
-    connect_args={
-        "sslmode": "require",
-        "connect_timeout": 10,
-    }
-)
+engine_profile = resolve_profile()
+logger.info(f"🏊 Perfil de engine: {engine_profile}")
+
+engine = create_engine(database_url, **engine_options(engine_profile, database_url))
+pool_stats.attach(engine.pool)
+query_collector.attach(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -45,6 +45,56 @@ def get_db():
     finally:
         db.close()
 
+# Engine async (asyncpg): se crea bajo demanda para no exigir el driver
+# a los procesos que solo usan la sesión síncrona (alembic, scripts).
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+def get_async_engine() -> AsyncEngine:
+    """Devuelve (creándolo si hace falta) el engine async compartido."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is None:
+        url = os.getenv("ASYNC_DATABASE_URL", "").strip() or async_database_url(database_url, engine_profile)
+        _async_engine = create_async_engine(
+            url, **engine_options(engine_profile, database_url, asynchronous=True)
+        )
+        async_pool_stats.attach(_async_engine.sync_engine.pool)
+        query_collector.attach(_async_engine.sync_engine)
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        logger.info("⚡ Engine async inicializado")
+
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Crea una nueva AsyncSession ligada al engine async."""
+    get_async_engine()
+    return _async_session_factory()
+
+async def get_async_db():
+    """Dependency para obtener una sesión async de la base de datos."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    """Cierra las conexiones del engine async (shutdown de la app)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+def get_pool_stats() -> dict:
+    """Estadísticas del pool de conexiones (checkouts, overflow, espera)."""
+    stats = pool_stats.snapshot(engine.pool, profile=engine_profile)
+    if _async_engine is not None:
+        stats["async"] = async_pool_stats.snapshot(_async_engine.sync_engine.pool, profile=engine_profile)
+    return stats
+
 def initialize_models():
     try:
         from models import (
@@ -79,6 +129,27 @@ def create_tables():
 
         Base.metadata.create_all(bind=engine)
 
+        # Columna tsvector + índice GIN para la búsqueda de productos
+        from services.product_search_service import ensure_search_schema
+        ensure_search_schema(engine)
+
+        # Índice de orders.updated_at para el refresco incremental de analytics
+        from services.analytics_service import ensure_analytics_schema
+        ensure_analytics_schema(engine)
+
+        # Agregados de calificaciones: se reconstruyen si la tabla es nueva
+        from repositories.review_repository import ReviewRepository
+        with SessionLocal() as session:
+            rebuilt = ReviewRepository(session).backfill_rating_aggregates()
+            if rebuilt:
+                logger.info(f"⭐ Agregados de calificaciones reconstruidos para {rebuilt} productos")
+
+        # Claves de idempotencia vencidas (respaldo en base de datos de Redis)
+        from services.idempotency_service import idempotency_store
+        purged = idempotency_store.purge_expired()
+        if purged:
+            logger.info(f"🧹 {purged} claves de idempotencia vencidas eliminadas")
+
         inspector = inspect(engine)
         created_tables = inspector.get_table_names()
         logger.info(f"✅ Tablas creadas correctamente: {created_tables}")
@@ -112,6 +183,11 @@ __all__ = [
     'engine',
     'SessionLocal',
     'get_db',
+    'AsyncSessionLocal',
+    'get_async_db',
+    'get_async_engine',
+    'dispose_async_engine',
+    'get_pool_stats',
     'create_tables',
     'check_connection',
     'initialize_models',
@@ -0,0 +1,283 @@
+"""
+Database Engine Profiles
+
+Builds SQLAlchemy engine options for the supported connection strategies and
+collects pool statistics so the pool can be sized from real traffic.
+
+Profiles (selected with DB_ENGINE_PROFILE):
+- pooled: persistent QueuePool sized by DB_POOL_SIZE / DB_MAX_OVERFLOW.
+  Connections (and their TLS handshake) are reused across requests.
+- pgbouncer-transaction: small QueuePool without overflow in front of a
+  PgBouncer running in transaction mode. PgBouncer owns the real server
+  connections, so the app only keeps cheap client connections warm.
+- nullpool: opens and closes a connection per checkout (legacy behaviour).
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from config.constants import DatabaseConfig
+
+PROFILE_POOLED = "pooled"
+PROFILE_PGBOUNCER = "pgbouncer-transaction"
+PROFILE_NULLPOOL = "nullpool"
+
+ENGINE_PROFILES = (PROFILE_POOLED, PROFILE_PGBOUNCER, PROFILE_NULLPOOL)
+
+
+class PoolStats:
+    """
+    Thread-safe counters for connection pool activity
+
+    Tracks connects, checkouts, checkins, invalidations, checkout timeouts
+    and the time callers spend waiting for a connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters"""
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.peak_checked_out = 0
+            self._checked_out = 0
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._checked_out += 1
+            if self._checked_out > self.peak_checked_out:
+                self.peak_checked_out = self._checked_out
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self._checked_out = max(0, self._checked_out - 1)
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def attach(self, pool: Pool) -> None:
+        """
+        Register pool event listeners
+
+        Args:
+            pool: SQLAlchemy pool to observe
+        """
+        event.listen(pool, "connect", lambda *args: self.record_connect())
+        event.listen(pool, "checkout", lambda *args: self.record_checkout())
+        event.listen(pool, "checkin", lambda *args: self.record_checkin())
+        event.listen(pool, "invalidate", lambda *args: self.record_invalidate())
+
+    def snapshot(self, pool: Optional[Pool] = None, profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a serializable view of the counters
+
+        Args:
+            pool: Optional pool to read live size/overflow figures from
+            profile: Engine profile name to include in the report
+
+        Returns:
+            Dictionary with pool statistics
+        """
+        with self._lock:
+            avg_wait = self.wait_total / self.wait_count if self.wait_count else 0.0
+            stats = {
+                "profile": profile,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(avg_wait * 1000, 3),
+                    "max_ms": round(self.wait_max * 1000, 3),
+                    "total_ms": round(self.wait_total * 1000, 3),
+                },
+            }
+
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        elif pool is not None:
+            stats["pool_class"] = type(pool).__name__
+
+        return stats
+
+
+# One sync and one async engine per process, so module-level collectors are enough
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class _WaitTimingMixin:
+    """Measure how long callers block inside the pool before getting a connection"""
+
+    stats: PoolStats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool that records checkout wait time"""
+
+
+class InstrumentedNullPool(_WaitTimingMixin, NullPool):
+    """NullPool that records connect time as wait time"""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """Async-adapted QueuePool that records checkout wait time"""
+
+    stats = async_pool_stats
+
+
+class InstrumentedAsyncNullPool(_WaitTimingMixin, NullPool):
+    """NullPool for the async engine that records connect time as wait time"""
+
+    stats = async_pool_stats
+
+
+def resolve_profile(profile: Optional[str] = None) -> str:
+    """
+    Normalize the configured engine profile
+
+    Args:
+        profile: Profile name (default: DB_ENGINE_PROFILE)
+
+    Returns:
+        A valid profile name
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    profile = (profile or DatabaseConfig.ENGINE_PROFILE).strip().lower()
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown DB_ENGINE_PROFILE '{profile}'. "
+            f"Expected one of: {', '.join(ENGINE_PROFILES)}"
+        )
+    return profile
+
+
+def async_database_url(database_url: str, profile: str) -> str:
+    """
+    Derive the async driver URL from the sync DATABASE_URL
+
+    Args:
+        database_url: Sync database URL (postgresql:// or sqlite://)
+        profile: Engine profile name
+
+    Returns:
+        URL using asyncpg (PostgreSQL) or aiosqlite (SQLite)
+    """
+    if database_url.startswith("postgresql"):
+        url = make_url(database_url)
+        # asyncpg takes TLS settings through connect_args, not the libpq query string
+        query = {k: v for k, v in url.query.items() if k != "sslmode"}
+        if profile == PROFILE_PGBOUNCER:
+            # PgBouncer in transaction mode cannot keep prepared statements
+            query["prepared_statement_cache_size"] = "0"
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+        return url.render_as_string(hide_password=False)
+
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+    return database_url
+
+
+def engine_options(profile: str, database_url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    Build create_engine() keyword arguments for a profile
+
+    Args:
+        profile: Engine profile name
+        database_url: Database URL (used to pick driver-specific connect args)
+        asynchronous: Build options for create_async_engine instead
+
+    Returns:
+        Keyword arguments for sqlalchemy.create_engine / create_async_engine
+    """
+    options: Dict[str, Any] = {"echo": False, "pool_pre_ping": True}
+
+    if database_url.startswith("postgresql") and asynchronous:
+        connect_args: Dict[str, Any] = {
+            "ssl": DatabaseConfig.SSLMODE,
+            "timeout": DatabaseConfig.CONNECT_TIMEOUT,
+        }
+        if profile == PROFILE_PGBOUNCER:
+            connect_args["statement_cache_size"] = 0
+        options["connect_args"] = connect_args
+    elif database_url.startswith("postgresql"):
+        options["connect_args"] = {
+            "sslmode": DatabaseConfig.SSLMODE,
+            "connect_timeout": DatabaseConfig.CONNECT_TIMEOUT,
+        }
+
+    if profile == PROFILE_NULLPOOL:
+        options["poolclass"] = InstrumentedAsyncNullPool if asynchronous else InstrumentedNullPool
+        return options
+
+    options.update({
+        "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": DatabaseConfig.POOL_SIZE,
+        "pool_timeout": DatabaseConfig.POOL_TIMEOUT,
+        "pool_recycle": DatabaseConfig.POOL_RECYCLE,
+        "pool_use_lifo": True,
+    })
+
+    if profile == PROFILE_PGBOUNCER:
+        # PgBouncer multiplexes server connections; overflow here would only
+        # queue more clients on the bouncer.
+        options["max_overflow"] = 0
+    else:
+        options["max_overflow"] = DatabaseConfig.MAX_OVERFLOW
+
+    return options
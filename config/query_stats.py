@@ -0,0 +1,240 @@
+"""
+Request-scoped SQL Query Statistics
+
+Counts the queries each HTTP request runs, their total database time and how
+often each normalized statement repeats, using engine cursor events.
+
+The per-request record lives in its own ContextVar (query_stats_var), set by
+QueryStatsMiddleware, which follows the request into threadpool handlers and
+the async engine's greenlets. It is never looked up by request id: that id
+comes from the client's X-Request-ID header, so two concurrent requests may
+share it. The middleware opens and closes the record, adds a Server-Timing
+header, and hands finished requests back here for N+1 detection: a request
+that runs the same statement fingerprint more than N_PLUS_ONE_THRESHOLD
+times is logged and counted as an offender.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.constants import QueryStatsConfig
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Driver placeholders: psycopg2 %(name)s / %s, asyncpg $1, sqlite ?
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> Tuple[str, str]:
+    """
+    Reduce a SQL statement to its shape
+
+    Literals and placeholders become '?', IN lists and multi-row VALUES
+    collapse to one element, and whitespace is folded, so the same query
+    with different arguments yields the same fingerprint.
+
+    Args:
+        statement: SQL sent to the driver
+
+    Returns:
+        Tuple of (fingerprint, normalized statement)
+    """
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _WS_RE.sub(" ", normalized).strip()
+    normalized = _IN_LIST_RE.sub("(?)", normalized)
+    normalized = _VALUES_RE.sub(r"\1", normalized)
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    return fingerprint, normalized[:QueryStatsConfig.STATEMENT_MAX_LENGTH]
+
+
+class RequestQueryStats:
+    """
+    Queries run by a single request
+    """
+
+    def __init__(self, request_id: Optional[str], method: str, path: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self.statements: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        fingerprint, normalized = normalize_statement(statement)
+        with self._lock:
+            self.count += 1
+            self.total_time += seconds
+            self.fingerprints[fingerprint] += 1
+            self.statements.setdefault(fingerprint, normalized)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints executed more than `threshold` times, most repeated first"""
+        with self._lock:
+            return [(fp, n) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value with query count and database time"""
+        return f'db;dur={self.total_time * 1000:.1f};desc="{self.count} queries"'
+
+
+# Record of the request running in the current context (set by QueryStatsMiddleware)
+query_stats_var: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+class QueryCollector:
+    """
+    Engine event listeners plus the aggregated per-request totals
+    """
+
+    def __init__(self, threshold: int = QueryStatsConfig.N_PLUS_ONE_THRESHOLD,
+                 max_offenders: int = QueryStatsConfig.MAX_OFFENDERS):
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.in_flight = 0
+        self._offenders: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.flagged_requests = 0
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Register cursor listeners on an engine
+
+        Args:
+            engine: Sync engine (use async_engine.sync_engine for AsyncEngine)
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def start(self, request_id: Optional[str], method: str, path: str) -> RequestQueryStats:
+        """
+        Begin collecting for a request
+
+        The caller binds the returned record to its context with
+        query_stats_var.set() (and resets it when the request ends).
+        """
+        with self._lock:
+            self.in_flight += 1
+        return RequestQueryStats(request_id, method, path)
+
+    def finish(self, stats: RequestQueryStats) -> None:
+        """
+        Stop collecting for a request and run N+1 detection
+
+        Args:
+            stats: Record returned by start()
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.queries += stats.count
+            self.db_time += stats.total_time
+
+        repeated = stats.repeated(self.threshold)
+        if not repeated:
+            return
+
+        with self._lock:
+            self.flagged_requests += 1
+            for fingerprint, repeats in repeated:
+                offender = self._offenders.get(fingerprint)
+                if offender is None:
+                    offender = self._offenders[fingerprint] = {
+                        "fingerprint": fingerprint,
+                        "statement": stats.statements[fingerprint],
+                        "requests": 0,
+                        "total_repeats": 0,
+                        "max_repeats": 0,
+                        "last_endpoint": None,
+                    }
+                offender["requests"] += 1
+                offender["total_repeats"] += repeats
+                offender["max_repeats"] = max(offender["max_repeats"], repeats)
+                offender["last_endpoint"] = f"{stats.method} {stats.path}"
+            self._trim_offenders()
+
+        for fingerprint, repeats in repeated:
+            logger.warning(
+                f"[{stats.request_id}] Possible N+1: {stats.method} {stats.path} ran "
+                f"{repeats}x [{fingerprint}] {stats.statements[fingerprint]}"
+            )
+
+    def current(self) -> Optional[RequestQueryStats]:
+        """Record of the request running in this context, if any"""
+        return query_stats_var.get()
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Aggregate counters and the top N+1 offenders
+
+        Args:
+            limit: Number of offenders to return
+
+        Returns:
+            Serializable report
+        """
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda o: o["total_repeats"], reverse=True)
+            return {
+                "enabled": QueryStatsConfig.ENABLED,
+                "threshold": self.threshold,
+                "requests": self.requests,
+                "queries": self.queries,
+                "avg_queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0.0,
+                "avg_db_ms_per_request": round(self.db_time * 1000 / self.requests, 3) if self.requests else 0.0,
+                "flagged_requests": self.flagged_requests,
+                "in_flight": self.in_flight,
+                "offenders": [dict(o) for o in offenders[:limit]],
+            }
+
+    def reset(self) -> None:
+        """Clear counters and offenders"""
+        with self._lock:
+            self._offenders.clear()
+            self.requests = 0
+            self.queries = 0
+            self.db_time = 0.0
+            self.flagged_requests = 0
+
+    def _trim_offenders(self) -> None:
+        while len(self._offenders) > self.max_offenders:
+            weakest = min(self._offenders.values(), key=lambda o: o["total_repeats"])
+            del self._offenders[weakest["fingerprint"]]
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = self.current()
+        if stats is not None and context is not None:
+            context._query_stats = (stats, time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        entry = getattr(context, "_query_stats", None)
+        if entry is None:
+            return
+        stats, start = entry
+        stats.record(statement, time.perf_counter() - start)
+
+
+# One collector per process, attached to the sync and async engines
+query_collector = QueryCollector()
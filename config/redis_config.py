@@ -1,5 +1,6 @@
 import os
 import redis
+import redis.asyncio as redis_asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,6 +10,11 @@ RENDER = os.getenv('RENDER', 'false').lower() == 'true'
 
 # Configuración de Redis
 redis_client = None  
+# Cliente asyncio (pool propio) para código async: middleware, controllers
+async_redis_client = None
+# Clientes binarios (sin decode_responses) para las entradas de CacheService
+redis_binary_client = None
+async_redis_binary_client = None
 
 if RENDER:
     # En Render, no usar Redis (problemas de DNS)
@@ -29,9 +35,35 @@ else:
         # Test connection
         redis_client.ping()
         logger.info("✅ Redis connected successfully")
+
+        # Pool asyncio: conecta de forma perezosa, dentro del event loop que lo usa
+        max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+        async_redis_client = redis_asyncio.Redis(
+            connection_pool=redis_asyncio.ConnectionPool(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                decode_responses=True,
+                max_connections=max_connections
+            )
+        )
+
+        # El codec de caché guarda bytes (comprimidos): no deben decodificarse
+        redis_binary_client = redis.Redis(host=redis_host, port=redis_port, db=redis_db)
+        async_redis_binary_client = redis_asyncio.Redis(
+            connection_pool=redis_asyncio.ConnectionPool(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                max_connections=max_connections
+            )
+        )
     except Exception as e:
         logger.warning(f"⚠️ Redis connection failed: {e}")
         redis_client = None
+        async_redis_client = None
+        redis_binary_client = None
+        async_redis_binary_client = None
         logger.info("Application will run without caching")
 
 # AÑADE ESTA FUNCIÓN FALTANTE
@@ -39,6 +71,18 @@ def get_redis_client():
     """Get Redis client instance"""
     return redis_client
 
+def get_async_redis_client():
+    """Get asyncio Redis client instance (None when Redis is not available)"""
+    return async_redis_client
+
+def get_binary_redis_client():
+    """Get Redis client returning raw bytes (None when Redis is not available)"""
+    return redis_binary_client
+
+def get_async_binary_redis_client():
+    """Get asyncio Redis client returning raw bytes (None when Redis is not available)"""
+    return async_redis_binary_client
+
 def check_redis_connection():
     """Check Redis connection"""
     if redis_client is None:
@@ -51,4 +95,13 @@ def check_redis_connection():
 def close():
     """Close Redis connection"""
     if redis_client:
-        redis_client.close()
\ No newline at end of file
+        redis_client.close()
+    if redis_binary_client:
+        redis_binary_client.close()
+
+async def aclose():
+    """Close the asyncio Redis client and its connection pool"""
+    if async_redis_client:
+        await async_redis_client.aclose(close_connection_pool=True)
+    if async_redis_binary_client:
+        await async_redis_binary_client.aclose(close_connection_pool=True)
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Any, Dict
+from config.query_stats import query_collector
+from middleware.auth_middleware import require_admin
+from services.principal_service import Principal
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/sql-stats")
+async def get_sql_stats(
+    limit: int = Query(20, ge=1, le=200, description="Cantidad de sentencias a devolver"),
+    current_user: Principal = Depends(require_admin)
+) -> Dict[str, Any]:
+    """
+    Consultas por request y sentencias que más se repiten dentro de un
+    mismo request (posibles N+1), ordenadas por repeticiones totales.
+    """
+    return query_collector.report(limit)
+
+
+@router.post("/sql-stats/reset")
+async def reset_sql_stats(
+    current_user: Principal = Depends(require_admin)
+) -> Dict[str, Any]:
+    """Reinicia los contadores (por ejemplo, después de un deploy)."""
+    query_collector.reset()
+    logger.info(f"🧹 Estadísticas SQL reiniciadas por admin ID: {current_user.id_key}")
+    return {"success": True, "message": "Estadísticas SQL reiniciadas"}
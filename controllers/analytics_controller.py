@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Literal, Optional, Tuple
+from config.database import get_db
+from config.constants import AnalyticsConfig
+from middleware.auth_middleware import require_admin
+from services.analytics_service import AnalyticsService
+from services.principal_service import Principal
+import logging
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+def resolve_range(start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    """Rango [start, end]; por defecto los últimos 30 días."""
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'start' debe ser anterior o igual a 'end'"
+        )
+    if (end - start).days + 1 > AnalyticsConfig.MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar {AnalyticsConfig.MAX_RANGE_DAYS} días"
+        )
+    return start, end
+
+
+def get_analytics_service(db: Session = Depends(get_db)) -> AnalyticsService:
+    """Servicio de analytics (los rollups se refrescan en segundo plano)."""
+    return AnalyticsService(db)
+
+
+@router.get("/sales/summary")
+async def get_sales_summary(
+    start: Optional[date] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    _: Principal = Depends(require_admin),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Totales de ventas del período."""
+    start, end = resolve_range(start, end)
+    return service.summary(start, end)
+
+
+@router.get("/sales/daily")
+async def get_daily_sales(
+    start: Optional[date] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    _: Principal = Depends(require_admin),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Facturación, unidades y órdenes por día."""
+    start, end = resolve_range(start, end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": service.daily_sales(start, end)
+    }
+
+
+@router.get("/sales/categories")
+async def get_sales_by_category(
+    start: Optional[date] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    _: Principal = Depends(require_admin),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Ventas por categoría en el período."""
+    start, end = resolve_range(start, end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "categories": service.sales_by_category(start, end)
+    }
+
+
+@router.get("/sales/products")
+async def get_top_products(
+    start: Optional[date] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    limit: int = Query(AnalyticsConfig.TOP_PRODUCTS_LIMIT, ge=1, le=100),
+    order_by: Literal["revenue", "units"] = Query("revenue"),
+    _: Principal = Depends(require_admin),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Productos más vendidos en el período."""
+    start, end = resolve_range(start, end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "order_by": order_by,
+        "products": service.top_products(start, end, limit, order_by)
+    }
+
+
+@router.post("/refresh")
+def refresh_rollups(
+    full: bool = Query(False, description="Reconstruir todo el historial"),
+    _: Principal = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Forzar el refresco de los rollups de ventas.
+
+    Handler sync: FastAPI lo corre en el threadpool, así una reconstrucción
+    completa no bloquea el event loop.
+    """
+    try:
+        return AnalyticsService(db).refresh(full=full)
+    except Exception as e:
+        logger.error(f"❌ Error refrescando rollups de ventas: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from config.database import get_db
 from schemas.client_schema import ClientLoginSchema, ClientRegisterSchema, DebugPasswordSchema
 from models.client import ClientModel
-from services.auth_service import AuthService
+from services.auth_service import AuthService, LEGACY_SCHEME
+from services.password_hasher import HashingBusyError
 from jose import jwt
 from middleware.auth_middleware import get_current_user
+from services.principal_service import Principal
 import os
 import logging
 import hashlib  
@@ -20,8 +21,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-security = HTTPBearer()
-
 def create_access_token(data: dict) -> str:
     """Crea un token JWT con los datos proporcionados."""
     to_encode = data.copy()
@@ -29,26 +28,36 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user_id_key(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """Obtiene el ID del cliente desde el token JWT."""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        client_id_str = payload.get("sub")
-
-        if client_id_str is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Credenciales de autenticación inválidas"
-            )
-
-        return int(client_id_str)
+def get_current_user_id_key(current_user: Principal = Depends(get_current_user)) -> int:
+    """Obtiene el ID del cliente autenticado (desde la caché de principals)."""
+    return current_user.id_key
+
+def hashing_busy(error: HashingBusyError) -> HTTPException:
+    """429 cuando el executor de hashing está saturado."""
+    logger.warning("⚠️ Executor de hashing saturado, rechazando petición")
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Servidor ocupado, reintente en unos segundos",
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
-    except jwt.JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Credenciales de autenticación inválidas"
-        )
+async def upgrade_legacy_hash(db: Session, client: ClientModel, password: str) -> None:
+    """
+    Re-hashea con PBKDF2 una contraseña guardada con el SHA-256 antiguo.
+    Un fallo aquí no impide el login: se reintenta en el próximo inicio de sesión.
+    """
+    try:
+        salt = AuthService.generate_salt()
+        client.password_hash = await AuthService.hash_password_async(password, salt)
+        client.password_salt = salt
+        db.commit()
+        logger.info(f"🔐 Hash legado actualizado a PBKDF2 para cliente {client.id_key}")
+    except HashingBusyError:
+        db.rollback()
+        logger.warning(f"Executor saturado, se pospone el re-hash del cliente {client.id_key}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error re-hasheando contraseña del cliente {client.id_key}: {e}")
 
 @router.post("/login", summary="Iniciar sesión", response_description="Retorna el token de acceso y datos del cliente")
 async def login(login_data: ClientLoginSchema, db: Session = Depends(get_db)):
@@ -69,16 +78,22 @@ async def login(login_data: ClientLoginSchema, db: Session = Depends(get_db)):
     logger.info(f"Salt del cliente: {client.password_salt[:10]}...")
     logger.info(f"Hash almacenado: {client.password_hash[:10]}...")
 
-    is_valid = AuthService.verify_password(
-        login_data.password.get_secret_value(),
-        client.password_salt,
-        client.password_hash
-    )
+    try:
+        scheme = await AuthService.check_password_async(
+            login_data.password.get_secret_value(),
+            client.password_salt,
+            client.password_hash
+        )
+    except HashingBusyError as e:
+        raise hashing_busy(e)
 
-    if not is_valid:
+    if scheme is None:
         logger.warning(f"Contraseña inválida para: {login_data.email}")
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
+    if scheme == LEGACY_SCHEME:
+        await upgrade_legacy_hash(db, client, login_data.password.get_secret_value())
+
     # Crear token
     access_token = create_access_token(data={"sub": str(client.id_key)})
 
@@ -111,10 +126,13 @@ async def register(register_data: ClientRegisterSchema, db: Session = Depends(ge
         raise HTTPException(status_code=400, detail="Las contraseñas no coinciden")
 
     salt = AuthService.generate_salt()
-    password_hash = AuthService.hash_password(
-        register_data.password.get_secret_value(),
-        salt
-    )
+    try:
+        password_hash = await AuthService.hash_password_async(
+            register_data.password.get_secret_value(),
+            salt
+        )
+    except HashingBusyError as e:
+        raise hashing_busy(e)
 
     # Crear cliente
     client_data = register_data.dict(exclude={'password', 'confirm_password', 'id_key'})
@@ -161,7 +179,7 @@ async def verify_token(current_user_id_key: int = Depends(get_current_user_id_ke
     }
 
 @router.get("/me", summary="Obtener perfil", response_description="Retorna los datos del cliente actual")
-async def get_me(current_user: ClientModel = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """Obtiene la información del cliente autenticado."""
     return {
         "id": current_user.id_key,
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from config.database import get_db
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from config.database import get_db, get_async_db
 from schemas.client_schema import (
     ClientCreateSchema,
     ClientUpdateSchema,
@@ -11,70 +12,32 @@ from schemas.client_schema import (
 )
 from models.client import ClientModel
 from models.address import AddressModel
+from utils.pagination import (
+    COUNT_ESTIMATED,
+    COUNT_EXACT,
+    InvalidCursorError,
+    estimated_count,
+    page_results,
+    paginate,
+)
+from middleware.auth_middleware import get_current_user
+from services.principal_service import Principal
 import logging
-from jose import jwt, JWTError
-import os
 from datetime import datetime
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/clients")
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-ALGORITHM = "HS256"
-security = HTTPBearer()
 
-def get_current_user_id_key(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> int:
+def get_current_user_id_key(current_user: Principal = Depends(get_current_user)) -> int:
     """
-    Extrae el client_id del token JWT.
-    Esta función es una DEPENDENCIA de FastAPI.
+    Extrae el client_id del usuario autenticado.
+    Esta función es una DEPENDENCIA de FastAPI; el cliente se resuelve
+    desde la caché de principals (sin consulta a la base por request).
     """
-    try:
-        token = credentials.credentials
-        logger.debug(f"🔐 Token recibido (primeros 50 chars): {token[:50]}...")
-
-        # Decodificar el JWT
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        client_id_str = payload.get("sub")
-
-        if client_id_str is None:
-            logger.error("❌ Token no contiene 'sub' (subject)")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing 'sub' field"
-            )
-
-        try:
-            client_id = int(client_id_str)
-            logger.info(f"✅ Client ID extraído: {client_id}")
-            return client_id
-        except ValueError:
-            logger.error(f"❌ 'sub' no es un número válido: {client_id_str}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: 'sub' must be a number"
-            )
-
-    except jwt.ExpiredSignatureError:
-        logger.error("❌ Token expirado")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
-        )
-    except JWTError as e:
-        logger.error(f"❌ Error JWT: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid token: {str(e)}"
-        )
-    except Exception as e:
-        logger.error(f"❌ Error inesperado en autenticación: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Authentication error"
-        )
+    logger.debug(f"✅ Client ID autenticado: {current_user.id_key}")
+    return current_user.id_key
 
 @router.get("/test-public")
 async def test_public():
@@ -122,15 +85,17 @@ async def debug_auth(current_user_id_key: int = Depends(get_current_user_id_key)
 @router.get("/me", response_model=ClientResponseSchema)
 async def get_my_profile(
     current_user_id_key: int = Depends(get_current_user_id_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener el perfil del usuario actual."""
     logger.info(f"👤 [GET /clients/me] user={current_user_id_key}")
 
-    client = db.query(ClientModel).filter(
-        ClientModel.id_key == current_user_id_key,
-        ClientModel.is_active == True
-    ).first()
+    client = (await db.scalars(
+        select(ClientModel).where(
+            ClientModel.id_key == current_user_id_key,
+            ClientModel.is_active == True
+        )
+    )).first()
 
     if not client:
         logger.warning(f"❌ Cliente {current_user_id_key} no encontrado")
@@ -193,14 +158,16 @@ async def search_clients(
 async def get_clients(
     skip: int = Query(0, ge=0, description="Número de registros a saltar"),
     limit: int = Query(10, ge=1, le=100, description="Máximo número de registros"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior (reemplaza a skip)"),
+    count: Literal["exact", "estimated", "none"] = Query("exact", description="Cómo calcular el total"),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id_key: int = Depends(get_current_user_id_key)
 ):
-    """Obtener lista de clientes con paginación. Solo admin ve todos los clientes."""
+    """Obtener lista de clientes con paginación (offset o cursor). Solo admin ve todos los clientes."""
     logger.info(f"🔍 [GET /clients] skip={skip}, limit={limit}, user={current_user_id_key}")
 
     try:
-        query = db.query(ClientModel).filter(ClientModel.is_active == True)
+        active_filter = ClientModel.is_active == True
 
         # Solo admin puede ver todos los clientes
         if current_user_id_key != 0:
@@ -210,10 +177,28 @@ async def get_clients(
                 detail="Solo el administrador puede ver todos los clientes"
             )
 
-        clients = query.offset(skip).limit(limit).all()
-        total = query.count()
-        pages = (total + limit - 1) // limit if limit > 0 else 1
-        current_page = (skip // limit) + 1 if limit > 0 else 1
+        stmt = select(ClientModel).where(active_filter)
+        if cursor:
+            try:
+                stmt = paginate(stmt, [ClientModel.id_key], cursor, limit)
+            except InvalidCursorError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        else:
+            stmt = stmt.order_by(ClientModel.id_key).offset(skip).limit(limit + 1)
+        clients, next_cursor = page_results((await db.scalars(stmt)).all(), limit, "id_key")
+
+        # Total de clientes activos: exacto (COUNT), estimado (planner, mismo filtro) u omitido
+        total = None
+        if count == COUNT_ESTIMATED:
+            total = await db.run_sync(
+                estimated_count, "clients", select(ClientModel.id_key).where(active_filter)
+            )
+        if count == COUNT_EXACT or (count == COUNT_ESTIMATED and total is None):
+            total = await db.scalar(
+                select(func.count()).select_from(ClientModel).where(active_filter)
+            )
+        pages = (total + limit - 1) // limit if total is not None else None
+        current_page = (skip // limit) + 1
 
         logger.info(f"✅ [GET /clients] Retornando {len(clients)} clientes, total: {total}")
         return {
@@ -221,7 +206,8 @@ async def get_clients(
             "total": total,
             "page": current_page,
             "size": limit,
-            "pages": pages
+            "pages": pages,
+            "next_cursor": next_cursor
         }
 
     except HTTPException:
@@ -236,7 +222,7 @@ async def get_clients(
 @router.get("/{client_id}", response_model=ClientResponseSchema)
 async def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id_key: int = Depends(get_current_user_id_key)
 ):
     """Obtener un cliente específico por id_key."""
@@ -250,10 +236,12 @@ async def get_client(
             detail="No tienes permiso para ver este perfil"
         )
 
-    client = db.query(ClientModel).filter(
-        ClientModel.id_key == client_id,
-        ClientModel.is_active == True
-    ).first()
+    client = (await db.scalars(
+        select(ClientModel).where(
+            ClientModel.id_key == client_id,
+            ClientModel.is_active == True
+        )
+    )).first()
 
     if not client:
         logger.warning(f"❌ Cliente {client_id} no encontrado")
@@ -1,30 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from config.database import get_db
+from typing import List, Literal, Optional
+from config.database import SessionLocal, get_db
 from schemas.order_schema import OrderCreateSchema, OrderResponseSchema, OrderListSchema
-from schemas.order_detail_schema import OrderDetailCreateSchema  
 from models.order import OrderModel
-from models.order_detail import OrderDetailModel
 from models.product import ProductModel
 from models.client import ClientModel
 from models.bill import BillModel
 from models.enums import Status
 from services.order_detail_service import OrderDetailService  
+from services.bill_number_service import next_bill_number
+from services.http_cache import PRODUCTS_TAG, conditional_cache
 from middleware.auth_middleware import get_current_user
+from services.principal_service import Principal
+from services.idempotency_service import (
+    IdempotencyInProgressError,
+    IdempotencyKeyMismatchError,
+    idempotency_store,
+    request_fingerprint,
+)
+from config.constants import IdempotencyConfig
+from utils.pagination import InvalidCursorError, page_results, paginate
 import logging
+import csv
+import io
+import json
 from datetime import datetime
-import uuid
 from models.enums import PaymentType
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Orders"])
 
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+
+# Errores que dependen del momento (conflicto, rate limit) no se guardan:
+# el reintento debe volver a ejecutarse
+NON_REPLAYABLE_STATUS = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+
+
 @router.post("/orders", response_model=OrderResponseSchema)
 async def create_order(
     order_data: OrderCreateSchema,
-    current_user: ClientModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=IdempotencyConfig.MAX_KEY_LENGTH,
+        description="Clave única por intento de compra; los reintentos con la misma clave devuelven la respuesta original"
+    )
+) -> OrderResponseSchema:
+    """
+    Crea una orden.
+
+    Con el header Idempotency-Key, la primera respuesta (éxito o error 4xx)
+    se guarda y los reintentos con la misma clave la repiten sin volver a
+    descontar stock. Un duplicado concurrente espera a que termine el primer
+    intento. Reusar la clave con otro cuerpo devuelve 422.
+    """
+    if not idempotency_key:
+        return await _create_order(order_data, current_user, db)
+
+    try:
+        claim = await idempotency_store.begin(
+            current_user.id_key,
+            idempotency_key,
+            request_fingerprint(order_data.model_dump(mode="json"))
+        )
+    except IdempotencyKeyMismatchError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La Idempotency-Key ya se usó con otra orden"
+        )
+    except IdempotencyInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay una orden en proceso con esta Idempotency-Key",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    if claim.replay is not None:
+        logger.info(f"🔁 Repitiendo respuesta de Idempotency-Key para usuario ID: {current_user.id_key}")
+        return JSONResponse(
+            status_code=claim.replay.status_code,
+            content=claim.replay.body,
+            headers={IDEMPOTENT_REPLAY_HEADER: "true"}
+        )
+
+    try:
+        order = await _create_order(order_data, current_user, db)
+    except HTTPException as e:
+        if e.status_code < 500 and e.status_code not in NON_REPLAYABLE_STATUS:
+            await idempotency_store.acomplete(claim, e.status_code, {"detail": e.detail})
+        else:
+            await idempotency_store.arelease(claim)
+        raise
+    except BaseException:
+        await idempotency_store.arelease(claim)
+        raise
+
+    await idempotency_store.acomplete(claim, status.HTTP_200_OK, jsonable_encoder(order))
+    return order
+
+
+async def _create_order(
+    order_data: OrderCreateSchema,
+    current_user: Principal,
+    db: Session
 ) -> OrderResponseSchema:
     try:
         logger.info(f"Creando orden para usuario ID: {current_user.id_key}")
@@ -57,14 +142,23 @@ async def create_order(
                 detail="La orden debe contener al menos un producto"
             )
 
-        # 2. Verificar productos y calcular total
+        # 2. Cargar y bloquear todos los productos en una sola consulta (orden por id)
+        order_detail_service = OrderDetailService(db)
+        products = order_detail_service.lock_products(
+            detail.product_id for detail in order_data.order_details
+        )
+
+        # Cantidad total pedida por producto (un producto puede repetirse)
+        requested: dict[int, int] = {}
+        for detail in order_data.order_details:
+            requested[detail.product_id] = requested.get(detail.product_id, 0) + detail.quantity
+
+        # 3. Verificar productos y calcular total
         total_calculated: float = 0
         order_items = []
         
         for detail in order_data.order_details:
-            product: ProductModel | None = db.query(ProductModel).filter(
-                ProductModel.id_key == detail.product_id
-            ).first()
+            product: ProductModel | None = products.get(detail.product_id)
 
             if not product:
                 raise HTTPException(
@@ -74,13 +168,17 @@ async def create_order(
 
             # Verificar stock si el campo existe
             if hasattr(product, 'stock') and product.stock is not None:
-                if product.stock < detail.quantity:
+                if product.stock < requested[detail.product_id]:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Stock insuficiente para {product.name}. Disponible: {product.stock}, Solicitado: {detail.quantity}"
+                        detail=f"Stock insuficiente para {product.name}. Disponible: {product.stock}, Solicitado: {requested[detail.product_id]}"
                     )
 
+            # El precio del producto es el que se guarda en el detalle
             price: float = detail.price if detail.price is not None else product.price
+            if abs(price - product.price) > 0.01:
+                logger.warning(f"Precio enviado ({price}) distinto al del producto {product.id_key} ({product.price})")
+                price = product.price
             
             order_items.append({
                 'product_id': detail.product_id,
@@ -91,12 +189,12 @@ async def create_order(
             
             total_calculated += price * detail.quantity
 
-        # 3. Verificar que el total coincida 
+        # 4. Verificar que el total coincida 
         if abs(total_calculated - order_data.total) > 1.00:  
             logger.warning(f"Total calculado ({total_calculated}) no coincide con enviado ({order_data.total})")
             order_data.total = round(total_calculated, 2)
 
-        # 4. Crear la orden 
+        # 5. Crear la orden 
         order_dict = order_data.model_dump(exclude={'order_details', 'bill_id'})
         
         order = OrderModel(
@@ -107,28 +205,17 @@ async def create_order(
         db.add(order)
         db.flush()  
 
-        # 5. Crear los detalles de la orden usando el servicio
-        order_detail_service = OrderDetailService(db)
-        
-        for item in order_items:
-            # Preparar datos para OrderDetail
-            detail_schema = OrderDetailCreateSchema(
-                order_id=order.id_key,
-                product_id=item['product_id'],
-                quantity=item['quantity'],
-                price=item['price']
-            )
-            
-            # Usar el servicio que maneja stock automáticamente
-            order_detail = order_detail_service.save(detail_schema)
-            logger.info(f"Detalle de orden creado: {order_detail.id_key}")
+        # 6. Crear los detalles (INSERT masivo) y descontar stock (un solo UPDATE)
+        order_detail_service.save_batch(order.id_key, order_items)
 
-        bill_number = f"FACT-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:4].upper()}"
+        # 7. Numerar la factura (contador diario en la misma transacción: sin huecos ni colisiones)
+        bill_date = datetime.now()
+        bill_number = next_bill_number(db, bill_date)
         subtotal = round(order.total / 1.21, 2) if order.total > 0 else 0
         
         bill = BillModel(
             bill_number=bill_number,
-            date=datetime.now(),
+            date=bill_date,
             total=order.total,
             subtotal=subtotal,
             payment_type=PaymentType.CASH,  
@@ -140,12 +227,15 @@ async def create_order(
         db.add(bill)
         db.flush()
 
-        # 6. Actualizar la orden con el bill_id
+        # 8. Actualizar la orden con el bill_id (único commit de toda la orden)
         order.bill_id = bill.id_key
 
         db.commit()
         db.refresh(order)
 
+        # El stock cambió: los ETag del catálogo dejan de valer
+        await conditional_cache.ainvalidate(PRODUCTS_TAG)
+
         logger.info(f"Orden creada exitosamente: ID {order.id_key}, Factura: {bill_number}")
 
         return OrderResponseSchema(
@@ -175,9 +265,18 @@ async def create_order(
 @router.get("/orders/client/{client_id}", response_model=List[OrderListSchema])
 async def get_client_orders(
     client_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Tamaño de página (activa la paginación por cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> List[OrderListSchema]:
+    """
+    Órdenes de un cliente, más recientes primero.
+
+    Con `limit`/`cursor` pagina por keyset sobre (date, id_key) y devuelve
+    el cursor siguiente en el header X-Next-Cursor.
+    """
     try:
         # el cliente solo puede ver su propia orden
         if current_user.id_key != client_id and current_user.id_key != 0:
@@ -186,9 +285,24 @@ async def get_client_orders(
                 detail="No tienes permiso para ver estas órdenes"
             )
 
-        orders: list[OrderModel] = db.query(OrderModel).filter(
-            OrderModel.client_id_key == client_id
-        ).order_by(OrderModel.date.desc()).all()
+        if limit is None and cursor is None:
+            orders: list[OrderModel] = db.query(OrderModel).filter(
+                OrderModel.client_id_key == client_id
+            ).order_by(OrderModel.date.desc(), OrderModel.id_key.desc()).all()
+        else:
+            try:
+                stmt = paginate(
+                    select(OrderModel).where(OrderModel.client_id_key == client_id),
+                    [OrderModel.date, OrderModel.id_key],
+                    cursor,
+                    limit or 20,
+                    descending=True
+                )
+            except InvalidCursorError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+            orders, next_cursor = page_results(db.scalars(stmt).all(), limit or 20, "date", "id_key")
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
 
         return [
             OrderListSchema(
@@ -203,6 +317,8 @@ async def get_client_orders(
             for order in orders
         ]
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error obteniendo órdenes del cliente {client_id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -210,21 +326,82 @@ async def get_client_orders(
             detail=f"Error interno del servidor: {str(e)}"
         )
 
+OrderStatusFilter = Literal["PENDING", "IN_PROGRESS", "DELIVERED", "CANCELED"]
+
+ORDER_LIST_COLUMNS = (
+    OrderModel.id_key,
+    OrderModel.client_id_key,
+    OrderModel.total,
+    OrderModel.status,
+    OrderModel.date,
+    OrderModel.address,
+    OrderModel.bill_id,
+)
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def require_admin_orders(current_user: Principal) -> None:
+    # Solo administradores pueden ver todas las órdenes
+    if current_user.id_key != 0:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo administradores pueden ver todas las órdenes"
+        )
+
+
+def filter_orders(
+    stmt,
+    status_filter: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime]
+):
+    """Filtros de estado y rango de fechas [date_from, date_to) del listado de administración."""
+    if status_filter:
+        stmt = stmt.where(OrderModel.status == Status[status_filter])
+    if date_from:
+        stmt = stmt.where(OrderModel.date >= date_from)
+    if date_to:
+        stmt = stmt.where(OrderModel.date < date_to)
+    return stmt
+
+
 @router.get("/orders", response_model=List[OrderListSchema])
 async def get_all_orders(
-    current_user: ClientModel = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
+    status_filter: Optional[OrderStatusFilter] = Query(None, alias="status", description="Filtrar por estado"),
+    date_from: Optional[datetime] = Query(None, description="Órdenes desde esta fecha (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Órdenes hasta esta fecha (exclusive)"),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> List[OrderListSchema]:
+    """
+    Todas las órdenes (solo administradores), más recientes primero.
+
+    Pagina por keyset sobre (date, id_key) y devuelve el cursor siguiente
+    en el header X-Next-Cursor. Los filtros usan los índices
+    ix_orders_status_date_id / ix_orders_date_id.
+    """
     try:
-        # Solo administradores pueden ver todas las órdenes
-        if current_user.id_key != 0:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo administradores pueden ver todas las órdenes"
+        require_admin_orders(current_user)
+
+        try:
+            stmt = paginate(
+                filter_orders(select(*ORDER_LIST_COLUMNS), status_filter, date_from, date_to),
+                [OrderModel.date, OrderModel.id_key],
+                cursor,
+                limit,
+                descending=True
             )
+        except InvalidCursorError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+        orders, next_cursor = page_results(db.execute(stmt).all(), limit, "date", "id_key")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
-        orders: list[OrderModel] = db.query(OrderModel).order_by(OrderModel.date.desc()).all()
-        
         return [
             OrderListSchema(
                 id_key=order.id_key,
@@ -238,6 +415,8 @@ async def get_all_orders(
             for order in orders
         ]
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error obteniendo todas las órdenes: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -245,24 +424,83 @@ async def get_all_orders(
             detail=f"Error interno del servidor: {str(e)}"
         )
 
+@router.get("/orders/export")
+async def export_orders(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status_filter: Optional[OrderStatusFilter] = Query(None, alias="status", description="Filtrar por estado"),
+    date_from: Optional[datetime] = Query(None, description="Órdenes desde esta fecha (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Órdenes hasta esta fecha (exclusive)"),
+    current_user: Principal = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Exportar órdenes (solo administradores) como NDJSON o CSV.
+
+    Las filas se leen con un cursor del servidor (yield_per) y se envían
+    a medida que llegan, así la memoria no crece con el tamaño del export.
+    """
+    require_admin_orders(current_user)
+
+    stmt = filter_orders(select(*ORDER_LIST_COLUMNS), status_filter, date_from, date_to).order_by(
+        OrderModel.date.desc(), OrderModel.id_key.desc()
+    )
+    fields = [column.key for column in ORDER_LIST_COLUMNS]
+
+    def rows():
+        # Sesión propia: la de get_db se cierra antes de terminar el streaming
+        with SessionLocal() as session:
+            result = session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            for row in result:
+                yield {
+                    "id_key": row.id_key,
+                    "client_id_key": row.client_id_key,
+                    "total": row.total,
+                    "status": row.status.name if row.status else None,
+                    "date": row.date.isoformat() if row.date else None,
+                    "address": row.address,
+                    "bill_id": row.bill_id,
+                }
+
+    def ndjson():
+        for row in rows():
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for count, row in enumerate(rows(), start=1):
+            writer.writerow(row)
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+
+    filename = f"orders-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    logger.info(f"📤 Exportando órdenes ({export_format}) para admin")
+    return StreamingResponse(
+        ndjson() if export_format == "ndjson" else csv_lines(),
+        media_type="application/x-ndjson" if export_format == "ndjson" else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/orders/{order_id}/details")
 async def get_order_details(
     order_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Obtener los detalles (productos) de una orden específica"""
     try:
-        # Obtener la orden
-        order: OrderModel | None = db.query(OrderModel).filter(
-            OrderModel.id_key == order_id
-        ).first()
+        # Orden, detalles y nombres de productos en una sola consulta
+        order_view = OrderDetailService(db).get_order_view(order_id)
 
-        if not order:
+        if not order_view:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Orden no encontrada"
             )
+        order, order_details = order_view
 
         # Verificar permisos
         if current_user.id_key != order.client_id_key and current_user.id_key != 0:
@@ -271,28 +509,19 @@ async def get_order_details(
                 detail="No tienes permiso para ver esta orden"
             )
 
-        # Obtener detalles de la orden
-        order_details = db.query(OrderDetailModel).filter(
-            OrderDetailModel.order_id == order_id
-        ).all()
-
         # Formatear respuesta
-        details_response = []
-        for detail in order_details:
-            # Obtener información del producto
-            product = db.query(ProductModel).filter(
-                ProductModel.id_key == detail.product_id
-            ).first()
-            
-            details_response.append({
+        details_response = [
+            {
                 'id_key': detail.id_key,
                 'product_id': detail.product_id,
-                'product_name': product.name if product else 'Producto no encontrado',
+                'product_name': product_name or 'Producto no encontrado',
                 'quantity': detail.quantity,
                 'price': detail.price,
                 'subtotal': detail.quantity * detail.price,
                 'created_at': detail.created_at
-            })
+            }
+            for detail, product_name in order_details
+        ]
 
         return {
             'order_id': order.id_key,
@@ -314,7 +543,7 @@ async def get_order_details(
 @router.put("/orders/{order_id}/deliver")
 async def mark_order_as_delivered(
     order_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Marcar una orden como entregada (solo para admin)"""
@@ -351,7 +580,6 @@ async def mark_order_as_delivered(
 
         order.status = Status.DELIVERED
         order.delivered_date = datetime.now()
-        order.updated_at = datetime.now()
 
         db.commit()
         db.refresh(order)
@@ -380,7 +608,7 @@ async def mark_order_as_delivered(
 @router.get("/orders/{order_id}/can-cancel")
 async def can_cancel_order(
     order_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Verificar si una orden puede ser cancelada."""
@@ -448,14 +676,15 @@ async def can_cancel_order(
 @router.put("/orders/{order_id}/cancel")
 async def cancel_order(
     order_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Cancelar una orden (admin o cliente dueño de la orden)."""
     try:
+        # FOR UPDATE: dos cancelaciones simultáneas no pueden restaurar el stock dos veces
         order: OrderModel | None = db.query(OrderModel).filter(
             OrderModel.id_key == order_id
-        ).first()
+        ).with_for_update().first()
 
         if not order:
             raise HTTPException(
@@ -493,33 +722,18 @@ async def cancel_order(
                     detail="El tiempo para cancelar esta orden ha expirado (30 minutos)"
                 )
 
-        order_details = db.query(OrderDetailModel).filter(
-            OrderDetailModel.order_id == order_id
-        ).all()
-        
-        stock_restored_count = 0
-        try:
-            for detail in order_details:
-                product = db.query(ProductModel).filter(
-                    ProductModel.id_key == detail.product_id
-                ).first()
-                
-                if product and hasattr(product, 'stock'):
-                    product.stock += detail.quantity
-                    stock_restored_count += 1
-                    logger.info(f"✅ Stock restaurado: Producto {product.id_key} +{detail.quantity} unidades")
-        
-        except Exception as stock_error:
-            logger.warning(f"⚠️ Error restaurando stock: {stock_error}")
+        # Restaurar stock de todas las líneas con un único UPDATE
+        stock_restored_count, total_lines = OrderDetailService(db).restore_stock(order_id)
+        logger.info(f"✅ Stock restaurado: {stock_restored_count}/{total_lines} líneas de la orden {order_id}")
 
         order.status = Status.CANCELED
-        order.updated_at = datetime.now()
         
         cancelled_by = "admin" if is_admin else "client"
         logger.info(f"Orden {order_id} cancelada por {cancelled_by} ID: {current_user.id_key}")
 
         db.commit()
         db.refresh(order)
+        await conditional_cache.ainvalidate(PRODUCTS_TAG)
 
         return {
             "success": True,
@@ -529,7 +743,7 @@ async def cancel_order(
             "cancelled_by": cancelled_by,
             "cancelled_at": datetime.now().isoformat(),
             "stock_restored": stock_restored_count,
-            "remaining_stock_issues": len(order_details) - stock_restored_count
+            "remaining_stock_issues": total_lines - stock_restored_count
         }
 
     except HTTPException:
@@ -546,7 +760,7 @@ async def cancel_order(
 @router.get("/orders/{order_id}/status")
 async def get_order_status(
     order_id: int,
-    current_user: ClientModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Obtener el estado de una orden"""
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Literal, Optional
 from config.database import get_db
+from services.product_search_service import product_search_service
+from services.product_service import ProductService
+from services.http_cache import PRODUCTS_TAG, conditional_cache
+from config.constants import HttpCacheConfig
+from utils.pagination import InvalidCursorError, decode_cursor
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/products")
-async def create_product(
+def create_product(
     product_data: Dict[str, Any],
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -52,6 +57,8 @@ async def create_product(
         result = db.execute(query, insert_data)
         product_id = result.scalar()
         db.commit()
+        product_search_service.index_product(product_id, insert_data["name"], insert_data["description"])
+        ProductService(db).invalidate_product(product_id)
         
         logger.info(f"✅ Producto creado ID: {product_id}")
         
@@ -73,7 +80,7 @@ async def create_product(
 
 
 @router.put("/products/{product_id}")
-async def update_product(
+def update_product(
     product_id: int,
     product_data: Dict[str, Any],
     db: Session = Depends(get_db)
@@ -145,6 +152,7 @@ async def update_product(
         
         result = db.execute(update_query, update_values)
         db.commit()
+        ProductService(db).invalidate_product(product_id)
         
         logger.info(f"✅ Producto actualizado ID: {product_id}")
         
@@ -155,9 +163,9 @@ async def update_product(
         
         product_dict = {}
         if updated_product:
-            columns = updated_product._mapping.keys()
-            for column in columns:
-                product_dict[column] = getattr(updated_product, column)
+            product_dict = dict(updated_product._mapping)
+            product_dict.pop("search_vector", None)
+            product_search_service.index_product(product_id, product_dict.get("name"), product_dict.get("description"))
         
         return {
             "success": True,
@@ -178,7 +186,7 @@ async def update_product(
 
 
 @router.delete("/products/{product_id}")
-async def delete_product(
+def delete_product(
     product_id: int,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -199,6 +207,8 @@ async def delete_product(
         
         result = db.execute(delete_query, {"product_id": product_id})
         db.commit()
+        product_search_service.remove_product(product_id)
+        ProductService(db).invalidate_product(product_id)
         
         logger.info(f"✅ Producto eliminado ID: {product_id}")
         
@@ -219,71 +229,57 @@ async def delete_product(
         )
 
 @router.get("/products")
-async def get_products(
+def get_products(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(12, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior (reemplaza a skip)"),
+    count: Literal["exact", "estimated", "none"] = Query("exact", description="Cómo calcular el total"),
     db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Obtener todos los productos con paginación.
+
+    Con `cursor` la página empieza después del último id_key devuelto
+    (keyset), por lo que cada página es un único rango del índice sin
+    importar su profundidad. `skip` se mantiene por compatibilidad.
+
+    Páginas y totales salen de la caché de ProductService. Responde con
+    ETag; si If-None-Match coincide con el validador cacheado devuelve 304
+    sin consultar la base de datos.
     """
+    not_modified = conditional_cache.not_modified(request, HttpCacheConfig.PRODUCT_LIST_MAX_AGE)
+    if not_modified is not None:
+        return not_modified
+
     try:
-        # Query para obtener productos
-        query = text("""
-            SELECT 
-                id_key, 
-                name, 
-                description, 
-                price::float, 
-                stock, 
-                category_id, 
-                COALESCE(sku, '') as sku, 
-                COALESCE(image_url, '') as image_url,
-                created_at, 
-                updated_at
-            FROM products 
-            WHERE stock > 0
-            ORDER BY id_key
-            OFFSET :skip LIMIT :limit
-        """)
-        
-        # Ejecutar consulta
-        result = db.execute(query, {"skip": skip, "limit": limit})
-        
-        # Procesar resultados CORRECTAMENTE
-        products = []
-        columns = result.keys()  # Obtener nombres de columnas
-        
-        for row in result:
-            # Crear diccionario manualmente
-            product_dict = {}
-            for i, column in enumerate(columns):
-                value = row[i]
-                # Convertir Decimal a float si es necesario
-                if column == 'price' and value is not None:
-                    try:
-                        value = float(value)
-                    except:
-                        value = 0.0
-                product_dict[column] = value
-            products.append(product_dict)
-        
-        # Query para contar total
-        count_query = text("SELECT COUNT(*) as total FROM products WHERE stock > 0")
-        count_result = db.execute(count_query)
-        total = count_result.scalar()
-        
+        after_id = None
+        if cursor:
+            try:
+                (after_id,) = decode_cursor(cursor, 1)
+            except InvalidCursorError:
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+
+        product_service = ProductService(db)
+        products, next_cursor = product_service.get_catalog_page(skip, limit, after_id)
+
+        # Total de productos con stock: exacto (COUNT), estimado (planner) u omitido
+        total = product_service.count_catalog(count)
+
         logger.info(f"✅ Productos obtenidos: {len(products)} de {total}")
-        
-        return {
+
+        return conditional_cache.respond(request, {
             "success": True,
             "products": products,
             "total": total,
             "skip": skip,
             "limit": limit,
-            "count": len(products)
-        }
+            "count": len(products),
+            "next_cursor": next_cursor
+        }, HttpCacheConfig.PRODUCT_LIST_MAX_AGE, [PRODUCTS_TAG])
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error en get_products: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -292,78 +288,35 @@ async def get_products(
         )
 
 @router.get("/products/search")
-async def search_products(
+def search_products(
+    request: Request,
     q: str = Query("", min_length=0),
     skip: int = Query(0, ge=0),
     limit: int = Query(12, ge=1, le=100),
     db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Buscar productos por nombre o descripción.
+
+    Búsqueda full-text con ranking y coincidencia por prefijo: índice GIN
+    sobre tsvector en PostgreSQL, índice invertido en memoria en SQLite.
+    Los resultados se cachean en ProductService.
     """
+    not_modified = conditional_cache.not_modified(request, HttpCacheConfig.PRODUCT_LIST_MAX_AGE)
+    if not_modified is not None:
+        return not_modified
+
     try:
-        search_term = f"%{q}%" if q else "%%"
-        
-        query = text("""
-            SELECT 
-                id_key, 
-                name, 
-                description, 
-                price::float, 
-                stock, 
-                category_id, 
-                COALESCE(sku, '') as sku, 
-                COALESCE(image_url, '') as image_url,
-                created_at, 
-                updated_at
-            FROM products 
-            WHERE (LOWER(name) LIKE LOWER(:search) 
-                   OR LOWER(description) LIKE LOWER(:search))
-              AND stock > 0
-            ORDER BY name
-            OFFSET :skip LIMIT :limit
-        """)
-        
-        result = db.execute(query, {
-            "search": search_term,
-            "skip": skip, 
-            "limit": limit
-        })
-        
-        products = []
-        columns = result.keys()
-        
-        for row in result:
-            product_dict = {}
-            for i, column in enumerate(columns):
-                value = row[i]
-                if column == 'price' and value is not None:
-                    try:
-                        value = float(value)
-                    except:
-                        value = 0.0
-                product_dict[column] = value
-            products.append(product_dict)
-        
-        # Contar resultados de búsqueda
-        count_query = text("""
-            SELECT COUNT(*) as count 
-            FROM products 
-            WHERE (LOWER(name) LIKE LOWER(:search) 
-                   OR LOWER(description) LIKE LOWER(:search))
-              AND stock > 0
-        """)
-        count_result = db.execute(count_query, {"search": search_term})
-        total_count = count_result.scalar()
+        products, total_count = ProductService(db).search(q, skip, limit)
         
-        return {
+        return conditional_cache.respond(request, {
             "success": True,
             "products": products,
             "query": q,
             "count": total_count,
             "skip": skip,
             "limit": limit
-        }
+        }, HttpCacheConfig.PRODUCT_LIST_MAX_AGE, [PRODUCTS_TAG])
         
     except Exception as e:
         logger.error(f"❌ Error en search_products: {str(e)}", exc_info=True)
@@ -373,57 +326,31 @@ async def search_products(
         )
 
 @router.get("/products/{product_id}")
-async def get_product_by_id(
+def get_product_by_id(
     product_id: int,
+    request: Request,
     db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+) -> Response:
     """
-    Obtener un producto por su ID.
+    Obtener un producto por su ID (cacheado en ProductService, con ETag / 304).
     """
+    not_modified = conditional_cache.not_modified(request, HttpCacheConfig.PRODUCT_ITEM_MAX_AGE)
+    if not_modified is not None:
+        return not_modified
+
     try:
-        query = text("""
-            SELECT 
-                id_key, 
-                name, 
-                description, 
-                price::float, 
-                stock, 
-                category_id, 
-                COALESCE(sku, '') as sku, 
-                COALESCE(image_url, '') as image_url,
-                created_at, 
-                updated_at
-            FROM products 
-            WHERE id_key = :product_id
-        """)
-        
-        result = db.execute(query, {"product_id": product_id})
+        product = ProductService(db).get_catalog_item(product_id)
         
-        # Usar fetchone para obtener un solo resultado
-        row = result.fetchone()
-        
-        if not row:
+        if not product:
             raise HTTPException(
                 status_code=404,
                 detail=f"Producto con ID {product_id} no encontrado"
             )
         
-        # Convertir a diccionario
-        product = {}
-        columns = result.keys()
-        for i, column in enumerate(columns):
-            value = row[i]
-            if column == 'price' and value is not None:
-                try:
-                    value = float(value)
-                except:
-                    value = 0.0
-            product[column] = value
-        
-        return {
+        return conditional_cache.respond(request, {
             "success": True,
             "data": product
-        }
+        }, HttpCacheConfig.PRODUCT_ITEM_MAX_AGE, [PRODUCTS_TAG])
         
     except HTTPException:
         raise
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from config.database import get_db
 from schemas.review_schema import ReviewCreate, ReviewUpdate, ReviewResponse
 from services.review_service import ReviewService
@@ -9,6 +9,9 @@ from repositories.review_repository import ReviewRepository
 from repositories.order_repository import OrderRepository
 from repositories.product_repository import ProductRepository  # Nuevo
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from utils.pagination import InvalidCursorError
+from services.http_cache import conditional_cache, product_reviews_tag
+from config.constants import HttpCacheConfig
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -31,14 +34,24 @@ def get_current_client_simple(
 
 @router.get("/reviews", response_model=List[ReviewResponse])
 def get_all_reviews(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
     review_service: ReviewService = Depends(get_review_service)
 ):
-    """Obtener todas las reviews (público)."""
+    """Obtener todas las reviews (público). Con `cursor` pagina por keyset."""
     try:
-        logger.info(f"📋 Obteniendo todas las reseñas (skip={skip}, limit={limit})")
-        return review_service.get_all_reviews(skip, limit)
+        logger.info(f"📋 Obteniendo todas las reseñas (skip={skip}, limit={limit}, cursor={cursor})")
+        if cursor is None:
+            return review_service.get_all_reviews(skip, limit)
+
+        reviews, next_cursor = review_service.get_reviews_page(cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return reviews
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
     except Exception as e:
         logger.error(f"❌ Error obteniendo todas las reseñas: {str(e)}")
         raise HTTPException(
@@ -79,12 +92,40 @@ def create_review(
 @router.get("/reviews/product/{product_id}", response_model=List[ReviewResponse])
 def get_reviews_by_product(
     product_id: int,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Tamaño de página (activa la paginación por cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
     review_service: ReviewService = Depends(get_review_service)
 ):
-    """Obtener todas las reseñas de un producto (público)."""
+    """
+    Obtener las reseñas de un producto (público). Con `limit`/`cursor` pagina por keyset.
+
+    Responde con ETag; si If-None-Match coincide con el validador cacheado
+    devuelve 304 sin consultar la base de datos.
+    """
+    not_modified = conditional_cache.not_modified(request, HttpCacheConfig.REVIEWS_MAX_AGE)
+    if not_modified is not None:
+        return not_modified
+
     try:
         logger.info(f"📋 Obteniendo reseñas del producto {product_id}")
-        return review_service.get_product_reviews(product_id)
+        next_cursor = None
+        if limit is None and cursor is None:
+            reviews = review_service.get_product_reviews(product_id)
+        else:
+            reviews, next_cursor = review_service.get_reviews_page(cursor, limit or 20, product_id)
+
+        response = conditional_cache.respond(
+            request,
+            [ReviewResponse.model_validate(review) for review in reviews],
+            HttpCacheConfig.REVIEWS_MAX_AGE,
+            [product_reviews_tag(product_id)]
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
     except Exception as e:
         logger.error(f"❌ Error obteniendo reseñas del producto {product_id}: {str(e)}")
         raise HTTPException(
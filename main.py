@@ -1,7 +1,9 @@
+import asyncio
 import os
 import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from utils.json_codec import AppJSONResponse
 import sys
 from datetime import datetime
 
@@ -33,6 +35,7 @@ except Exception as e:
 
 app = FastAPI(
     title="Ecommerce Backend API",
+    default_response_class=AppJSONResponse,
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
@@ -91,7 +94,20 @@ async def debug_db():
             "config_module": "ERROR"
         }
 
-# Configurar CORS
+# Estadísticas SQL por request (Server-Timing, detección de N+1) y rate limiting
+# (límite global por IP + políticas por ruta de RATE_LIMIT_ROUTES).
+# add_middleware envuelve: el último agregado queda por fuera. RequestIDMiddleware
+# define el request_id; el rate limiter corta los 429 antes de abrir las estadísticas SQL.
+# (import tardío: config importa config.database, que necesita los modelos ya cargados)
+from middleware.query_stats_middleware import QueryStatsMiddleware
+from middleware.rate_limiter import RateLimiterMiddleware
+from middleware.request_id_middleware import RequestIDMiddleware
+
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(RateLimiterMiddleware)
+app.add_middleware(RequestIDMiddleware)
+
+# Configurar CORS (por fuera de todo: preflights y 429 también llevan los headers CORS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_cors_origins(),
@@ -115,6 +131,36 @@ async def debug_routes():
             })
     return {"routes": routes}
 
+@app.get("/api/v1/debug/db-pool")
+async def debug_db_pool():
+    """Estadísticas del pool de conexiones para dimensionarlo"""
+    from config.database import get_pool_stats
+    return get_pool_stats()
+
+@app.get("/api/v1/debug/cache")
+async def debug_cache():
+    """Contadores de aciertos/fallos por nivel de caché (L1 local / L2 Redis)"""
+    from services.cache_service import cache_service
+    return cache_service.get_stats()
+
+@app.get("/api/v1/debug/http-cache")
+async def debug_http_cache():
+    """Respuestas 304 servidas desde el validador cacheado vs. respuestas completas"""
+    from services.http_cache import conditional_cache
+    return conditional_cache.stats()
+
+@app.get("/api/v1/debug/password-hashing")
+async def debug_password_hashing():
+    """Profundidad de cola y rechazos del executor de hashing de contraseñas"""
+    from services.password_hasher import password_hasher
+    return password_hasher.stats()
+
+@app.get("/api/v1/debug/rate-limit")
+async def debug_rate_limit():
+    """Backend activo (Redis/local) y tamaño de la tabla local de rate limiting"""
+    from middleware.rate_limit_engine import rate_limit_engine
+    return rate_limit_engine.stats()
+
 @app.get("/api/v1/docs/json")
 async def openapi_json():
     """Ver el esquema OpenAPI completo"""
@@ -137,6 +183,10 @@ async def startup_event():
                 logger.error("❌ Failed to create tables")
 
             initialize_models()
+
+            # Rollups de analytics: refresco incremental en segundo plano
+            from services.analytics_service import run_refresh_loop
+            app.state.analytics_refresh_task = asyncio.create_task(run_refresh_loop())
         else:
             logger.warning("⚠️ Database connection failed - running in degraded mode")
 
@@ -144,6 +194,23 @@ async def startup_event():
         logger.error(f"❌ Startup error: {e}", exc_info=True)
         logger.warning("⚠️ Continuing despite startup errors")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    try:
+        from config import redis_config
+        from config.database import dispose_async_engine
+        from services.cache_service import cache_service
+        from services.password_hasher import password_hasher
+        refresh_task = getattr(app.state, "analytics_refresh_task", None)
+        if refresh_task is not None:
+            refresh_task.cancel()
+        await dispose_async_engine()
+        cache_service.close()
+        await redis_config.aclose()
+        password_hasher.shutdown()
+    except Exception as e:
+        logger.error(f"❌ Shutdown error: {e}", exc_info=True)
+
 @app.get("/")
 async def root():
     return {
@@ -179,6 +246,8 @@ try:
     from controllers.address_controller import router as address_router
     from controllers.bill_controller import router as bill_router
     from controllers.review_controller import router as review_router
+    from controllers.analytics_controller import router as analytics_router
+    from controllers.admin_controller import router as admin_router
 
     logger.info("✓ Routers importados correctamente")
 
@@ -190,6 +259,8 @@ try:
     app.include_router(address_router, prefix="/api/v1", tags=["Addresses"])
     app.include_router(bill_router, prefix="/api/v1", tags=["Bills"])
     app.include_router(review_router, prefix="/api/v1", tags=["Reviews"])
+    app.include_router(analytics_router, prefix="/api/v1", tags=["Analytics"])
+    app.include_router(admin_router, prefix="/api/v1", tags=["Admin"])
 
     logger.info("✓ Routers registrados correctamente")
 
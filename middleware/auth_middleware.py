@@ -1,37 +1,36 @@
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from jose import jwt
 from config.database import get_db
-from models.client import ClientModel
-import os
-
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-ALGORITHM = "HS256"
+from services.principal_service import Principal, decode_client_id, principal_cache
 
 security = HTTPBearer()
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        client_id = payload.get("sub")
-        
-        if client_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        client = db.query(ClientModel).filter(
-            ClientModel.id_key == int(client_id),
-            ClientModel.is_active == True
-        ).first()
-        
-        if not client:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        return client
-        
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+) -> Principal:
+    """
+    Resolve the authenticated client from the bearer token.
+
+    The client is served from the principal cache, so the database is only
+    queried on a cache miss (first request, TTL expiry or after the client
+    was updated/deactivated).
+    """
+    client_id = decode_client_id(credentials.credentials)
+
+    principal = principal_cache.get(client_id, db)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    return principal
+
+
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Only administrators (client id 0) may use admin-only endpoints."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo administradores pueden acceder a este recurso"
+        )
+    return current_user
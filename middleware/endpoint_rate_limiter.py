@@ -4,16 +4,25 @@ Endpoint-Specific Rate Limiter
 Provides decorators for applying custom rate limits to specific endpoints.
 While global rate limiting protects the entire API, endpoint-specific limits
 protect expensive or abuse-prone operations.
+
+Limits are enforced by the shared rate limit engine (atomic GCRA in Redis,
+per-process token buckets when Redis is unavailable).
 """
 import logging
 import functools
-from typing import Callable
+from typing import Callable, Optional
 from fastapi import Request, HTTPException, status
-from config.redis_config import get_redis_client
+
+from middleware.rate_limit_engine import RateLimitPolicy, client_ip, rate_limit_engine
 
 logger = logging.getLogger(__name__)
 
 
+def get_client_ip(request: Request) -> str:
+    """Extract client IP from request (trusted proxy hop, then socket peer)"""
+    return client_ip(request.scope)
+
+
 class EndpointRateLimiter:
     """
     Decorator for endpoint-specific rate limiting
@@ -21,23 +30,24 @@ class EndpointRateLimiter:
     Usage:
         @app.post("/order_details")
         @EndpointRateLimiter(calls=10, period=60)
-        async def create_order(data: OrderSchema):
+        async def create_order(request: Request, data: OrderSchema):
             ...
 
     This allows 10 order creations per 60 seconds per IP address.
     """
 
-    def __init__(self, calls: int, period: int):
+    def __init__(self, calls: int, period: int, name: Optional[str] = None):
         """
         Initialize rate limiter
 
         Args:
             calls: Maximum number of calls allowed
             period: Time period in seconds
+            name: Policy name (default: the decorated function's qualified name)
         """
         self.calls = calls
         self.period = period
-        self.redis_client = get_redis_client()
+        self.name = name
 
     def __call__(self, func: Callable) -> Callable:
         """
@@ -49,71 +59,42 @@ class EndpointRateLimiter:
         Returns:
             Wrapped function with rate limiting
         """
+        policy = RateLimitPolicy(
+            name=self.name or f"endpoint:{func.__module__}.{func.__qualname__}",
+            calls=self.calls,
+            period=self.period,
+        )
+
         @functools.wraps(func)
-        async def wrapper(request: Request, *args, **kwargs):
-            # Get client IP
-            client_ip = request.client.host if request.client else "unknown"
-
-            # Build rate limit key for this endpoint
-            endpoint_path = request.url.path
-            key = f"rate_limit:endpoint:{endpoint_path}:{client_ip}"
-
-            # Check if Redis is available
-            if self.redis_client is None:
-                logger.warning("Redis not available - endpoint rate limiting disabled")
-                return await func(request, *args, **kwargs)
-
-            try:
-                # Get current request count
-                current = self.redis_client.get(key)
-
-                if current is None:
-                    # First request in this period
-                    pipe = self.redis_client.pipeline()
-                    pipe.set(key, 1)
-                    pipe.expire(key, self.period)
-                    pipe.execute()
-                    remaining = self.calls - 1
-                else:
-                    current = int(current)
-
-                    if current >= self.calls:
-                        # Rate limit exceeded
-                        ttl = self.redis_client.ttl(key)
-                        logger.warning(
-                            f"Endpoint rate limit exceeded for {client_ip} "
-                            f"on {endpoint_path}: {current}/{self.calls}"
-                        )
-                        raise HTTPException(
-                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                            detail=f"Rate limit exceeded for this endpoint. "
-                                   f"Maximum {self.calls} requests per {self.period} seconds. "
-                                   f"Try again in {ttl} seconds.",
-                            headers={
-                                "X-RateLimit-Limit": str(self.calls),
-                                "X-RateLimit-Remaining": "0",
-                                "X-RateLimit-Reset": str(ttl),
-                                "Retry-After": str(ttl),
-                            }
-                        )
-
-                    # Increment counter
-                    self.redis_client.incr(key)
-                    remaining = self.calls - current - 1
-
-                # Execute the endpoint
-                logger.debug(
-                    f"Endpoint rate limit check passed for {client_ip} "
-                    f"on {endpoint_path}: {remaining} remaining"
+        async def wrapper(*args, **kwargs):
+            # Get request from kwargs or args
+            request = kwargs.get('request') or next(
+                (arg for arg in args if isinstance(arg, Request)), None
+            )
+            if request is None:
+                return await func(*args, **kwargs)
+
+            client_ip = get_client_ip(request)
+            result = await rate_limit_engine.ahit(policy, client_ip)
+
+            if not result.allowed:
+                logger.warning(
+                    f"Endpoint rate limit exceeded for {client_ip} "
+                    f"on {request.url.path}: {self.calls}/{self.period}s"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Rate limit exceeded for this endpoint. "
+                           f"Maximum {self.calls} requests per {self.period} seconds. "
+                           f"Try again in {result.retry_after} seconds.",
+                    headers=result.headers()
                 )
-                return await func(request, *args, **kwargs)
-
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.error(f"Error in endpoint rate limiting: {e}")
-                # Fail open - allow request if rate limiting fails
-                return await func(request, *args, **kwargs)
+
+            logger.debug(
+                f"Endpoint rate limit check passed for {client_ip} "
+                f"on {request.url.path}: {result.remaining} remaining"
+            )
+            return await func(*args, **kwargs)
 
         return wrapper
 
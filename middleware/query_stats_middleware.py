@@ -0,0 +1,50 @@
+"""
+Query Stats Middleware
+Collects the SQL queries run by every HTTP request (see config/query_stats.py).
+Features:
+- Adds a Server-Timing header with query count and database time
+- Logs requests that repeat the same statement (possible N+1)
+- Feeds the top offenders report at /api/v1/admin/sql-stats
+Must run inside RequestIDMiddleware so log lines carry the request id; the
+record itself is bound to the request's context through query_stats_var.
+Pure ASGI middleware, like RequestIDMiddleware.
+Usage:
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(RequestIDMiddleware)  # added last = outermost
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.constants import QueryStatsConfig
+from config.query_stats import query_collector, query_stats_var
+from middleware.request_id_middleware import request_id_var
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware that opens and closes the per-request query record.
+    Queries issued after the response headers are sent (streaming bodies)
+    are still counted for N+1 detection, but not in Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not QueryStatsConfig.ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_collector.start(request_id_var.get(), scope["method"], scope["path"])
+        token = query_stats_var.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats_var.reset(token)
+            query_collector.finish(stats)
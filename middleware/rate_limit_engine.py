@@ -0,0 +1,355 @@
+"""
+Rate Limit Engine
+
+Single rate limiting engine shared by RateLimiterMiddleware and the
+EndpointRateLimiter decorator.
+
+- Redis: GCRA (generic cell rate algorithm) evaluated by a Lua script, so
+  the check-and-update is atomic and costs one round-trip. GCRA stores a
+  single timestamp per key and behaves like a sliding window: a client may
+  burst up to `calls` requests, then gets one request every period/calls.
+- Fallback: when Redis is not configured (Render) or a call fails, a
+  per-process token bucket table with LRU eviction enforces the same policy.
+  Limits are then per worker instead of global, but never switched off.
+
+Async callers (RateLimiterMiddleware, EndpointRateLimiter) use ahit(), which
+runs the same script over the redis.asyncio pool instead of blocking the
+event loop; hit() remains for sync code.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from config import redis_config
+from config.constants import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: limiter key
+# ARGV[1]: emission interval in ms (period / calls)
+# ARGV[2]: period in ms (burst tolerance + one emission interval)
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}
+GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, allow_at - now, tat - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), 0, new_tat - now}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Allow `calls` requests per `period` seconds for each client"""
+    name: str
+    calls: int
+    period: int
+    method: Optional[str] = None
+    path_prefix: Optional[str] = None
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method and self.method != method:
+            return False
+        return self.path_prefix is None or path.startswith(self.path_prefix)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    period: int
+    remaining: int
+    retry_after: int  # seconds until the next request is allowed (0 if allowed)
+    reset_after: int  # seconds until the full quota is available again
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset_after),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def _ceil_seconds(milliseconds: float) -> int:
+    return max(0, int(-(-milliseconds // 1000)))
+
+
+def parse_route_policies(spec: str) -> List[RateLimitPolicy]:
+    """
+    Parse per-route policies from "METHOD /path=calls/period" entries
+
+    Args:
+        spec: Comma separated entries (METHOD may be omitted to match any method)
+
+    Returns:
+        Policies, longest path prefix first so the most specific one wins
+    """
+    policies = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            route, rate = entry.rsplit("=", 1)
+            calls, period = (int(value) for value in rate.split("/", 1))
+            parts = route.split()
+            method, path = (parts[0].upper(), parts[1]) if len(parts) == 2 else (None, parts[0])
+            policies.append(RateLimitPolicy(
+                name=f"{method or 'ANY'}:{path}",
+                calls=calls,
+                period=period,
+                method=method,
+                path_prefix=path,
+            ))
+        except ValueError:
+            logger.error(f"Invalid rate limit policy ignored: '{entry}'")
+    return sorted(policies, key=lambda policy: len(policy.path_prefix or ""), reverse=True)
+
+
+class LocalTokenBucketTable:
+    """
+    Thread-safe per-process token buckets with bounded memory
+
+    Each key holds (tokens, last_refill). The table keeps at most
+    max_entries keys and evicts the least recently used one; an evicted
+    client simply starts again with a full bucket.
+    """
+
+    def __init__(self, max_entries: int = RateLimitConfig.LOCAL_MAX_BUCKETS):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def hit(self, key: str, calls: int, period: int) -> RateLimitResult:
+        """
+        Take one token from a bucket
+
+        Args:
+            key: Bucket key
+            calls: Bucket capacity
+            period: Seconds to refill the whole bucket
+
+        Returns:
+            RateLimitResult
+        """
+        rate = calls / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(calls), now))
+            tokens = min(float(calls), tokens + (now - last) * rate)
+
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=calls,
+            period=period,
+            remaining=int(tokens),
+            retry_after=0 if allowed else _ceil_seconds((1.0 - tokens) / rate * 1000),
+            reset_after=_ceil_seconds((calls - tokens) / rate * 1000),
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimitEngine:
+    """
+    Rate limiter with a Redis (GCRA/Lua) backend and a local token bucket fallback
+    """
+
+    def __init__(self, key_prefix: str = RateLimitConfig.KEY_PREFIX):
+        self.key_prefix = key_prefix
+        self.local = LocalTokenBucketTable()
+        self._script = None
+        self._script_client = None
+        self._async_script = None
+        self._async_script_client = None
+        self._redis_failing = False
+
+    def _get_script(self):
+        # Re-register if the Redis client was replaced (tests, reconnects)
+        client = redis_config.get_redis_client()
+        if client is None:
+            return None
+        if client is not self._script_client:
+            self._script = client.register_script(GCRA_LUA)
+            self._script_client = client
+        return self._script
+
+    def _get_async_script(self):
+        client = redis_config.get_async_redis_client()
+        if client is None:
+            return None
+        if client is not self._async_script_client:
+            self._async_script = client.register_script(GCRA_LUA)
+            self._async_script_client = client
+        return self._async_script
+
+    def _key(self, policy: RateLimitPolicy, identity: str) -> str:
+        return f"{self.key_prefix}:{policy.name}:{identity}"
+
+    def _redis_result(self, policy: RateLimitPolicy, reply) -> RateLimitResult:
+        allowed, remaining, retry_ms, reset_ms = reply
+        if self._redis_failing:
+            logger.info("✅ Rate limiting back on Redis")
+            self._redis_failing = False
+        return RateLimitResult(
+            allowed=bool(int(allowed)),
+            limit=policy.calls,
+            period=policy.period,
+            remaining=max(0, int(remaining)),
+            retry_after=_ceil_seconds(float(retry_ms)),
+            reset_after=_ceil_seconds(float(reset_ms)),
+        )
+
+    def _redis_failed(self, error: Exception) -> None:
+        if not self._redis_failing:
+            logger.error(f"Rate limiting on Redis failed, using local buckets: {error}")
+            self._redis_failing = True
+
+    @staticmethod
+    def _script_args(policy: RateLimitPolicy) -> List[float]:
+        return [policy.period * 1000 / policy.calls, policy.period * 1000]
+
+    def hit(self, policy: RateLimitPolicy, identity: str) -> RateLimitResult:
+        """
+        Count one request for a client under a policy
+
+        Args:
+            policy: Rate limit policy
+            identity: Client identity (usually the IP address)
+
+        Returns:
+            RateLimitResult
+        """
+        key = self._key(policy, identity)
+
+        script = self._get_script()
+        if script is not None:
+            try:
+                return self._redis_result(policy, script(keys=[key], args=self._script_args(policy)))
+            except Exception as e:
+                self._redis_failed(e)
+
+        return self.local.hit(key, policy.calls, policy.period)
+
+    async def ahit(self, policy: RateLimitPolicy, identity: str) -> RateLimitResult:
+        """
+        Count one request for a client under a policy, without blocking the event loop
+
+        Args:
+            policy: Rate limit policy
+            identity: Client identity (usually the IP address)
+
+        Returns:
+            RateLimitResult
+        """
+        script = self._get_async_script()
+        if script is None:
+            if redis_config.get_redis_client() is not None:
+                # Only a sync client configured: keep its round-trip off the loop
+                return await run_in_threadpool(self.hit, policy, identity)
+            return self.local.hit(self._key(policy, identity), policy.calls, policy.period)
+
+        key = self._key(policy, identity)
+        try:
+            return self._redis_result(policy, await script(keys=[key], args=self._script_args(policy)))
+        except Exception as e:
+            self._redis_failed(e)
+
+        return self.local.hit(key, policy.calls, policy.period)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get engine statistics
+
+        Returns:
+            Dictionary with backend and local table figures
+        """
+        backend = "redis" if self._get_script() is not None and not self._redis_failing else "local"
+        return {
+            "backend": backend,
+            "local_buckets": len(self.local),
+            "local_max_buckets": self.local.max_entries,
+            "local_evictions": self.local.evictions,
+        }
+
+
+# Global rate limit engine and per-route policies
+rate_limit_engine = RateLimitEngine()
+route_policies = parse_route_policies(RateLimitConfig.ROUTE_POLICIES)
+
+
+def match_route_policy(method: str, path: str) -> Optional[RateLimitPolicy]:
+    """
+    Find the per-route policy for a request
+
+    Args:
+        method: HTTP method
+        path: Request path
+
+    Returns:
+        The most specific matching policy, or None
+    """
+    for policy in route_policies:
+        if policy.matches(method, path):
+            return policy
+    return None
+
+
+def client_ip(scope: Scope, trusted_hops: int = RateLimitConfig.TRUSTED_PROXY_HOPS) -> str:
+    """
+    Client address used as the rate limit identity
+
+    Clients can send any X-Forwarded-For they like; each trusted proxy only
+    appends the address it received the connection from. The entry added
+    by the outermost trusted proxy (trusted_hops from the right) is the
+    first one the client cannot forge. Without enough entries, or with no
+    trusted proxies, the socket peer is used.
+
+    Args:
+        scope: ASGI connection scope
+        trusted_hops: Number of proxies in front of the app
+
+    Returns:
+        Client IP address
+    """
+    if trusted_hops > 0:
+        forwarded = Headers(scope=scope).get("X-Forwarded-For")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if len(hops) >= trusted_hops:
+                return hops[-trusted_hops]
+
+    client = scope.get("client")
+    return client[0] if client else "unknown"
@@ -2,256 +2,146 @@
 Rate Limiting Middleware
 
 Protects the API from abuse by limiting the number of requests
-per client IP address using Redis.
+per client IP address.
+
+RateLimiterMiddleware is a pure ASGI middleware on top of the shared rate
+limit engine: a global per-IP policy plus optional per-route policies
+(RATE_LIMIT_ROUTES), each checked atomically with one non-blocking Redis
+round-trip (redis.asyncio), or against per-process token buckets when Redis
+is unavailable.
 """
 import os
 import logging
-from typing import Callable
-from fastapi import Request, HTTPException, status
+from typing import Optional
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from config.redis_config import get_redis_client
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.constants import RateLimitConfig
+from middleware.endpoint_rate_limiter import EndpointRateLimiter  # noqa: F401  (backwards compatible import)
+from middleware.rate_limit_engine import (
+    RateLimitEngine,
+    RateLimitPolicy,
+    client_ip,
+    match_route_policy,
+    rate_limit_engine,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+class RateLimiterMiddleware:
     """
-    Rate limiting middleware using Redis
+    Rate limiting middleware
 
-    Limits requests per IP address within a time window.
+    Limits requests per IP address within a time window, plus per-route
+    policies for expensive or abuse-prone endpoints.
     """
 
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = RateLimitConfig.DEFAULT_CALLS,
+        period: int = RateLimitConfig.DEFAULT_PERIOD,
+        engine: Optional[RateLimitEngine] = None
+    ):
         """
         Initialize rate limiter
 
         Args:
-            app: FastAPI application
+            app: ASGI application
             calls: Maximum number of requests allowed
             period: Time window in seconds
+            engine: Rate limit engine (default: shared engine)
         """
-        super().__init__(app)
+        self.app = app
         self.calls = int(os.getenv('RATE_LIMIT_CALLS', str(calls)))
         self.period = int(os.getenv('RATE_LIMIT_PERIOD', str(period)))
         self.enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
-        self.redis_client = get_redis_client()
+        self.engine = engine or rate_limit_engine
+        self.policy = RateLimitPolicy(name="global", calls=self.calls, period=self.period)
 
-        if self.enabled and self.redis_client:
+        if self.enabled:
             logger.info(
                 f"✅ Rate limiting enabled: {self.calls} requests per "
-                f"{self.period} seconds per IP"
+                f"{self.period} seconds per IP ({self.engine.stats()['backend']} backend)"
             )
         else:
-            logger.warning("⚠️  Rate limiting disabled (Redis not available)")
+            logger.warning("⚠️  Rate limiting disabled (RATE_LIMIT_ENABLED=false)")
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with rate limiting
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/handler
-
-        Returns:
-            HTTP response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Skip if disabled or Redis unavailable
-        if not self.enabled or not self.redis_client:
-            return await call_next(request)
+        # Skip non-HTTP traffic or if disabled
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # CORS preflights are answered by CORSMiddleware and must not spend the budget
+        if scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # Skip rate limiting for health check endpoint
-        if request.url.path == "/health_check":
-            return await call_next(request)
+        if scope["path"] == "/health_check":
+            await self.app(scope, receive, send)
+            return
 
         # Get client IP
-        client_ip = self._get_client_ip(request)
-
-        # Check rate limit
-        if not self._is_allowed(client_ip):
-            logger.warning(f"⚠️  Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
+        client_ip = self._get_client_ip(scope)
+
+        # Check the global limit, then the route's own policy (if any)
+        result = await self.engine.ahit(self.policy, client_ip)
+        if result.allowed:
+            route_policy = match_route_policy(scope["method"], scope["path"])
+            if route_policy is not None:
+                route_result = await self.engine.ahit(route_policy, client_ip)
+                if not route_result.allowed or route_result.remaining < result.remaining:
+                    result = route_result
+
+        if not result.allowed:
+            logger.warning(f"⚠️  Rate limit exceeded for IP: {client_ip} on {scope['path']}")
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
-                    "detail": f"Rate limit exceeded. Maximum {self.calls} requests "
-                              f"per {self.period} seconds.",
-                    "retry_after": self.period
+                    "detail": f"Rate limit exceeded. Maximum {result.limit} requests "
+                              f"per {result.period} seconds.",
+                    "retry_after": result.retry_after
                 },
-                headers={
-                    "Retry-After": str(self.period),
-                    "X-RateLimit-Limit": str(self.calls),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(self.period)
-                }
+                headers=result.headers()
             )
+            await response(scope, receive, send)
+            return
 
-        # Process request
-        response = await call_next(request)
+        async def send_with_headers(message: Message) -> None:
+            # Add rate limit headers to response
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in result.headers().items():
+                    headers[name] = value
+            await send(message)
 
-        # Add rate limit headers to response
-        remaining = self._get_remaining(client_ip)
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(self.period)
-
-        return response
-
-    def _get_client_ip(self, request: Request) -> str:
-        """
-        Extract client IP from request
-
-        Args:
-            request: HTTP request
+        # Process request
+        await self.app(scope, receive, send_with_headers)
 
-        Returns:
-            Client IP address
+    def _get_client_ip(self, scope: Scope) -> str:
         """
-        # Check X-Forwarded-For header (from reverse proxy)
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
+        Extract client IP from the ASGI scope
 
-        # Check X-Real-IP header
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip
-
-        # Fallback to direct client
-        return request.client.host if request.client else "unknown"
-
-    def _is_allowed(self, client_ip: str) -> bool:
-        """
-        Check if client is allowed to make request with atomic Redis operations
+        Only the X-Forwarded-For hop added by the trusted proxy is used (see
+        client_ip), so clients cannot dodge the limit by forging the header.
 
         Args:
-            client_ip: Client IP address
+            scope: ASGI connection scope
 
         Returns:
-            True if allowed, False if rate limit exceeded
-        """
-        try:
-            key = f"rate_limit:{client_ip}"
-
-            # Use pipeline to avoid race condition between incr and expire
-            pipe = self.redis_client.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, self.period)
-            results = pipe.execute()
-
-            # ✅ Verify both operations succeeded
-            if len(results) < 2:
-                logger.error(
-                    f"Pipeline returned incomplete results for {client_ip}: "
-                    f"expected 2, got {len(results)}"
-                )
-                return True  # Fail open on error
-
-            current = results[0]  # New counter value
-            expire_set = results[1]  # 1 if success, 0 if key doesn't exist
-
-            # ✅ If expire failed, force set expiration
-            if not expire_set:
-                logger.warning(
-                    f"Failed to set expiration for rate limit key: {key}, "
-                    f"forcing expiration"
-                )
-                try:
-                    self.redis_client.expire(key, self.period)
-                except Exception as exp_error:
-                    logger.error(f"Failed to force expiration for {key}: {exp_error}")
-                    # Delete key to prevent permanent block
-                    try:
-                        self.redis_client.delete(key)
-                    except Exception:
-                        pass
-
-            # Check if limit exceeded
-            return current <= self.calls
-
-        except Exception as e:
-            logger.error(f"Rate limiting error for {client_ip}: {e}")
-            # On error, allow request (fail open)
-            return True
-
-    def _get_remaining(self, client_ip: str) -> int:
-        """
-        Get remaining requests for client
-
-        Args:
-            client_ip: Client IP address
-
-        Returns:
-            Number of remaining requests
+            Client IP address
         """
-        try:
-            key = f"rate_limit:{client_ip}"
-            current = self.redis_client.get(key)
-
-            if current is None:
-                return self.calls
-
-            remaining = self.calls - int(current)
-            return max(0, remaining)
-
-        except Exception as e:
-            logger.error(f"Error getting remaining requests for {client_ip}: {e}")
-            return self.calls
-
-
-# Alternative: Decorator-based rate limiter for specific endpoints
-class EndpointRateLimiter:
-    """
-    Decorator for endpoint-specific rate limiting
-
-    Usage:
-        rate_limiter = EndpointRateLimiter(calls=10, period=60)
-
-        @app.get("/expensive-endpoint")
-        @rate_limiter
-        async def expensive_endpoint():
-            return {"message": "success"}
-    """
-
-    def __init__(self, calls: int = 10, period: int = 60):
-        self.calls = calls
-        self.period = period
-        self.redis_client = get_redis_client()
-
-    def __call__(self, func):
-        async def wrapper(*args, **kwargs):
-            # Get request from kwargs or args
-            request = kwargs.get('request') or next(
-                (arg for arg in args if isinstance(arg, Request)), None
-            )
-
-            if not request or not self.redis_client:
-                return await func(*args, **kwargs)
-
-            client_ip = self._get_client_ip(request)
-            key = f"endpoint_rate_limit:{func.__name__}:{client_ip}"
-
-            # Check rate limit using pipeline to avoid race condition
-            pipe = self.redis_client.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, self.period)
-            results = pipe.execute()
-            current = results[0]
-
-            if current > self.calls:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Endpoint rate limit exceeded. Maximum {self.calls} "
-                           f"requests per {self.period} seconds."
-                )
-
-            return await func(*args, **kwargs)
-
-        return wrapper
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP from request"""
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
\ No newline at end of file
+        return client_ip(scope)
@@ -8,6 +8,8 @@ Features:
 - Adds request ID to response headers
 - Logs request start, completion, and errors with timing
 - Includes request ID in all log messages via logging filter
+Implemented as a pure ASGI middleware (no BaseHTTPMiddleware), so it adds no
+extra task or body stream wrapping and streaming responses pass straight through.
 Usage:
     app.add_middleware(RequestIDMiddleware)
 """
@@ -16,16 +18,15 @@ import uuid
 import logging
 import time
 from contextvars import ContextVar
-from typing import Callable
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Configure logging
 logger = logging.getLogger(__name__)
 request_id_var: ContextVar[str] = ContextVar('request_id', default=None)
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+class RequestIDMiddleware:
     """
     Middleware that adds a unique request ID to every HTTP request.
     The request ID is:
@@ -35,64 +36,79 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
     - Used for tracing requests across services
     """
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response]
-    ) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and inject request ID.
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/route handler
-        Returns:
-            HTTP response with X-Request-ID and X-Response-Time headers
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get or generate request ID
-        request_id = request.headers.get('X-Request-ID') or str(uuid.uuid4())
-        request.state.request_id = request_id
+        request_id = _header(scope, b"x-request-id") or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
 
         # Set request ID in context for logging
-        request_id_var.set(request_id)
+        token = request_id_var.set(request_id)
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
 
         # Log request start
-        start_time = time.time()
+        start_time = time.perf_counter()
         logger.info(
-            f"[{request_id}] → {request.method} {request.url.path} "
-            f"(client: {request.client.host if request.client else 'unknown'})"
+            f"[{request_id}] → {method} {path} "
+            f"(client: {client[0] if client else 'unknown'})"
         )
 
-        try:
-            # Process request
-            response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate duration up to the response headers
+                duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
 
-            # Calculate duration
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+                # Log completion
+                logger.info(
+                    f"[{request_id}] ← {method} {path} "
+                    f"- {message['status']} ({duration_ms}ms)"
+                )
 
-            # Log completion
-            logger.info(
-                f"[{request_id}] ← {request.method} {request.url.path} "
-                f"- {response.status_code} ({duration_ms}ms)"
-            )
+                # Add headers
+                headers = MutableHeaders(scope=message)
+                headers['X-Request-ID'] = request_id
+                headers['X-Response-Time'] = f"{duration_ms}ms"
 
-            # Add headers
-            response.headers['X-Request-ID'] = request_id
-            response.headers['X-Response-Time'] = f"{duration_ms}ms"
+            await send(message)
 
-            return response
+        try:
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as e:
             # Log errors
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             logger.error(
-                f"[{request_id}] ✗ {request.method} {request.url.path} "
+                f"[{request_id}] ✗ {method} {path} "
                 f"- ERROR: {str(e)} ({duration_ms}ms)"
             )
             raise
 
         finally:
             # Clean up context
-            request_id_var.set(None)
+            request_id_var.reset(token)
+
+def _header(scope: Scope, name: bytes) -> str:
+    """Read a request header straight from the ASGI scope (name in lowercase)."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
 
 class RequestIDFilter(logging.Filter):
     """
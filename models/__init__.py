@@ -19,6 +19,15 @@ try:
     from .bill import BillModel
     from .address import AddressModel
     from .review import ReviewModel
+    from .product_rating import ProductRatingModel
+    from .sales_rollup import (
+        SalesDailyModel,
+        SalesDailyCategoryModel,
+        SalesDailyProductModel,
+        AnalyticsRefreshStateModel,
+    )
+    from .idempotency_key import IdempotencyKeyModel
+    from .bill_sequence import BillSequenceModel
 
     logger.info("📦 Todos los modelos importados correctamente")
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date
+from models.base_model import Base
+
+
+class BillSequenceModel(Base):
+    """
+    Último número de factura emitido por día.
+
+    La fila del día se incrementa dentro de la misma transacción que crea la
+    factura, así que un rollback devuelve el número y la numeración queda
+    sin huecos ni colisiones.
+    """
+    __tablename__ = "bill_sequences"
+
+    day = Column(Date, primary_key=True)
+    last_number = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<BillSequence(day={self.day}, last_number={self.last_number})>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from models.base_model import Base
+
+
+class IdempotencyKeyModel(Base):
+    """
+    Primera respuesta de cada Idempotency-Key (respaldo de Redis).
+
+    Una fila en estado 'in_progress' marca el intento en curso; al terminar
+    guarda el código y el cuerpo de la respuesta para repetirlos en los
+    reintentos del cliente.
+    """
+    __tablename__ = "idempotency_keys"
+
+    client_id = Column(Integer, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)
+    owner = Column(String(32), nullable=False)
+    response_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey(client_id={self.client_id}, key={self.key}, status={self.status})>"
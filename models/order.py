@@ -1,6 +1,6 @@
 # models/order.py
 from __future__ import annotations
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.base_model import BaseModel
@@ -24,6 +24,16 @@ class OrderModel(BaseModel):
     client_id_key = Column(Integer, ForeignKey("clients.id_key"))
     bill_id = Column(Integer, ForeignKey("bills.id_key"), nullable=True)
 
+    # Paginación por cursor sobre (date, id_key) DESC: por cliente, por
+    # estado y sin filtro (listado de administración)
+    # updated_at: marca de agua del refresco incremental de analytics
+    __table_args__ = (
+        Index("ix_orders_client_date_id", "client_id_key", "date", "id_key"),
+        Index("ix_orders_status_date_id", "status", "date", "id_key"),
+        Index("ix_orders_date_id", "date", "id_key"),
+        Index("ix_orders_updated_at", "updated_at"),
+    )
+
     # Relación con BillModel (usando strings para evitar importaciones circulares)
     bill = relationship(
         "BillModel",
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from models.base_model import Base
+
+
+class ProductRatingModel(Base):
+    """
+    Agregado de calificaciones por producto.
+
+    Se mantiene incrementalmente desde ReviewRepository en la misma
+    transacción que la reseña, así el resumen de un producto es una sola
+    lectura por clave primaria.
+    """
+    __tablename__ = "product_ratings"
+
+    product_id = Column(Integer, ForeignKey("products.id_key", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    count_1 = Column(Integer, nullable=False, default=0)
+    count_2 = Column(Integer, nullable=False, default=0)
+    count_3 = Column(Integer, nullable=False, default=0)
+    count_4 = Column(Integer, nullable=False, default=0)
+    count_5 = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.review_count if self.review_count else 0
+
+    @property
+    def distribution(self) -> dict:
+        return {str(i): getattr(self, f"count_{i}") for i in range(1, 6)}
+
+    def __repr__(self):
+        return f"<ProductRating(product_id={self.product_id}, review_count={self.review_count})>"
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
@@ -20,6 +20,8 @@ class ReviewModel(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range'),
+        # Paginación por cursor de las reseñas de un producto
+        Index('ix_reviews_product_id_key', 'product_id', 'id_key'),
     )
 
     # Relaciones
@@ -0,0 +1,74 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, String, Index
+from sqlalchemy.sql import func
+from models.base_model import Base
+
+
+class SalesDailyModel(Base):
+    """
+    Ventas totales por día (excluye órdenes canceladas).
+
+    Las tablas sales_daily* son agregados derivados de orders/order_details;
+    AnalyticsService las refresca incrementalmente y los dashboards leen
+    solo de ellas.
+    """
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units = Column(Integer, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SalesDaily(day={self.day}, revenue={self.revenue})>"
+
+
+class SalesDailyCategoryModel(Base):
+    """Ventas por categoría y día."""
+    __tablename__ = "sales_daily_category"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units = Column(Integer, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_sales_daily_category_category_day", "category_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<SalesDailyCategory(day={self.day}, category_id={self.category_id})>"
+
+
+class SalesDailyProductModel(Base):
+    """Ventas por producto y día."""
+    __tablename__ = "sales_daily_product"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, nullable=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units = Column(Integer, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_sales_daily_product_product_day", "product_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<SalesDailyProduct(day={self.day}, product_id={self.product_id})>"
+
+
+class AnalyticsRefreshStateModel(Base):
+    """
+    Marca de agua (high-water mark) de cada rollup: el mayor
+    orders.updated_at ya incorporado.
+    """
+    __tablename__ = "analytics_refresh_state"
+
+    name = Column(String(50), primary_key=True)
+    high_water_mark = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<AnalyticsRefreshState(name={self.name}, high_water_mark={self.high_water_mark})>"
@@ -0,0 +1,236 @@
+"""
+Async BaseRepository implementation for AsyncSession-backed handlers
+"""
+from typing import Type, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.base_model import BaseModel
+from schemas.base_schema import BaseSchema
+from repositories.base_repository_impl import (
+    InstanceNotFoundError,
+    apply_changes,
+    validate_pagination,
+)
+from utils.logging_utils import get_sanitized_logger
+from utils.pagination import paginate, page_results
+
+
+class AsyncBaseRepositoryImpl:
+    """
+    Async counterpart of BaseRepositoryImpl
+
+    Exposes the same find/find_all/save/update/remove/save_all contract,
+    but every database round-trip is awaited so async route handlers
+    never block the event loop.
+    """
+
+    def __init__(self, model: Type[BaseModel], schema: Type[BaseSchema], db: AsyncSession):
+        self._model = model
+        self._schema = schema
+        self._session = db
+        self.logger = get_sanitized_logger(__name__)
+
+    @property
+    def session(self) -> AsyncSession:
+        """Get the async database session"""
+        return self._session
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        """Get the SQLAlchemy model class"""
+        return self._model
+
+    @property
+    def schema(self) -> Type[BaseSchema]:
+        """Get the Pydantic schema class"""
+        return self._schema
+
+    async def _get_instance(self, id_key: int) -> BaseModel:
+        """Load a model instance or raise InstanceNotFoundError"""
+        stmt = select(self.model).where(self.model.id_key == id_key)
+        instance = (await self.session.scalars(stmt)).first()
+
+        if instance is None:
+            raise InstanceNotFoundError(
+                f"{self.model.__name__} with id {id_key} not found"
+            )
+
+        return instance
+
+    async def find(self, id_key: int) -> BaseSchema:
+        """
+        Find a single record by ID
+
+        Args:
+            id_key: The primary key value
+
+        Returns:
+            The schema instance
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+        """
+        try:
+            model = await self._get_instance(id_key)
+            return self.schema.model_validate(model)
+        except InstanceNotFoundError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error finding {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def find_all(self, skip: int = 0, limit: int = 100) -> List[BaseSchema]:
+        """
+        Find all records with pagination and input validation
+
+        Args:
+            skip: Number of records to skip (must be >= 0)
+            limit: Maximum number of records to return
+
+        Returns:
+            List of schema instances
+
+        Raises:
+            ValueError: If pagination parameters are invalid
+        """
+        try:
+            limit = validate_pagination(skip, limit, self.logger)
+
+            stmt = select(self.model).order_by(self.model.id_key).offset(skip).limit(limit)
+            models = (await self.session.scalars(stmt)).all()
+            return [self.schema.model_validate(model) for model in models]
+
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error finding all {self.model.__name__}: {e}")
+            raise
+
+    async def find_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[BaseSchema], Optional[str]]:
+        """
+        Find records with keyset (cursor) pagination ordered by id_key
+
+        Unlike find_all(), the cost of a page does not grow with its depth:
+        each page is a single index range scan starting after the cursor.
+
+        Args:
+            cursor: next_cursor returned by the previous page (None for the first page)
+            limit: Maximum number of records to return
+
+        Returns:
+            Tuple of (schema instances, next_cursor or None on the last page)
+
+        Raises:
+            ValueError: If the limit or the cursor is invalid
+        """
+        try:
+            limit = validate_pagination(0, limit, self.logger)
+
+            stmt = paginate(select(self.model), [self.model.id_key], cursor, limit)
+            models, next_cursor = page_results((await self.session.scalars(stmt)).all(), limit, "id_key")
+            return [self.schema.model_validate(model) for model in models], next_cursor
+
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error paginating {self.model.__name__}: {e}")
+            raise
+
+    async def save(self, model: BaseModel) -> BaseSchema:
+        """
+        Save a new record to the database
+
+        Args:
+            model: The model instance to save
+
+        Returns:
+            The saved schema instance
+        """
+        try:
+            self.session.add(model)
+            await self.session.commit()
+            await self.session.refresh(model)
+            return self.schema.model_validate(model)
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error saving {self.model.__name__}: {e}")
+            raise
+
+    async def update(self, id_key: int, changes: dict) -> BaseSchema:
+        """
+        Update an existing record with security validation
+
+        Args:
+            id_key: The primary key value
+            changes: Dictionary of fields to update
+
+        Returns:
+            The updated schema instance
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+            ValueError: If trying to update invalid or protected fields
+        """
+        try:
+            instance = await self._get_instance(id_key)
+
+            apply_changes(self.model, instance, changes, self.logger)
+
+            await self.session.commit()
+            await self.session.refresh(instance)
+            return self.schema.model_validate(instance)
+
+        except InstanceNotFoundError:
+            raise
+        except ValueError:
+            await self.session.rollback()
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error updating {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def remove(self, id_key: int) -> None:
+        """
+        Delete a record from the database
+
+        Args:
+            id_key: The primary key value
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+        """
+        try:
+            model = await self._get_instance(id_key)
+            await self.session.delete(model)
+            await self.session.commit()
+        except InstanceNotFoundError:
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error deleting {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def save_all(self, models: List[BaseModel]) -> List[BaseSchema]:
+        """
+        Save multiple records in a single transaction
+
+        Args:
+            models: List of model instances to save
+
+        Returns:
+            List of saved schema instances
+        """
+        try:
+            self.session.add_all(models)
+            await self.session.commit()
+
+            for model in models:
+                await self.session.refresh(model)
+
+            return [self.schema.model_validate(model) for model in models]
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error saving multiple {self.model.__name__}: {e}")
+            raise
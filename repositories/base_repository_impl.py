@@ -2,7 +2,7 @@
 BaseRepository implementation with best practices and sanitized logging
 """
 import logging
-from typing import Type, List, Optional
+from typing import Type, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
@@ -10,6 +10,7 @@ from models.base_model import BaseModel
 from repositories.base_repository import BaseRepository
 from schemas.base_schema import BaseSchema
 from utils.logging_utils import log_repository_error, create_user_safe_error, get_sanitized_logger
+from utils.pagination import paginate, page_results
 
 
 class InstanceNotFoundError(Exception):
@@ -19,6 +20,115 @@ class InstanceNotFoundError(Exception):
     pass
 
 
+# Protected attributes that should never be updated
+PROTECTED_ATTRIBUTES = {
+    'id_key',  # Primary key
+    '_sa_instance_state',  # SQLAlchemy internal
+    '__class__',  # Python magic attribute
+    '__dict__',  # Python magic attribute
+}
+
+
+def validate_pagination(skip: int, limit: int, logger) -> int:
+    """
+    Validate pagination parameters to prevent DoS attacks
+
+    Args:
+        skip: Number of records to skip (must be >= 0)
+        limit: Maximum number of records to return
+        logger: Logger used to report capped limits
+
+    Returns:
+        The limit, capped at PaginationConfig.MAX_LIMIT
+
+    Raises:
+        ValueError: If pagination parameters are invalid
+    """
+    from config.constants import PaginationConfig
+
+    # Validate skip parameter
+    if skip < 0:
+        raise ValueError("skip parameter must be >= 0")
+
+    # Validate limit parameter
+    if limit < PaginationConfig.MIN_LIMIT:
+        raise ValueError(
+            f"limit parameter must be >= {PaginationConfig.MIN_LIMIT}"
+        )
+
+    # Cap limit at maximum to prevent excessive queries
+    if limit > PaginationConfig.MAX_LIMIT:
+        logger.warning(
+            f"Limit {limit} exceeds maximum {PaginationConfig.MAX_LIMIT}, "
+            f"capping to maximum"
+        )
+        limit = PaginationConfig.MAX_LIMIT
+
+    return limit
+
+
+def apply_changes(model: Type[BaseModel], instance: BaseModel, changes: dict, logger) -> None:
+    """
+    Apply a dict of changes to a model instance with security validation
+
+    Field names are validated against the model's columns to prevent
+    unauthorized updates to protected attributes or SQLAlchemy internals.
+
+    Args:
+        model: The SQLAlchemy model class
+        instance: The instance to update
+        changes: Dictionary of fields to update
+        logger: Logger used to report blocked attempts
+
+    Raises:
+        ValueError: If trying to update invalid or protected fields
+    """
+    # Get allowed columns from model
+    allowed_columns = {col.name for col in model.__table__.columns}
+
+    # Validate and update only allowed fields
+    for key, value in changes.items():
+        # Skip None values
+        if value is None:
+            continue
+
+        # Check if key starts with underscore (internal attribute)
+        if key.startswith('_'):
+            logger.warning(
+                f"Attempt to update protected attribute '{key}' blocked"
+            )
+            raise ValueError(
+                f"Cannot update protected attribute: {key}"
+            )
+
+        # Check against protected list
+        if key in PROTECTED_ATTRIBUTES:
+            logger.warning(
+                f"Attempt to update protected attribute '{key}' blocked"
+            )
+            raise ValueError(
+                f"Cannot update protected attribute: {key}"
+            )
+
+        # Validate field exists in model
+        if key not in allowed_columns:
+            logger.warning(
+                f"Attempt to update non-existent field '{key}' blocked"
+            )
+            raise ValueError(
+                f"Invalid field for {model.__name__}: {key}"
+            )
+
+        # Validate attribute exists on instance
+        if not hasattr(instance, key):
+            raise ValueError(
+                f"Field {key} not found in {model.__name__}"
+            )
+
+        # All validations passed - safe to update
+        setattr(instance, key, value)
+
+
 class BaseRepositoryImpl(BaseRepository):
     """
     Base Repository Implementation with proper error handling and SQLAlchemy 2.0 patterns
@@ -75,6 +185,27 @@ class BaseRepositoryImpl(BaseRepository):
             self.logger.error(f"Error finding {self.model.__name__} with id {id_key}: {e}")
             raise
 
+    def find_many(self, ids: List[int]) -> List[BaseSchema]:
+        """
+        Find several records by ID with a single IN query
+
+        Args:
+            ids: Primary key values (ids without a record are skipped)
+
+        Returns:
+            List of schema instances, in no particular order
+        """
+        if not ids:
+            return []
+
+        try:
+            stmt = select(self.model).where(self.model.id_key.in_(set(ids)))
+            models = self.session.scalars(stmt).all()
+            return [self.schema.model_validate(model) for model in models]
+        except Exception as e:
+            self.logger.error(f"Error finding {self.model.__name__} by ids: {e}")
+            raise
+
     def find_all(self, skip: int = 0, limit: int = 100) -> List[BaseSchema]:
         """
         Find all records with pagination and input validation
@@ -92,28 +223,10 @@ class BaseRepositoryImpl(BaseRepository):
         Raises:
             ValueError: If pagination parameters are invalid
         """
-        from config.constants import PaginationConfig, ErrorMessages
-
         try:
-            # Validate skip parameter
-            if skip < 0:
-                raise ValueError("skip parameter must be >= 0")
-
-            # Validate limit parameter
-            if limit < PaginationConfig.MIN_LIMIT:
-                raise ValueError(
-                    f"limit parameter must be >= {PaginationConfig.MIN_LIMIT}"
-                )
+            limit = validate_pagination(skip, limit, self.logger)
 
-            # Cap limit at maximum to prevent excessive queries
-            if limit > PaginationConfig.MAX_LIMIT:
-                self.logger.warning(
-                    f"Limit {limit} exceeds maximum {PaginationConfig.MAX_LIMIT}, "
-                    f"capping to maximum"
-                )
-                limit = PaginationConfig.MAX_LIMIT
-
-            stmt = select(self.model).offset(skip).limit(limit)
+            stmt = select(self.model).order_by(self.model.id_key).offset(skip).limit(limit)
             models = self.session.scalars(stmt).all()
             return [self.schema.model_validate(model) for model in models]
 
@@ -123,6 +236,36 @@ class BaseRepositoryImpl(BaseRepository):
             self.logger.error(f"Error finding all {self.model.__name__}: {e}")
             raise
 
+    def find_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[BaseSchema], Optional[str]]:
+        """
+        Find records with keyset (cursor) pagination ordered by id_key
+
+        Unlike find_all(), the cost of a page does not grow with its depth:
+        each page is a single index range scan starting after the cursor.
+
+        Args:
+            cursor: next_cursor returned by the previous page (None for the first page)
+            limit: Maximum number of records to return (must be 1-1000)
+
+        Returns:
+            Tuple of (schema instances, next_cursor or None on the last page)
+
+        Raises:
+            ValueError: If the limit or the cursor is invalid
+        """
+        try:
+            limit = validate_pagination(0, limit, self.logger)
+
+            stmt = paginate(select(self.model), [self.model.id_key], cursor, limit)
+            models, next_cursor = page_results(self.session.scalars(stmt).all(), limit, "id_key")
+            return [self.schema.model_validate(model) for model in models], next_cursor
+
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error paginating {self.model.__name__}: {e}")
+            raise
+
     def save(self, model: BaseModel) -> BaseSchema:
         """
         Save a new record to the database
@@ -161,14 +304,6 @@ class BaseRepositoryImpl(BaseRepository):
             InstanceNotFoundError: If the record is not found
             ValueError: If trying to update invalid or protected fields
         """
-        # Protected attributes that should never be updated
-        PROTECTED_ATTRIBUTES = {
-            'id_key',  # Primary key
-            '_sa_instance_state',  # SQLAlchemy internal
-            '__class__',  # Python magic attribute
-            '__dict__',  # Python magic attribute
-        }
-
         try:
             stmt = select(self.model).where(self.model.id_key == id_key)
             instance = self.session.scalars(stmt).first()
@@ -178,50 +313,7 @@ class BaseRepositoryImpl(BaseRepository):
                     f"{self.model.__name__} with id {id_key} not found"
                 )
 
-            # Get allowed columns from model
-            allowed_columns = {col.name for col in self.model.__table__.columns}
-
-            # Validate and update only allowed fields
-            for key, value in changes.items():
-                # Skip None values
-                if value is None:
-                    continue
-
-                # Check if key starts with underscore (internal attribute)
-                if key.startswith('_'):
-                    self.logger.warning(
-                        f"Attempt to update protected attribute '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Cannot update protected attribute: {key}"
-                    )
-
-                # Check against protected list
-                if key in PROTECTED_ATTRIBUTES:
-                    self.logger.warning(
-                        f"Attempt to update protected attribute '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Cannot update protected attribute: {key}"
-                    )
-
-                # Validate field exists in model
-                if key not in allowed_columns:
-                    self.logger.warning(
-                        f"Attempt to update non-existent field '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Invalid field for {self.model.__name__}: {key}"
-                    )
-
-                # Validate attribute exists on instance
-                if not hasattr(instance, key):
-                    raise ValueError(
-                        f"Field {key} not found in {self.model.__name__}"
-                    )
-
-                # All validations passed - safe to update
-                setattr(instance, key, value)
+            apply_changes(self.model, instance, changes, self.logger)
 
             self.session.commit()
             self.session.refresh(instance)
@@ -1,8 +1,34 @@
 """Product repository for database operations."""
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 from models.product import ProductModel
 from repositories.base_repository_impl import BaseRepositoryImpl
-from typing import Optional
+from repositories.review_repository import PRODUCT_RATING_COLUMNS_SQL, PRODUCT_RATING_JOIN_SQL
+from utils.pagination import estimated_count
+from typing import Any, Dict, List, Optional
+
+# Columns of the public catalog representation (listing, detail and search)
+PRODUCT_COLUMNS = """
+    id_key,
+    name,
+    description,
+    price,
+    stock,
+    category_id,
+    COALESCE(sku, '') as sku,
+    COALESCE(image_url, '') as image_url,
+    created_at,
+    updated_at
+"""
+
+
+def catalog_row(row) -> Dict[str, Any]:
+    """Catalog row as a dict (price as float, whatever the column type)"""
+    product = dict(row)
+    if product.get("price") is not None:
+        product["price"] = float(product["price"])
+    return product
+
 
 class ProductRepository(BaseRepositoryImpl):
     """Repository for Product entity database operations."""
@@ -10,8 +36,69 @@ class ProductRepository(BaseRepositoryImpl):
     def __init__(self, db: Session):
         from schemas.product_schema import ProductSchema
         super().__init__(ProductModel, ProductSchema, db)
-    
+
     def exists(self, product_id: int) -> bool:
         """Check if a product exists by its ID."""
-        product = self.find(product_id)  
-        return product is not None
\ No newline at end of file
+        product = self.find(product_id)
+        return product is not None
+
+    def find_catalog_page(self, limit: int, skip: int = 0, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        In-stock products with their rating aggregate, ordered by id_key
+
+        Args:
+            limit: Maximum number of rows
+            skip: Rows to skip (ignored when after_id is given)
+            after_id: Keyset cursor: only products with a greater id_key
+
+        Returns:
+            Catalog rows as dicts
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if after_id is not None:
+            params["after_id"] = after_id
+            page_clause = "AND id_key > :after_id ORDER BY id_key LIMIT :limit"
+        else:
+            params["skip"] = skip
+            page_clause = "ORDER BY id_key LIMIT :limit OFFSET :skip"
+
+        rows = self.session.execute(
+            text(f"""
+                SELECT {PRODUCT_COLUMNS}, {PRODUCT_RATING_COLUMNS_SQL}
+                FROM products {PRODUCT_RATING_JOIN_SQL}
+                WHERE stock > 0
+                {page_clause}
+            """),
+            params
+        ).mappings()
+        return [catalog_row(row) for row in rows]
+
+    def find_catalog_item(self, product_id: int) -> Optional[Dict[str, Any]]:
+        """
+        One product with its rating aggregate (in stock or not)
+
+        Args:
+            product_id: Product ID
+
+        Returns:
+            Catalog row as a dict, or None if the product does not exist
+        """
+        row = self.session.execute(
+            text(f"""
+                SELECT {PRODUCT_COLUMNS}, {PRODUCT_RATING_COLUMNS_SQL}
+                FROM products {PRODUCT_RATING_JOIN_SQL}
+                WHERE id_key = :product_id
+            """),
+            {"product_id": product_id}
+        ).mappings().first()
+        return catalog_row(row) if row is not None else None
+
+    def count_in_stock(self) -> int:
+        """Number of products with stock"""
+        return self.session.execute(text("SELECT COUNT(*) FROM products WHERE stock > 0")).scalar()
+
+    def estimate_in_stock(self) -> Optional[int]:
+        """Planner estimate of the number of products with stock (None if unavailable)"""
+        return estimated_count(
+            self.session, "products", select(ProductModel.id_key).where(ProductModel.stock > 0)
+        )
@@ -1,17 +1,43 @@
 from __future__ import annotations
 from sqlalchemy.orm import Session
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.product_rating import ProductRatingModel
+from utils.pagination import paginate, page_results
 
 if TYPE_CHECKING:
     from models.review import ReviewModel
 
+# Límites superiores (exclusivos) de las columnas 1-4 del histograma; el resto va a 5
+RATING_BUCKET_LIMITS = (1.5, 2.5, 3.5, 4.5)
+
+
+# Fragmentos SQL para incluir el agregado en listados de productos sin consultas extra
+PRODUCT_RATING_COLUMNS_SQL = """
+    COALESCE(pr.review_count, 0) AS review_count,
+    CASE WHEN pr.review_count > 0 THEN pr.rating_sum / pr.review_count ELSE 0 END AS average_rating
+"""
+PRODUCT_RATING_JOIN_SQL = "LEFT JOIN product_ratings pr ON pr.product_id = products.id_key"
+
+
+def rating_bucket(rating: float) -> int:
+    """Columna del histograma (1-5) para una calificación (redondeo half-up)."""
+    for bucket, limit in enumerate(RATING_BUCKET_LIMITS, start=1):
+        if rating < limit:
+            return bucket
+    return 5
+
+
 class ReviewRepository:
     def __init__(self, session: Session):
         self.session = session
 
     def create(self, review: ReviewModel) -> ReviewModel:
         self.session.add(review)
+        self._apply_rating_delta(review.product_id, 1, review.rating, {rating_bucket(review.rating): 1})
         self.session.commit()
         self.session.refresh(review)
         return review
@@ -32,6 +58,15 @@ class ReviewRepository:
         from models.review import ReviewModel
         return self.session.query(ReviewModel).filter(ReviewModel.product_id == product_id).all()
 
+    def get_page(self, cursor: Optional[str], limit: int, product_id: Optional[int] = None) -> Tuple[List[ReviewModel], Optional[str]]:
+        """Keyset page of reviews ordered by id_key (optionally for one product)"""
+        from models.review import ReviewModel
+        stmt = select(ReviewModel)
+        if product_id is not None:
+            stmt = stmt.where(ReviewModel.product_id == product_id)
+        stmt = paginate(stmt, [ReviewModel.id_key], cursor, limit)
+        return page_results(self.session.scalars(stmt).all(), limit, "id_key")
+
     def get_by_client(self, client_id: int) -> List[ReviewModel]:
         from models.review import ReviewModel
         return self.session.query(ReviewModel).filter(ReviewModel.client_id == client_id).all()
@@ -62,7 +97,10 @@ class ReviewRepository:
 
         review = self.get_by_id(review_id)
         if review:
-            if rating is not None:
+            if rating is not None and rating != review.rating:
+                buckets: Dict[int, int] = {rating_bucket(review.rating): -1}
+                buckets[rating_bucket(rating)] = buckets.get(rating_bucket(rating), 0) + 1
+                self._apply_rating_delta(review.product_id, 0, rating - review.rating, buckets)
                 review.rating = rating
             if comment is not None:
                 review.comment = comment
@@ -76,11 +114,106 @@ class ReviewRepository:
         from models.review import ReviewModel
         review = self.get_by_id(review_id)
         if review:
+            self._apply_rating_delta(review.product_id, -1, -review.rating, {rating_bucket(review.rating): -1})
             self.session.delete(review)
             self.session.commit()
             return True
         return False
 
+    def get_rating_aggregate(self, product_id: int) -> Optional[ProductRatingModel]:
+        """Agregado de calificaciones de un producto (lectura por clave primaria)."""
+        return self.session.get(ProductRatingModel, product_id)
+
+    def _apply_rating_delta(self, product_id: int, count_delta: int, sum_delta: float, buckets: Dict[int, int]) -> None:
+        """
+        Aplica un cambio incremental al agregado del producto (sin commit).
+
+        Es un único UPSERT atómico, así reseñas concurrentes del mismo
+        producto no pierden actualizaciones.
+        """
+        values = {
+            "product_id": product_id,
+            "review_count": count_delta,
+            "rating_sum": sum_delta,
+            **{f"count_{i}": buckets.get(i, 0) for i in range(1, 6)},
+        }
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(ProductRatingModel).values(**values)
+            table = ProductRatingModel.__table__
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.product_id],
+                set_={
+                    column: table.c[column] + stmt.excluded[column]
+                    for column in values if column != "product_id"
+                } | {"refreshed_at": func.now()}
+            )
+            self.session.execute(stmt)
+            return
+
+        aggregate = self.session.get(ProductRatingModel, product_id, with_for_update=True)
+        if aggregate is None:
+            self.session.add(ProductRatingModel(**values))
+            return
+        for column, delta in values.items():
+            if column != "product_id":
+                setattr(aggregate, column, getattr(aggregate, column) + delta)
+
+    def backfill_rating_aggregates(self) -> int:
+        """
+        Reconstruye los agregados si la tabla está vacía pero hay reseñas
+        (por ejemplo, justo después de crearla en una base existente).
+
+        Returns:
+            Cantidad de productos reconstruidos (0 si no hizo falta)
+        """
+        from models.review import ReviewModel
+
+        has_aggregates = self.session.scalar(select(ProductRatingModel.product_id).limit(1)) is not None
+        has_reviews = self.session.scalar(select(ReviewModel.id_key).limit(1)) is not None
+        if has_aggregates or not has_reviews:
+            return 0
+        return self.rebuild_rating_aggregates()
+
+    def rebuild_rating_aggregates(self) -> int:
+        """
+        Recalcula todos los agregados desde la tabla de reseñas.
+
+        Returns:
+            Cantidad de productos con agregado
+        """
+        from models.review import ReviewModel
+
+        # Mismo criterio que rating_bucket(), expresado en SQL
+        bucket = case(
+            *[(ReviewModel.rating < limit, i) for i, limit in enumerate(RATING_BUCKET_LIMITS, start=1)],
+            else_=5
+        )
+        rows = self.session.execute(
+            select(
+                ReviewModel.product_id,
+                func.count(),
+                func.sum(ReviewModel.rating),
+                *[func.sum(case((bucket == i, 1), else_=0)) for i in range(1, 6)]
+            ).group_by(ReviewModel.product_id)
+        ).all()
+
+        self.session.query(ProductRatingModel).delete()
+        if rows:
+            self.session.execute(insert(ProductRatingModel), [
+                {
+                    "product_id": row[0],
+                    "review_count": row[1],
+                    "rating_sum": float(row[2] or 0),
+                    **{f"count_{i}": int(row[2 + i] or 0) for i in range(1, 6)},
+                }
+                for row in rows
+            ])
+        self.session.commit()
+        return len(rows)
+
     def get_product_average_rating(self, product_id: int) -> Optional[float]:
         from models.review import ReviewModel
         from sqlalchemy import func
@@ -50,10 +50,11 @@ ClientResponseSchema = ClientSchema
 class ClientListResponseSchema(BaseModel):
     """Schema for returning a list of clients."""
     items: List[ClientSchema]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,329 @@
+"""
+Servicio de analytics de ventas.
+
+Mantiene los rollups diarios (sales_daily, sales_daily_category,
+sales_daily_product) a partir de orders/order_details y responde las
+consultas de los dashboards leyendo solo esas tablas.
+
+El refresco es incremental: se buscan las órdenes con updated_at posterior
+a la marca de agua (menos un margen de solapamiento), se recalculan
+completos solo los días a los que pertenecen esas órdenes y se avanza la
+marca. Recalcular el día entero hace que las cancelaciones y cambios de
+estado queden reflejados sin llevar deltas.
+
+Los requests no refrescan: run_refresh_loop() (lanzado en el startup de la
+app) lo hace en segundo plano cada REFRESH_INTERVAL segundos, y el endpoint
+de admin permite forzarlo.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, distinct, func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config.constants import AnalyticsConfig
+from config.database import SessionLocal
+from models.category import CategoryModel
+from models.enums import Status
+from models.order import OrderModel
+from models.order_detail import OrderDetailModel
+from models.product import ProductModel
+from models.sales_rollup import (
+    AnalyticsRefreshStateModel,
+    SalesDailyCategoryModel,
+    SalesDailyModel,
+    SalesDailyProductModel,
+)
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+ROLLUP_NAME = "sales_daily"
+UNCATEGORIZED_ID = 0
+_DAYS_CHUNK = 500
+
+# Índice usado por el refresco incremental; create_all() no lo agrega a una
+# tabla orders ya existente
+ANALYTICS_SCHEMA_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_orders_updated_at ON orders (updated_at)",
+)
+
+def ensure_analytics_schema(bind) -> bool:
+    """
+    Crear los índices de analytics que falten (idempotente).
+
+    Args:
+        bind: Engine o conexión
+
+    Returns:
+        True si el esquema quedó listo
+    """
+    try:
+        with bind.begin() as conn:
+            for statement in ANALYTICS_SCHEMA_DDL:
+                conn.execute(text(statement))
+        return True
+    except Exception as e:
+        logger.error(f"No se pudo crear el esquema de analytics: {e}")
+        return False
+
+
+def _as_date(value: Any) -> date:
+    # SQLite devuelve date() como texto 'YYYY-MM-DD'
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class AnalyticsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Refresco de rollups
+    # ------------------------------------------------------------------
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Refrescar los rollups desde la marca de agua.
+
+        Args:
+            full: Reconstruir todo el historial (también ocurre la primera vez)
+
+        Returns:
+            Dict con el modo, los días recalculados y la nueva marca de agua
+        """
+        try:
+            state = self.db.get(AnalyticsRefreshStateModel, ROLLUP_NAME, with_for_update=True)
+            if state is None:
+                state = AnalyticsRefreshStateModel(name=ROLLUP_NAME)
+                self.db.add(state)
+                self.db.flush()
+
+            new_mark = self.db.scalar(select(func.max(OrderModel.updated_at)))
+
+            if full or state.high_water_mark is None:
+                self._rebuild(None)
+                mode, days = "full", None
+            else:
+                since = state.high_water_mark - timedelta(seconds=AnalyticsConfig.REFRESH_OVERLAP)
+                days = self._changed_days(since, new_mark)
+                for start in range(0, len(days), _DAYS_CHUNK):
+                    self._rebuild(days[start:start + _DAYS_CHUNK])
+                mode = "incremental"
+
+            if new_mark is not None:
+                state.high_water_mark = new_mark
+            state.refreshed_at = datetime.utcnow()
+            self.db.commit()
+
+            logger.info(
+                f"📊 Rollups de ventas refrescados ({mode}): "
+                f"{'todo el historial' if days is None else f'{len(days)} días'}"
+            )
+            return {
+                "mode": mode,
+                "days_refreshed": None if days is None else [d.isoformat() for d in days],
+                "high_water_mark": state.high_water_mark.isoformat() if state.high_water_mark else None,
+            }
+        except IntegrityError:
+            # Otro worker creó el estado / refrescó al mismo tiempo
+            self.db.rollback()
+            logger.warning("Refresco de rollups concurrente, se omite")
+            return {"mode": "skipped", "days_refreshed": [], "high_water_mark": None}
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _changed_days(self, since: datetime, until: Optional[datetime]) -> List[date]:
+        if until is None:
+            return []
+        day = func.date(OrderModel.date)
+        rows = self.db.scalars(
+            select(day.label("day")).distinct().where(
+                OrderModel.updated_at > since,
+                OrderModel.updated_at <= until
+            )
+        ).all()
+        return sorted(_as_date(value) for value in rows if value is not None)
+
+    def _rebuild(self, days: Optional[List[date]]) -> None:
+        """Borrar y recalcular los rollups de `days` (None = todos)."""
+        day = func.date(OrderModel.date)
+        revenue = func.sum(OrderDetailModel.quantity * OrderDetailModel.price)
+        units = func.sum(OrderDetailModel.quantity)
+        order_count = func.count(distinct(OrderModel.id_key))
+        category_id = func.coalesce(ProductModel.category_id, UNCATEGORIZED_ID)
+
+        def source(*columns):
+            stmt = (
+                select(*columns)
+                .select_from(OrderDetailModel)
+                .join(OrderModel, OrderModel.id_key == OrderDetailModel.order_id)
+                .where(OrderModel.status != Status.CANCELED)
+            )
+            if days is not None:
+                # El rango permite usar el índice de orders.date
+                stmt = stmt.where(
+                    OrderModel.date >= datetime.combine(days[0], datetime.min.time()),
+                    OrderModel.date < datetime.combine(days[-1] + timedelta(days=1), datetime.min.time()),
+                    day.in_(days)
+                )
+            return stmt
+
+        for model in (SalesDailyModel, SalesDailyCategoryModel, SalesDailyProductModel):
+            stmt = delete(model)
+            if days is not None:
+                stmt = stmt.where(model.day.in_(days))
+            self.db.execute(stmt)
+
+        self.db.execute(
+            insert(SalesDailyModel).from_select(
+                ["day", "revenue", "units", "order_count"],
+                source(day, revenue, units, order_count).group_by(day)
+            )
+        )
+        self.db.execute(
+            insert(SalesDailyCategoryModel).from_select(
+                ["day", "category_id", "revenue", "units", "order_count"],
+                source(day, category_id, revenue, units, order_count)
+                .outerjoin(ProductModel, ProductModel.id_key == OrderDetailModel.product_id)
+                .group_by(day, category_id)
+            )
+        )
+        self.db.execute(
+            insert(SalesDailyProductModel).from_select(
+                ["day", "product_id", "category_id", "revenue", "units", "order_count"],
+                source(day, OrderDetailModel.product_id, ProductModel.category_id, revenue, units, order_count)
+                .outerjoin(ProductModel, ProductModel.id_key == OrderDetailModel.product_id)
+                .group_by(day, OrderDetailModel.product_id, ProductModel.category_id)
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Consultas (solo leen los rollups)
+    # ------------------------------------------------------------------
+
+    def daily_sales(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """Ventas por día en [start, end]."""
+        rows = self.db.execute(
+            select(SalesDailyModel)
+            .where(SalesDailyModel.day.between(start, end))
+            .order_by(SalesDailyModel.day)
+        ).scalars().all()
+        return [
+            {
+                "day": row.day.isoformat(),
+                "revenue": round(row.revenue, 2),
+                "units": row.units,
+                "order_count": row.order_count,
+            }
+            for row in rows
+        ]
+
+    def summary(self, start: date, end: date) -> Dict[str, Any]:
+        """Totales del período en [start, end]."""
+        revenue, units, order_count = self.db.execute(
+            select(
+                func.coalesce(func.sum(SalesDailyModel.revenue), 0.0),
+                func.coalesce(func.sum(SalesDailyModel.units), 0),
+                func.coalesce(func.sum(SalesDailyModel.order_count), 0),
+            ).where(SalesDailyModel.day.between(start, end))
+        ).one()
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "revenue": round(float(revenue), 2),
+            "units": int(units),
+            "order_count": int(order_count),
+            "average_order_value": round(float(revenue) / order_count, 2) if order_count else 0.0,
+        }
+
+    def sales_by_category(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """Ventas por categoría en [start, end], de mayor a menor facturación."""
+        revenue = func.sum(SalesDailyCategoryModel.revenue).label("revenue")
+        rows = self.db.execute(
+            select(
+                SalesDailyCategoryModel.category_id,
+                CategoryModel.name,
+                revenue,
+                func.sum(SalesDailyCategoryModel.units).label("units"),
+                func.sum(SalesDailyCategoryModel.order_count).label("order_count"),
+            )
+            .outerjoin(CategoryModel, CategoryModel.id_key == SalesDailyCategoryModel.category_id)
+            .where(SalesDailyCategoryModel.day.between(start, end))
+            .group_by(SalesDailyCategoryModel.category_id, CategoryModel.name)
+            .order_by(revenue.desc())
+        ).all()
+        return [
+            {
+                "category_id": row.category_id,
+                "category_name": row.name or "Sin categoría",
+                "revenue": round(row.revenue, 2),
+                "units": int(row.units),
+                "order_count": int(row.order_count),
+            }
+            for row in rows
+        ]
+
+    def top_products(
+        self,
+        start: date,
+        end: date,
+        limit: int = AnalyticsConfig.TOP_PRODUCTS_LIMIT,
+        order_by: str = "revenue"
+    ) -> List[Dict[str, Any]]:
+        """Productos más vendidos en [start, end] por facturación o unidades."""
+        revenue = func.sum(SalesDailyProductModel.revenue).label("revenue")
+        units = func.sum(SalesDailyProductModel.units).label("units")
+        rows = self.db.execute(
+            select(
+                SalesDailyProductModel.product_id,
+                ProductModel.name,
+                revenue,
+                units,
+                func.sum(SalesDailyProductModel.order_count).label("order_count"),
+            )
+            .outerjoin(ProductModel, ProductModel.id_key == SalesDailyProductModel.product_id)
+            .where(SalesDailyProductModel.day.between(start, end))
+            .group_by(SalesDailyProductModel.product_id, ProductModel.name)
+            .order_by((units if order_by == "units" else revenue).desc(), SalesDailyProductModel.product_id)
+            .limit(limit)
+        ).all()
+        return [
+            {
+                "product_id": row.product_id,
+                "product_name": row.name,
+                "revenue": round(row.revenue, 2),
+                "units": int(row.units),
+                "order_count": int(row.order_count),
+            }
+            for row in rows
+        ]
+
+
+def refresh_rollups() -> Dict[str, Any]:
+    """Refresco incremental con una sesión propia (fuera de los requests)."""
+    with SessionLocal() as db:
+        return AnalyticsService(db).refresh()
+
+
+async def run_refresh_loop() -> None:
+    """
+    Refrescar los rollups cada REFRESH_INTERVAL segundos.
+
+    Pensado para correr como tarea de fondo durante la vida de la app; el
+    refresco (bloqueante) corre en el threadpool y sus errores no cortan el
+    ciclo: los dashboards siguen sirviendo los rollups existentes.
+    """
+    while True:
+        try:
+            await run_in_threadpool(refresh_rollups)
+        except Exception as e:
+            logger.error(f"❌ Error refrescando rollups de ventas: {e}", exc_info=True)
+        await asyncio.sleep(AnalyticsConfig.REFRESH_INTERVAL)
@@ -7,11 +7,16 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.constants import PasswordHashConfig
+from services.password_hasher import password_hasher
 import logging
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
+PBKDF2_SCHEME = "pbkdf2_sha256"
+LEGACY_SCHEME = "sha256"
+
 class AuthService:
     
     @staticmethod
@@ -32,27 +37,48 @@ class AuthService:
             'sha256',
             password.encode('utf-8'),
             salt_bytes,
-            100000,  
+            PasswordHashConfig.ITERATIONS,
             dklen=32  
         )
         
         return hashed.hex()
     
     @staticmethod
-    def verify_password(password: str, salt: str, stored_hash: str) -> bool:
-        """Verificar contraseña con compatibilidad hacia atrás"""
+    def check_password(password: str, salt: str, stored_hash: str) -> Optional[str]:
+        """
+        Verificar contraseña e indicar con qué esquema coincide.
+        Devuelve PBKDF2_SCHEME, LEGACY_SCHEME (SHA-256 antiguo, hay que
+        re-hashear) o None si la contraseña no es válida.
+        """
         try:
             calculated_hash = AuthService.hash_password(password, salt)
             
             if hmac.compare_digest(calculated_hash, stored_hash):
-                return True
+                return PBKDF2_SCHEME
                 
-            old_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-            return hmac.compare_digest(old_hash, stored_hash)
+            old_hash = AuthService.hash_password_old(password, salt)
+            if hmac.compare_digest(old_hash, stored_hash):
+                return LEGACY_SCHEME
+            return None
             
         except Exception as e:
             logger.error(f"Error en verify_password: {e}")
-            return False
+            return None
+    
+    @staticmethod
+    def verify_password(password: str, salt: str, stored_hash: str) -> bool:
+        """Verificar contraseña con compatibilidad hacia atrás"""
+        return AuthService.check_password(password, salt, stored_hash) is not None
+    
+    @staticmethod
+    async def hash_password_async(password: str, salt: str) -> str:
+        """hash_password en el executor de hashing (no bloquea el event loop)"""
+        return await password_hasher.run(AuthService.hash_password, password, salt)
+    
+    @staticmethod
+    async def check_password_async(password: str, salt: str, stored_hash: str) -> Optional[str]:
+        """check_password en el executor de hashing (no bloquea el event loop)"""
+        return await password_hasher.run(AuthService.check_password, password, salt, stored_hash)
     
     @staticmethod
     def hash_password_old(password: str, salt: str) -> str:
@@ -64,37 +90,21 @@ class AuthService:
         credentials: HTTPAuthorizationCredentials = Depends(security),
         db: Session = Depends(get_db)
     ) -> dict:
-        """Obtener cliente actual desde el token JWT"""
-        from jose import jwt
-        import os
-        from repositories.client_repository import ClientRepository
-        
+        """Obtener cliente actual desde el token JWT (vía caché de principals)"""
+        from services.principal_service import decode_client_id, principal_cache
+
         try:
-            SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-            ALGORITHM = "HS256"
-            
-            token = credentials.credentials
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            client_id_str = payload.get("sub")
-            
-            if client_id_str is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token no contiene client_id (sub)"
-                )
-            
-            client_id = int(client_id_str)
-            
-            # Obtener cliente de la base de datos
-            client_repo = ClientRepository(db)
-            client = client_repo.find(client_id)
-            
+            client_id = decode_client_id(credentials.credentials)
+
+            # Obtener cliente desde la caché (consulta a la base solo si falta)
+            client = principal_cache.get(client_id, db)
+
             if client is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Cliente no encontrado"
                 )
-            
+
             # Convertir a diccionario para el frontend
             return {
                 "id": client.id_key,
@@ -102,21 +112,11 @@ class AuthService:
                 "first_name": client.name,  # Cambié de first_name a name para coincidir con tu modelo
                 "last_name": client.lastname,  # Cambié de last_name a lastname
                 "phone": client.phone,
-                "is_admin": client.id_key == 0
+                "is_admin": client.is_admin
             }
-            
-        except jwt.JWTError as e:
-            logger.error(f"Error JWT: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido o expirado"
-            )
-        except ValueError as e:
-            logger.error(f"Error convirtiendo ID: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token mal formado"
-            )
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error inesperado en get_current_client: {e}")
             raise HTTPException(
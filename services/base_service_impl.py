@@ -1,7 +1,7 @@
 """
 Module for Base Service Implementation
 """
-from typing import List, Type
+from typing import List, Optional, Tuple, Type
 from sqlalchemy.orm import Session
 from models.base_model import BaseModel
 from services.base_service import BaseService
@@ -40,6 +40,10 @@ class BaseServiceImpl(BaseService):
         """Get all data with pagination"""
         return self.repository.find_all(skip=skip, limit=limit)
 
+    def get_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List['BaseSchema'], Optional[str]]:
+        """Get data with keyset pagination (returns items and next_cursor)"""
+        return self.repository.find_page(cursor=cursor, limit=limit)
+
     def get_one(self, id_key: int) -> 'BaseSchema':
         """Get one data"""
         return self.repository.find(id_key)
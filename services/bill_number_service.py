@@ -0,0 +1,72 @@
+"""
+Bill Number Service Module
+
+Allocates bill numbers of the form FACT-YYYYMMDD-000001: a per-day counter
+that never collides and never skips a number.
+
+The counter lives in bill_sequences (one row per day) and is bumped with a
+single INSERT ... ON CONFLICT DO UPDATE ... RETURNING inside the caller's
+transaction. The row lock taken by the upsert serializes concurrent bills of
+the same day until commit, and a rollback undoes the increment, which is what
+keeps the numbering gapless. Callers should allocate right before committing
+to keep that lock short.
+"""
+from datetime import date, datetime
+from typing import Optional, Union
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.bill_sequence import BillSequenceModel
+
+BILL_NUMBER_PREFIX = "FACT"
+BILL_NUMBER_DIGITS = 6
+
+
+def format_bill_number(day: date, number: int) -> str:
+    """
+    Build the printable bill number
+
+    Args:
+        day: Bill date
+        number: Position of the bill within that day (starting at 1)
+
+    Returns:
+        Bill number like FACT-20240131-000042
+    """
+    return f"{BILL_NUMBER_PREFIX}-{day.strftime('%Y%m%d')}-{number:0{BILL_NUMBER_DIGITS}d}"
+
+
+def _upsert_statement(dialect_name: str, day: date):
+    # PostgreSQL in production, SQLite in local runs; both support ON CONFLICT ... RETURNING
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert(BillSequenceModel).values(day=day, last_number=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[BillSequenceModel.day],
+        set_={"last_number": BillSequenceModel.last_number + 1},
+    ).returning(BillSequenceModel.last_number)
+
+
+def next_bill_number(db: Session, when: Optional[Union[date, datetime]] = None) -> str:
+    """
+    Allocate the next bill number of a day in the current transaction
+
+    The number is only final once the caller commits; if the transaction
+    rolls back, the next bill of the day reuses it.
+
+    Args:
+        db: Database session holding the bill's transaction
+        when: Bill date (default: today)
+
+    Returns:
+        Allocated bill number
+    """
+    if when is None:
+        day = date.today()
+    elif isinstance(when, datetime):
+        day = when.date()
+    else:
+        day = when
+
+    number = db.execute(_upsert_statement(db.get_bind().dialect.name, day)).scalar_one()
+    return format_bill_number(day, number)
@@ -4,7 +4,7 @@ from repositories.bill_repository import BillRepository
 from schemas.bill_schema import BillCreate, BillResponse
 from services.base_service_impl import BaseServiceImpl
 from datetime import datetime, timedelta
-import random
+from services.bill_number_service import next_bill_number
 
 class BillService:
     def __init__(self, db: Session):
@@ -12,8 +12,8 @@ class BillService:
         self.bill_repo = BillRepository(db)
 
     def generate_bill_number(self):
-        """Generar un número de factura único."""
-        return f"FACT-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        """Generar el siguiente número de factura del día (se confirma con el commit de la factura)."""
+        return next_bill_number(self.db)
 
     def create_bill(self, bill_data: BillCreate) -> BillModel:
         """
@@ -1,43 +1,169 @@
 """
 Cache Service Module
 
-Provides high-level caching operations using Redis with automatic
-serialization, TTL management, error handling, and distributed cache stampede protection.
+Provides high-level caching operations using a two-tier cache: an in-process
+LRU (L1) in front of Redis (L2), with compact binary serialization (see
+utils/cache_codec.py), TTL management,
+error handling, cross-worker L1 invalidation over Redis pub/sub, tag-based
+invalidation and distributed cache stampede protection.
+
+Every operation used from request handlers has an asyncio twin (aget, aset,
+aget_or_set, adelete_tags) backed by a redis.asyncio connection pool, so
+async code never blocks the event loop on a Redis round-trip. The sync API
+stays for the sync repositories and services running in the threadpool.
 """
-import json
+import asyncio
 import logging
+import math
+import random
+import threading
 import time
-from typing import Optional, Any, List, Callable
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Any, List, Callable, Dict, Iterable, Tuple
 from datetime import timedelta
+import inspect
 import os
 
-from config.redis_config import get_redis_client
+from starlette.concurrency import run_in_threadpool
+
+from config.constants import CacheConfig
+from config.redis_config import get_async_binary_redis_client, get_binary_redis_client
+from services.local_cache import LocalCache
+from utils import json_codec
+from utils.cache_codec import CacheCodecError, cache_codec
 from utils.logging_utils import get_sanitized_logger
 
 logger = get_sanitized_logger(__name__)
 
+# Envelope fields for tagged entries
+_TAGS_FIELD = "__cache_tags__"
+_VALUE_FIELD = "__cache_value__"
+
+# Stale-while-revalidate entries written by get_or_set
+_SWR_FIELD = "__swr__"
+_SWR_VALUE = "v"
+_SWR_SOFT_EXPIRY = "soft"  # epoch seconds after which the entry is stale
+_SWR_DELTA = "delta"  # seconds the last recomputation took
+
+# Result of a miss computation that produced nothing (the computing caller failed)
+_MISSING = object()
+
+# Delete a refresh lock only if this caller still holds it
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class CacheService:
     """
-    Cache service for storing and retrieving data from Redis
+    Two-tier cache service: in-process LRU (L1) in front of Redis (L2)
 
-    Handles JSON serialization/deserialization and provides
+    Handles serialization (orjson or msgpack, compressed above a size
+    threshold, with a version header) and provides
     convenient methods for common caching patterns.
 
-    Uses distributed Redis locks for cache stampede protection,
-    making it safe for multi-worker/multi-process deployments.
+    L1 hits skip the Redis round-trip and JSON decoding entirely. Writes and
+    invalidations are broadcast over Redis pub/sub so other workers drop
+    their L1 copies. When Redis is unavailable the service runs in L1-only
+    mode instead of disabling caching.
+
+    Entries can be registered under tags (e.g. "products:list"). Each tag has
+    a generation counter in Redis; entries remember the generations they were
+    written under and are treated as misses once a tag is bumped, so
+    invalidating a group of keys costs O(tags) instead of a keyspace scan.
+
+    get_or_set() serves stale values while a single caller (elected with a
+    distributed Redis lock) recomputes them, and concurrent misses of the same
+    key wait briefly for one computation, so neither expiries nor
+    invalidations stampede the database.
     """
 
     def __init__(self):
-        self.redis_client = get_redis_client()
+        # Binary clients: entries are encoded (and maybe compressed) by the codec
+        self.redis_client = get_binary_redis_client()
+        self.async_redis_client = get_async_binary_redis_client()
+        self.codec = cache_codec
         self.enabled = os.getenv('REDIS_ENABLED', 'true').lower() == 'true'
         self.default_ttl = int(os.getenv('REDIS_CACHE_TTL', '300'))  # 5 minutes
         self.lock_timeout = 10  # Lock auto-expire after 10 seconds
 
-    def is_available(self) -> bool:
-        """Check if cache is available"""
+        # L1: in-process LRU/TTL cache
+        self.local: Optional[LocalCache] = None
+        if CacheConfig.L1_ENABLED:
+            self.local = LocalCache(
+                max_entries=CacheConfig.L1_MAX_ENTRIES,
+                default_ttl=CacheConfig.L1_TTL
+            )
+
+        # L2 counters (L1 keeps its own)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+        # Cross-worker L1 invalidation
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation_channel = CacheConfig.INVALIDATION_CHANNEL
+        self._pubsub_thread = None
+
+        # Tag generations mirrored in-process: tag -> (generation, read at)
+        self.tag_key_prefix = CacheConfig.TAG_KEY_PREFIX
+        self.tag_refresh_interval = CacheConfig.TAG_REFRESH_INTERVAL
+        self._tag_generations: Dict[str, Tuple[int, float]] = {}
+        self._tag_lock = threading.Lock()
+        self.tag_stale = 0
+
+        # Stale-while-revalidate (get_or_set)
+        self.stale_ttl = CacheConfig.STALE_TTL
+        self.ttl_jitter = CacheConfig.TTL_JITTER
+        self.early_recompute_beta = CacheConfig.EARLY_RECOMPUTE_BETA
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+        self._lock_scripts: Dict[int, Any] = {}
+        # Stale entries are recomputed off the request path
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=CacheConfig.REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+        )
+        self.refresh_max_pending = CacheConfig.REFRESH_MAX_PENDING
+        self._refresh_pending = 0
+        self._refresh_tasks: set = set()
+        self.swr_refresh_skipped = 0
+        self.swr_stale_served = 0
+        self.swr_refreshes = 0
+        self.swr_early_refreshes = 0
+
+        # Single-flight for misses: key -> result of the computation in progress
+        self.miss_wait = CacheConfig.MISS_WAIT
+        self.miss_poll_interval = CacheConfig.MISS_POLL_INTERVAL
+        self._flights: Dict[str, Future] = {}
+        self._flights_lock = threading.Lock()
+        self._aflights: Dict[str, asyncio.Future] = {}
+        self.swr_coalesced = 0
+
+        self._start_invalidation_listener()
+
+    def is_redis_available(self) -> bool:
+        """Check if the Redis tier (L2) is available"""
         return self.enabled and self.redis_client is not None
 
+    def is_async_redis_available(self) -> bool:
+        """Check if the Redis tier can be reached without blocking the event loop"""
+        return self.is_redis_available() and self.async_redis_client is not None
+
+    def is_available(self) -> bool:
+        """Check if any cache tier is available"""
+        return self.is_redis_available() or self.local is not None
+
+    @property
+    def mode(self) -> str:
+        """Current cache topology: l1+l2, l2, l1 or disabled"""
+        if self.is_redis_available():
+            return "l1+l2" if self.local is not None else "l2"
+        return "l1" if self.local is not None else "disabled"
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache
@@ -51,19 +177,46 @@ class CacheService:
         if not self.is_available():
             return None
 
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                if self._is_current(value):
+                    return self._unwrap(value)
+                self.local.delete([key])
+
+        if not self.is_redis_available():
+            return None
+
         try:
             value = self.redis_client.get(key)
             if value is None:
+                self.l2_misses += 1
                 return None
 
-            # Try to deserialize JSON
             try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                # Return raw value if not JSON
-                return value
+                value = self._decode(value)
+            except CacheCodecError as e:
+                # Written in a format this version cannot read: a miss
+                self.l2_misses += 1
+                logger.debug(f"Cache entry '{key}' skipped: {e}")
+                return None
+
+            if not self._is_current(value):
+                # Written under an older tag generation: drop it early
+                self.l2_misses += 1
+                self.redis_client.delete(key)
+                return None
+
+            self.l2_hits += 1
+
+            # Promote to L1 (short TTL bounds staleness if a broadcast is missed)
+            if self.local is not None:
+                self.local.set(key, value)
+
+            return self._unwrap(value)
 
         except Exception as e:
+            self.l2_errors += 1
             logger.error(f"Cache GET error for key '{key}': {e}")
             return None
 
@@ -71,15 +224,20 @@ class CacheService:
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        generations: Optional[Dict[str, int]] = None
     ) -> bool:
         """
         Set value in cache
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized if possible)
+            value: Value to cache (encoded by the cache codec)
             ttl: Time to live in seconds (default: REDIS_CACHE_TTL)
+            tags: Tags the entry is invalidated with (see invalidate_tags)
+            generations: tag_generations() read before the value was loaded
+                (default: the current generations)
 
         Returns:
             True if successful, False otherwise
@@ -87,13 +245,26 @@ class CacheService:
         if not self.is_available():
             return False
 
-        try:
-            # Serialize to JSON if not a string
-            if not isinstance(value, str):
-                value = json.dumps(value)
+        ttl = ttl or self.default_ttl
+
+        if tags:
+            generations = generations or self._current_generations(tags)
+            if generations is None:
+                # Unknown generations: caching could resurrect invalidated data
+                return False
+            value = self._envelope(value, generations)
+
+        if self.local is not None:
+            # With Redis as source of truth L1 only keeps a short-lived copy
+            l1_ttl = min(ttl, self.local.default_ttl) if self.is_redis_available() else ttl
+            self.local.set(key, value, l1_ttl)
 
-            ttl = ttl or self.default_ttl
-            self.redis_client.setex(key, ttl, value)
+        if not self.is_redis_available():
+            return True
+
+        try:
+            self.redis_client.setex(key, ttl, self.codec.encode(value))
+            self._publish_invalidation("delete", keys=[key])
             return True
 
         except Exception as e:
@@ -113,19 +284,190 @@ class CacheService:
         if not self.is_available():
             return False
 
+        if self.local is not None:
+            self.local.delete([key])
+
+        if not self.is_redis_available():
+            return True
+
         try:
             self.redis_client.delete(key)
+            self._publish_invalidation("delete", keys=[key])
             return True
         except Exception as e:
             logger.error(f"Cache DELETE error for key '{key}': {e}")
             return False
 
-    def delete_pattern(self, pattern: str) -> int:
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values from cache in one Redis round-trip (MGET)
+
+        L1 is checked first; only the remaining keys are fetched from Redis.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of key to value for the keys found (misses are absent)
+
+        Example:
+            get_many(["products:id:id:1", "products:id:id:2"])
+            => {"products:id:id:1": {...}}
+        """
+        found: Dict[str, Any] = {}
+        if not self.is_available():
+            return found
+
+        keys = list(dict.fromkeys(keys))
+        pending = []
+        for key in keys:
+            value = self.local.get(key) if self.local is not None else None
+            if value is not None and self._is_current(value):
+                found[key] = self._unwrap(value)
+                continue
+            if value is not None:
+                self.local.delete([key])
+            pending.append(key)
+
+        if not pending or not self.is_redis_available():
+            return found
+
+        try:
+            values = self.redis_client.mget(pending)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.error(f"Cache MGET error for {len(pending)} keys: {e}")
+            return found
+
+        stale = []
+        for key, value in zip(pending, values):
+            if value is None:
+                self.l2_misses += 1
+                continue
+
+            try:
+                value = self._decode(value)
+            except CacheCodecError as e:
+                self.l2_misses += 1
+                logger.debug(f"Cache entry '{key}' skipped: {e}")
+                continue
+
+            if not self._is_current(value):
+                self.l2_misses += 1
+                stale.append(key)
+                continue
+
+            self.l2_hits += 1
+            if self.local is not None:
+                self.local.set(key, value)
+            found[key] = self._unwrap(value)
+
+        if stale:
+            try:
+                self.redis_client.delete(*stale)
+            except Exception as e:
+                logger.error(f"Cache DELETE error for stale keys: {e}")
+
+        return found
+
+    def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        generations: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Set several values in one pipelined Redis round-trip
+
+        Args:
+            items: Mapping of key to value
+            ttl: Time to live in seconds for every key (default: REDIS_CACHE_TTL)
+            tags: Tags every entry is invalidated with (see invalidate_tags)
+            ttls: Per-key TTLs overriding `ttl`
+            generations: tag_generations() read before the values were loaded
+                (default: the current generations)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items or not self.is_available():
+            return False
+
+        ttl = ttl or self.default_ttl
+        ttls = ttls or {}
+
+        if tags:
+            generations = generations or self._current_generations(tags)
+            if generations is None:
+                # Unknown generations: caching could resurrect invalidated data
+                return False
+
+        entries = {
+            key: self._envelope(value, generations) if tags else value
+            for key, value in items.items()
+        }
+
+        if self.local is not None:
+            for key, value in entries.items():
+                key_ttl = ttls.get(key, ttl)
+                l1_ttl = min(key_ttl, self.local.default_ttl) if self.is_redis_available() else key_ttl
+                self.local.set(key, value, l1_ttl)
+
+        if not self.is_redis_available():
+            return True
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in entries.items():
+                pipe.setex(key, ttls.get(key, ttl), self.codec.encode(value))
+            pipe.execute()
+            self._publish_invalidation("delete", keys=list(entries))
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache SET MANY error for {len(entries)} keys: {e}")
+            return False
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several keys in one Redis round-trip
+
+        Args:
+            keys: Cache keys to delete
+
+        Returns:
+            Number of keys deleted from Redis (from L1 in L1-only mode)
+        """
+        keys = list(keys)
+        if not keys or not self.is_available():
+            return 0
+
+        local_deleted = self.local.delete(keys) if self.local is not None else 0
+
+        if not self.is_redis_available():
+            return local_deleted
+
+        try:
+            deleted = self.redis_client.delete(*keys)
+            self._publish_invalidation("delete", keys=keys)
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache DELETE MANY error for {len(keys)} keys: {e}")
+            return 0
+
+    def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
         """
         Delete all keys matching pattern
 
+        Walks the keyspace incrementally with SCAN so Redis is never blocked,
+        but the cost still grows with the number of keys. Prefer tagging
+        entries and calling invalidate_tags() on write paths.
+
         Args:
             pattern: Redis pattern (e.g., "products:*")
+            batch_size: SCAN COUNT hint and delete batch size
 
         Returns:
             Number of keys deleted
@@ -133,15 +475,86 @@ class CacheService:
         if not self.is_available():
             return 0
 
+        local_deleted = self.local.delete_pattern(pattern) if self.local is not None else 0
+
+        if not self.is_redis_available():
+            return local_deleted
+
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis_client.delete(*batch)
+
+            self._publish_invalidation("pattern", pattern=pattern)
+            return deleted
         except Exception as e:
             logger.error(f"Cache DELETE PATTERN error for '{pattern}': {e}")
             return 0
 
+    def invalidate_tags(self, *tags: str) -> bool:
+        """
+        Invalidate every entry registered under any of the given tags
+
+        Bumps one generation counter per tag (a single pipelined round-trip),
+        so the cost does not depend on how many entries carry the tag. Stale
+        entries are skipped on read and age out through their TTL.
+
+        Args:
+            *tags: Tags to invalidate (e.g., "products:list")
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not tags or not self.is_available():
+            return False
+
+        if not self.is_redis_available():
+            with self._tag_lock:
+                for tag in tags:
+                    generation = self._tag_generations.get(tag, (0, 0.0))[0]
+                    self._tag_generations[tag] = (generation + 1, time.monotonic())
+            return True
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(self._tag_key(tag))
+            generations = dict(zip(tags, pipe.execute()))
+        except Exception as e:
+            logger.error(f"Cache INVALIDATE TAGS error for {list(tags)}: {e}")
+            # L2 entries can no longer be trusted to be checked; at least drop L1
+            if self.local is not None:
+                self.local.clear()
+            return False
+
+        self._merge_generations(generations)
+        self._publish_invalidation("tags", tags=generations)
+        return True
+
+    def tag_generations(self, tags: List[str]) -> Optional[Dict[str, int]]:
+        """
+        Snapshot the generations of some tags
+
+        Read them before loading a value and pass them to set()/set_many():
+        if a tag is invalidated meanwhile, the stored entry is already stale
+        instead of being tagged with the new generation.
+
+        Args:
+            tags: Tag names
+
+        Returns:
+            Mapping of tag to generation, or None if Redis could not be read
+        """
+        if not self.is_available():
+            return None
+        return self._current_generations(tags)
+
     def clear_all(self) -> bool:
         """
         Clear all cache (use with caution!)
@@ -152,8 +565,16 @@ class CacheService:
         if not self.is_available():
             return False
 
+        if self.local is not None:
+            self.local.clear()
+
+        if not self.is_redis_available():
+            logger.warning("⚠️  Local cache cleared!")
+            return True
+
         try:
             self.redis_client.flushdb()
+            self._publish_invalidation("clear")
             logger.warning("⚠️  All cache cleared!")
             return True
         except Exception as e:
@@ -165,124 +586,624 @@ class CacheService:
         key: str,
         callback: Callable[[], Any],
         ttl: Optional[int] = None,
-        max_retries: int = 3,
-        retry_delay: float = 0.1
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[int] = None
     ) -> Any:
         """
-        Get value from cache or compute and cache it with distributed stampede protection
-
-        This method uses DISTRIBUTED Redis locks to ensure that when cache expires,
-        only ONE worker/process/thread recomputes the value while others wait.
-        This is safe for multi-worker deployments (unlike threading.Lock).
+        Get value from cache or compute and cache it, serving stale values while one caller refreshes
+
+        Entries carry a soft expiry (the TTL, with random jitter) and live in
+        Redis until a hard expiry (soft + stale_ttl):
+
+        - Before the soft expiry the cached value is returned. Close to it, a
+          caller may be picked to refresh early (probabilistic early
+          expiration, weighted by how long the last computation took), so a
+          page of keys written together does not expire together.
+        - Between soft and hard expiry the entry is stale. Every caller gets
+          the stale value immediately; the one that wins the distributed
+          refresh lock also schedules a background recompute on a bounded
+          executor (CACHE_REFRESH_WORKERS threads, at most
+          CACHE_REFRESH_MAX_PENDING refreshes queued or running; beyond that
+          the refresh is skipped and a later caller retries). The background
+          job releases the lock when it finishes.
+        - With no usable entry (cold key, hard expiry, tag invalidation) one
+          caller computes the value. Other callers in this worker wait for its
+          result, and callers in other workers (which lose the refresh lock)
+          re-read the cache; after CACHE_MISS_WAIT seconds without a value
+          they compute it themselves. The wait blocks the calling thread, so
+          async code must use aget_or_set().
+
+        If a refresh fails, the stale value stays and the error is logged.
+        Background refreshes run after the request that triggered them has
+        finished, so callback must not use request-scoped resources (e.g.
+        the request's database session).
 
         Args:
             key: Cache key
             callback: Function to call if cache miss
-            ttl: Time to live in seconds
-            max_retries: Maximum retries to acquire lock
-            retry_delay: Delay between retries in seconds
+            ttl: Soft time to live in seconds (default: REDIS_CACHE_TTL)
+            tags: Tags the entry is invalidated with (see invalidate_tags)
+            stale_ttl: Seconds a value may be served stale (default: CACHE_STALE_TTL)
 
         Returns:
             Cached or computed value
 
         Example:
-            # Without stampede protection (BAD):
-            # Cache expires at 12:00:00
-            # 100 requests across 8 workers at 12:00:01 -> 100 DB queries!
-
-            # With distributed lock stampede protection (GOOD):
-            # Cache expires at 12:00:00
-            # Worker 1 / Request 1 acquires Redis lock, calls callback()
-            # Workers 2-8 / Requests 2-100 wait and retry
-            # All requests get the cached result
+            # Key expires at 12:00:00, 100 requests across 8 workers at 12:00:01
+            # Request 1 wins the refresh lock and schedules callback()
+            # Requests 1-100 get the previous value without waiting
         """
         if not self.is_available():
-            # Redis not available - compute directly without caching
-            logger.warning(f"Redis unavailable, computing without cache: {key}")
+            # No cache tier available - compute directly without caching
+            logger.warning(f"Cache unavailable, computing without cache: {key}")
             return callback()
 
-        # Try to get from cache (fast path)
-        cached_value = self.get(key)
-        if cached_value is not None:
-            logger.debug(f"Cache HIT: {key}")
-            return cached_value
+        ttl = ttl or self.default_ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        entry = self.get(key)
+        if entry is not None and not (isinstance(entry, dict) and _SWR_FIELD in entry):
+            # Plain value written with set(): no expiry metadata to act on
+            return entry
+
+        if entry is not None:
+            if not self._should_refresh(entry):
+                logger.debug(f"Cache HIT: {key}")
+                return entry[_SWR_VALUE]
+
+            # Serve what we have; the lock winner refreshes it in the background
+            token = self._acquire_refresh(key)
+            if token is not None:
+                self._schedule_refresh(key, token, callback, ttl, stale_ttl, tags)
+            self.swr_stale_served += 1
+            return entry[_SWR_VALUE]
 
-        # Cache miss - need to recompute with distributed stampede protection
         logger.debug(f"Cache MISS: {key}")
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+
+        if not leader:
+            # This worker is already computing the key: wait for its result
+            try:
+                value = flight.result(timeout=self.miss_wait)
+            except FutureTimeoutError:
+                value = _MISSING
+            if value is not _MISSING:
+                self.swr_coalesced += 1
+                return value
+            return self._compute_and_store(key, callback, ttl, stale_ttl, tags)
 
-        # Build lock key
-        lock_key = f"lock:{key}"
-
-        # Try to acquire distributed lock
-        for attempt in range(max_retries):
-            # Try to set lock with NX (only if not exists) and EX (expiration)
-            lock_acquired = self.redis_client.set(
-                lock_key,
-                "1",
-                nx=True,  # Only set if key doesn't exist
-                ex=self.lock_timeout  # Auto-expire after timeout
-            )
+        value = _MISSING
+        try:
+            value = self._compute_miss(key, callback, ttl, stale_ttl, tags)
+            return value
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.set_result(value)
 
-            if lock_acquired:
-                # We got the lock! Compute and cache the value
-                logger.debug(f"Lock acquired for: {key}")
-                try:
-                    # Double-check cache (another process may have filled it)
-                    cached_value = self.get(key)
-                    if cached_value is not None:
-                        logger.debug(f"Cache HIT after lock: {key}")
-                        return cached_value
-
-                    # Compute value
-                    logger.info(f"Computing value for cache key: {key}")
-                    value = callback()
-
-                    # Store in cache
-                    self.set(key, value, ttl)
-
-                    return value
-
-                except Exception as e:
-                    logger.error(f"Error computing value for cache key '{key}': {e}")
-                    raise
-
-                finally:
-                    # Always release the lock
-                    try:
-                        self.redis_client.delete(lock_key)
-                        logger.debug(f"Lock released for: {key}")
-                    except Exception as e:
-                        logger.error(f"Error releasing lock for '{key}': {e}")
-
-            else:
-                # Lock already held by another process/worker
-                # Wait a bit and retry to get cached result
-                logger.debug(
-                    f"Lock held by another process for '{key}', "
-                    f"retry {attempt + 1}/{max_retries}"
+    def _schedule_refresh(
+        self,
+        key: str,
+        token: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> bool:
+        """
+        Queue a background refresh of a stale key on the refresh executor
+
+        Returns:
+            False if too many refreshes are pending (the lock is released and
+            a later caller retries)
+        """
+        with self._refresh_lock:
+            scheduled = self._refresh_pending < self.refresh_max_pending
+            if scheduled:
+                self._refresh_pending += 1
+
+        if scheduled:
+            try:
+                self._refresh_executor.submit(
+                    self._background_refresh, key, token, callback, ttl, stale_ttl, tags
                 )
-                time.sleep(retry_delay)
-
-                # Check if cache was filled while waiting
-                cached_value = self.get(key)
-                if cached_value is not None:
-                    logger.debug(f"Cache HIT after waiting: {key}")
-                    return cached_value
-
-        # Failed to acquire lock after all retries
-        # Fallback: compute without lock (better than failing)
-        logger.warning(
-            f"Failed to acquire lock for '{key}' after {max_retries} retries, "
-            f"computing without lock"
-        )
+                return True
+            except RuntimeError:
+                # Executor shut down (application stopping)
+                with self._refresh_lock:
+                    self._refresh_pending -= 1
+
+        self.swr_refresh_skipped += 1
+        self._release_refresh(key, token)
+        return False
+
+    def _background_refresh(
+        self,
+        key: str,
+        token: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> None:
+        """Recompute a stale key on the refresh executor, then release its lock"""
         try:
-            value = callback()
-            # Try to cache anyway (best effort)
-            self.set(key, value, ttl)
+            self._compute_and_store(key, callback, ttl, stale_ttl, tags)
+        except Exception as e:
+            logger.error(f"Error refreshing cache key '{key}', keeping stale value: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refresh_pending -= 1
+            self._release_refresh(key, token)
+
+    def _compute_miss(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> Any:
+        """Compute a missing key, unless another worker stores it within miss_wait"""
+        token = self._acquire_refresh(key)
+        if token is None:
+            # Another worker holds the refresh lock: give its write a moment to land
+            deadline = time.monotonic() + self.miss_wait
+            while time.monotonic() < deadline:
+                time.sleep(self.miss_poll_interval)
+                entry = self.get(key)
+                if entry is not None:
+                    self.swr_coalesced += 1
+                    return self._swr_value(entry)
+            return self._compute_and_store(key, callback, ttl, stale_ttl, tags)
+
+        try:
+            return self._compute_and_store(key, callback, ttl, stale_ttl, tags)
+        finally:
+            self._release_refresh(key, token)
+
+    @staticmethod
+    def _swr_value(entry: Any) -> Any:
+        """Value held by a get_or_set entry (or a plain value written with set())"""
+        if isinstance(entry, dict) and _SWR_FIELD in entry:
+            return entry[_SWR_VALUE]
+        return entry
+
+    def _jittered_ttl(self, ttl: int) -> float:
+        """Spread expiries of keys written together over +/- ttl_jitter"""
+        if self.ttl_jitter <= 0:
+            return float(ttl)
+        return max(1.0, ttl * (1 + random.uniform(-self.ttl_jitter, self.ttl_jitter)))
+
+    def _should_refresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        Decide whether a get_or_set entry should be recomputed now
+
+        Stale entries always qualify. Fresh entries qualify with a probability
+        that grows as the soft expiry approaches and with the cost of the last
+        computation (XFetch: now - delta * beta * ln(rand) >= expiry).
+        """
+        now = time.time()
+        soft_expiry = entry.get(_SWR_SOFT_EXPIRY, 0)
+        if now >= soft_expiry:
+            return True
+
+        delta = entry.get(_SWR_DELTA) or 0
+        if delta <= 0 or self.early_recompute_beta <= 0:
+            return False
+
+        if now - delta * self.early_recompute_beta * math.log(1.0 - random.random()) >= soft_expiry:
+            self.swr_early_refreshes += 1
+            return True
+        return False
+
+    def _compute_and_store(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> Any:
+        """Run callback() and store it as a get_or_set entry"""
+        # Snapshot tag generations before computing, so an invalidation that
+        # lands while callback() runs makes the stored entry stale
+        generations = self._current_generations(tags) if tags else None
+
+        start = time.time()
+        logger.info(f"Computing value for cache key: {key}")
+        value = callback()
+        finished = time.time()
+        self.swr_refreshes += 1
+
+        if tags and generations is None:
             return value
+
+        soft_ttl = self._jittered_ttl(ttl)
+        entry = {
+            _SWR_FIELD: 1,
+            _SWR_VALUE: value,
+            _SWR_SOFT_EXPIRY: finished + soft_ttl,
+            _SWR_DELTA: round(finished - start, 6),
+        }
+        if tags:
+            entry = self._envelope(entry, generations)
+
+        self.set(key, entry, int(math.ceil(soft_ttl + stale_ttl)))
+        return value
+
+    def _acquire_refresh(self, key: str) -> Optional[str]:
+        """
+        Try to become the single refresher of a key (never waits)
+
+        Uses a Redis NX lock shared by all workers, or an in-process set in
+        L1-only mode.
+
+        Returns:
+            Owner token to pass to _release_refresh() if this caller should
+            recompute the key, None if someone else is already doing it
+        """
+        token = f"{self.instance_id}:{uuid.uuid4().hex}"
+        if not self.is_redis_available():
+            with self._refresh_lock:
+                if key in self._refreshing:
+                    return None
+                self._refreshing.add(key)
+                return token
+
+        try:
+            acquired = self.redis_client.set(f"lock:{key}", token, nx=True, ex=self.lock_timeout)
+            return token if acquired else None
         except Exception as e:
-            logger.error(f"Error in fallback computation for '{key}': {e}")
-            raise
+            logger.error(f"Error acquiring refresh lock for '{key}': {e}")
+            return token
+
+    def _release_refresh(self, key: str, token: str) -> None:
+        """
+        Release the refresh lock taken by _acquire_refresh()
+
+        The Redis lock is deleted only if it still holds our token: after a
+        computation longer than lock_timeout it may belong to another caller.
+        """
+        if not self.is_redis_available():
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+            return
+
+        try:
+            self._lock_script(self.redis_client)(keys=[f"lock:{key}"], args=[token])
+        except Exception as e:
+            logger.error(f"Error releasing lock for '{key}': {e}")
+
+    def _lock_script(self, client) -> Any:
+        """RELEASE_LOCK_LUA registered on a (sync or asyncio) client"""
+        script = self._lock_scripts.get(id(client))
+        if script is None:
+            script = client.register_script(RELEASE_LOCK_LUA)
+            self._lock_scripts[id(client)] = script
+        return script
+
+    # ------------------------------------------------------------------
+    # Asyncio API (redis.asyncio pool): same semantics as the sync methods
+    # ------------------------------------------------------------------
+
+    async def _sync_fallback(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a sync method when there is no asyncio client
+
+        With Redis the call goes to the threadpool so the loop never waits
+        on the socket; in L1-only mode it only touches memory and runs inline.
+        """
+        if self.is_redis_available():
+            return await run_in_threadpool(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache without blocking the event loop
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found or cache unavailable
+        """
+        if not self.is_async_redis_available():
+            return await self._sync_fallback(self.get, key)
+
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                if await self._ais_current(value):
+                    return self._unwrap(value)
+                self.local.delete([key])
+
+        try:
+            value = await self.async_redis_client.get(key)
+            if value is None:
+                self.l2_misses += 1
+                return None
+
+            try:
+                value = self._decode(value)
+            except CacheCodecError as e:
+                # Written in a format this version cannot read: a miss
+                self.l2_misses += 1
+                logger.debug(f"Cache entry '{key}' skipped: {e}")
+                return None
+
+            if not await self._ais_current(value):
+                # Written under an older tag generation: drop it early
+                self.l2_misses += 1
+                await self.async_redis_client.delete(key)
+                return None
+
+            self.l2_hits += 1
+
+            # Promote to L1 (short TTL bounds staleness if a broadcast is missed)
+            if self.local is not None:
+                self.local.set(key, value)
+
+            return self._unwrap(value)
+
+        except Exception as e:
+            self.l2_errors += 1
+            logger.error(f"Cache GET error for key '{key}': {e}")
+            return None
+
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Set value in cache without blocking the event loop
+
+        Args:
+            key: Cache key
+            value: Value to cache (encoded by the cache codec)
+            ttl: Time to live in seconds (default: REDIS_CACHE_TTL)
+            tags: Tags the entry is invalidated with (see adelete_tags)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.is_async_redis_available():
+            return await self._sync_fallback(self.set, key, value, ttl, tags)
+
+        ttl = ttl or self.default_ttl
+
+        if tags:
+            generations = await self._acurrent_generations(tags)
+            if generations is None:
+                # Unknown generations: caching could resurrect invalidated data
+                return False
+            value = self._envelope(value, generations)
+
+        if self.local is not None:
+            self.local.set(key, value, min(ttl, self.local.default_ttl))
+
+        try:
+            await self.async_redis_client.setex(key, ttl, self.codec.encode(value))
+            await self._apublish_invalidation("delete", keys=[key])
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache SET error for key '{key}': {e}")
+            return False
+
+    async def adelete_tags(self, *tags: str) -> bool:
+        """
+        Invalidate every entry registered under any of the given tags (async invalidate_tags)
+
+        Args:
+            *tags: Tags to invalidate (e.g., "products:list")
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not tags:
+            return False
+        if not self.is_async_redis_available():
+            return await self._sync_fallback(self.invalidate_tags, *tags)
+
+        try:
+            pipe = self.async_redis_client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(self._tag_key(tag))
+            generations = dict(zip(tags, await pipe.execute()))
+        except Exception as e:
+            logger.error(f"Cache INVALIDATE TAGS error for {list(tags)}: {e}")
+            if self.local is not None:
+                self.local.clear()
+            return False
+
+        self._merge_generations(generations)
+        await self._apublish_invalidation("tags", tags=generations)
+        return True
+
+    async def aget_or_set(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Async get_or_set(): stale values are refreshed by a background task
+
+        Args:
+            key: Cache key
+            callback: Function or coroutine function computing the value
+            ttl: Soft time to live in seconds (default: REDIS_CACHE_TTL)
+            tags: Tags the entry is invalidated with (see adelete_tags)
+            stale_ttl: Seconds a value may be served stale (default: CACHE_STALE_TTL)
+
+        Returns:
+            Cached or computed value
+        """
+        if not self.is_available():
+            logger.warning(f"Cache unavailable, computing without cache: {key}")
+            return await self._acall(callback)
+
+        ttl = ttl or self.default_ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        entry = await self.aget(key)
+        if entry is not None and not (isinstance(entry, dict) and _SWR_FIELD in entry):
+            return entry
+
+        if entry is not None:
+            if not self._should_refresh(entry):
+                logger.debug(f"Cache HIT: {key}")
+                return entry[_SWR_VALUE]
+
+            token = await self._aacquire_refresh(key)
+            if token is not None:
+                # Keep a reference: the loop only holds tasks weakly
+                task = asyncio.create_task(
+                    self._abackground_refresh(key, token, callback, ttl, stale_ttl, tags)
+                )
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            self.swr_stale_served += 1
+            return entry[_SWR_VALUE]
+
+        logger.debug(f"Cache MISS: {key}")
+        flight = self._aflights.get(key)
+        if flight is not None:
+            # This worker is already computing the key: wait for its result
+            try:
+                value = await asyncio.wait_for(asyncio.shield(flight), self.miss_wait)
+            except asyncio.TimeoutError:
+                value = _MISSING
+            if value is not _MISSING:
+                self.swr_coalesced += 1
+                return value
+            return await self._acompute_and_store(key, callback, ttl, stale_ttl, tags)
+
+        flight = self._aflights[key] = asyncio.get_running_loop().create_future()
+        value = _MISSING
+        try:
+            value = await self._acompute_miss(key, callback, ttl, stale_ttl, tags)
+            return value
+        finally:
+            self._aflights.pop(key, None)
+            if not flight.done():
+                flight.set_result(value)
+
+    async def _abackground_refresh(
+        self,
+        key: str,
+        token: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> None:
+        """Async version of _background_refresh() (runs as an asyncio task)"""
+        try:
+            await self._acompute_and_store(key, callback, ttl, stale_ttl, tags)
+        except Exception as e:
+            logger.error(f"Error refreshing cache key '{key}', keeping stale value: {e}")
+        finally:
+            await self._arelease_refresh(key, token)
+
+    async def _acompute_miss(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> Any:
+        """Async version of _compute_miss() (waits without blocking the loop)"""
+        token = await self._aacquire_refresh(key)
+        if token is None:
+            deadline = time.monotonic() + self.miss_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.miss_poll_interval)
+                entry = await self.aget(key)
+                if entry is not None:
+                    self.swr_coalesced += 1
+                    return self._swr_value(entry)
+            return await self._acompute_and_store(key, callback, ttl, stale_ttl, tags)
+
+        try:
+            return await self._acompute_and_store(key, callback, ttl, stale_ttl, tags)
+        finally:
+            await self._arelease_refresh(key, token)
+
+    @staticmethod
+    async def _acall(callback: Callable[[], Any]) -> Any:
+        result = callback()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _acompute_and_store(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> Any:
+        """Async version of _compute_and_store()"""
+        generations = await self._acurrent_generations(tags) if tags else None
+
+        start = time.time()
+        logger.info(f"Computing value for cache key: {key}")
+        value = await self._acall(callback)
+        finished = time.time()
+        self.swr_refreshes += 1
+
+        if tags and generations is None:
+            return value
+
+        soft_ttl = self._jittered_ttl(ttl)
+        entry = {
+            _SWR_FIELD: 1,
+            _SWR_VALUE: value,
+            _SWR_SOFT_EXPIRY: finished + soft_ttl,
+            _SWR_DELTA: round(finished - start, 6),
+        }
+        if tags:
+            entry = self._envelope(entry, generations)
+
+        await self.aset(key, entry, int(math.ceil(soft_ttl + stale_ttl)))
+        return value
+
+    async def _aacquire_refresh(self, key: str) -> Optional[str]:
+        """Async version of _acquire_refresh()"""
+        if not self.is_async_redis_available():
+            return await self._sync_fallback(self._acquire_refresh, key)
+
+        token = f"{self.instance_id}:{uuid.uuid4().hex}"
+        try:
+            acquired = await self.async_redis_client.set(f"lock:{key}", token, nx=True, ex=self.lock_timeout)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Error acquiring refresh lock for '{key}': {e}")
+            return token
+
+    async def _arelease_refresh(self, key: str, token: str) -> None:
+        """Async version of _release_refresh()"""
+        if not self.is_async_redis_available():
+            await self._sync_fallback(self._release_refresh, key, token)
+            return
+
+        try:
+            await self._lock_script(self.async_redis_client)(keys=[f"lock:{key}"], args=[token])
+        except Exception as e:
+            logger.error(f"Error releasing lock for '{key}': {e}")
 
     def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """
@@ -295,7 +1216,7 @@ class CacheService:
         Returns:
             New value or None if cache unavailable
         """
-        if not self.is_available():
+        if not self.is_redis_available():
             return None
 
         try:
@@ -315,7 +1236,7 @@ class CacheService:
         Returns:
             True if successful
         """
-        if not self.is_available():
+        if not self.is_redis_available():
             return False
 
         try:
@@ -334,7 +1255,7 @@ class CacheService:
         Returns:
             Remaining seconds or None
         """
-        if not self.is_available():
+        if not self.is_redis_available():
             return None
 
         try:
@@ -344,6 +1265,256 @@ class CacheService:
             logger.error(f"Cache GET TTL error for key '{key}': {e}")
             return None
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-tier hit/miss counters
+
+        Returns:
+            Dictionary with cache mode and L1/L2 statistics
+        """
+        return {
+            "mode": self.mode,
+            "codec": self.codec.name,
+            "l1": self.local.stats() if self.local is not None else None,
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+            } if self.is_redis_available() else None,
+            "tags": {
+                "tracked": len(self._tag_generations),
+                "stale_entries": self.tag_stale,
+            },
+            "swr": {
+                "refreshes": self.swr_refreshes,
+                "early_refreshes": self.swr_early_refreshes,
+                "stale_served": self.swr_stale_served,
+                "coalesced_misses": self.swr_coalesced,
+                "pending_refreshes": self._refresh_pending + len(self._refresh_tasks),
+                "skipped_refreshes": self.swr_refresh_skipped,
+            },
+        }
+
+    def _tag_key(self, tag: str) -> str:
+        """Redis key holding the generation counter of a tag"""
+        return f"{self.tag_key_prefix}:{tag}"
+
+    def _merge_generations(self, generations: Dict[str, Any]) -> None:
+        """Record tag generations in the in-process mirror (never moves backwards)"""
+        now = time.monotonic()
+        with self._tag_lock:
+            for tag, generation in generations.items():
+                generation = int(generation)
+                known = self._tag_generations.get(tag)
+                if known is not None and known[0] > generation:
+                    generation = known[0]
+                self._tag_generations[tag] = (generation, now)
+
+    def _current_generations(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """
+        Resolve the current generation of each tag
+
+        Mirrored generations are trusted while the invalidation listener keeps
+        them up to date (and re-read from Redis every TAG_REFRESH_INTERVAL in
+        case a broadcast was missed). Without Redis the mirror is the source
+        of truth.
+
+        Args:
+            tags: Tag names
+
+        Returns:
+            Mapping of tag to generation, or None if Redis could not be read
+        """
+        generations, missing = self._mirrored_generations(tags)
+        if not missing:
+            return generations
+
+        try:
+            values = self.redis_client.mget([self._tag_key(tag) for tag in missing])
+        except Exception as e:
+            self.l2_errors += 1
+            logger.error(f"Cache tag generation read error for {missing}: {e}")
+            return None
+
+        generations.update(self._fetched_generations(missing, values))
+        return generations
+
+    async def _acurrent_generations(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """Async version of _current_generations()"""
+        generations, missing = self._mirrored_generations(tags)
+        if not missing:
+            return generations
+
+        try:
+            values = await self.async_redis_client.mget([self._tag_key(tag) for tag in missing])
+        except Exception as e:
+            self.l2_errors += 1
+            logger.error(f"Cache tag generation read error for {missing}: {e}")
+            return None
+
+        generations.update(self._fetched_generations(missing, values))
+        return generations
+
+    def _mirrored_generations(self, tags: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Split tags into generations known in-process and tags to read from Redis
+
+        Returns:
+            Tuple of (known generations, tags missing from the mirror)
+        """
+        redis_available = self.is_redis_available()
+        trust_mirror = not redis_available or self._pubsub_thread is not None
+        now = time.monotonic()
+
+        generations: Dict[str, int] = {}
+        missing: List[str] = []
+        with self._tag_lock:
+            for tag in tags:
+                known = self._tag_generations.get(tag)
+                if known is not None and trust_mirror and (
+                    not redis_available or now - known[1] < self.tag_refresh_interval
+                ):
+                    generations[tag] = known[0]
+                else:
+                    missing.append(tag)
+
+        if missing and not redis_available:
+            # Never invalidated in this process
+            generations.update((tag, 0) for tag in missing)
+            missing = []
+        return generations, missing
+
+    def _fetched_generations(self, tags: List[str], values: List[Any]) -> Dict[str, int]:
+        """Mirror generations read from Redis (unset counters are generation 0)"""
+        fetched = {tag: int(value) if value is not None else 0 for tag, value in zip(tags, values)}
+        self._merge_generations(fetched)
+        return fetched
+
+    @staticmethod
+    def _envelope(value: Any, generations: Dict[str, int]) -> Dict[str, Any]:
+        """Wrap a value with the tag generations it was computed under"""
+        return {_TAGS_FIELD: generations, _VALUE_FIELD: value}
+
+    @staticmethod
+    def _unwrap(value: Any) -> Any:
+        """Strip the tag envelope from a cached value"""
+        if isinstance(value, dict) and _TAGS_FIELD in value:
+            return value.get(_VALUE_FIELD)
+        return value
+
+    def _is_current(self, value: Any) -> bool:
+        """Check that a tagged entry was written under the current generations"""
+        if not (isinstance(value, dict) and _TAGS_FIELD in value):
+            return True
+
+        stored = value[_TAGS_FIELD]
+        return self._matches_generations(stored, self._current_generations(stored.keys()))
+
+    async def _ais_current(self, value: Any) -> bool:
+        """Async version of _is_current()"""
+        if not (isinstance(value, dict) and _TAGS_FIELD in value):
+            return True
+
+        stored = value[_TAGS_FIELD]
+        return self._matches_generations(stored, await self._acurrent_generations(stored.keys()))
+
+    def _matches_generations(self, stored: Dict[str, int], current: Optional[Dict[str, int]]) -> bool:
+        if current is None or any(current[tag] != generation for tag, generation in stored.items()):
+            self.tag_stale += 1
+            return False
+        return True
+
+    def _decode(self, value: bytes) -> Any:
+        """
+        Deserialize a Redis value
+
+        Raises:
+            CacheCodecError: If the entry was written in an unknown format
+        """
+        return self.codec.decode(value)
+
+    async def _apublish_invalidation(self, op: str, **payload) -> None:
+        """Async version of _publish_invalidation()"""
+        if self.local is None or not self.is_async_redis_available():
+            return
+
+        try:
+            message = json_codec.dumps({"origin": self.instance_id, "op": op, **payload})
+            await self.async_redis_client.publish(self.invalidation_channel, message)
+        except Exception as e:
+            logger.error(f"Cache invalidation PUBLISH error ({op}): {e}")
+
+    def _publish_invalidation(self, op: str, **payload) -> None:
+        """
+        Broadcast an L1 invalidation to the other workers
+
+        Args:
+            op: "delete", "pattern", "tags" or "clear"
+            **payload: Operation arguments (keys / pattern / tag generations)
+        """
+        if self.local is None or not self.is_redis_available():
+            return
+
+        try:
+            message = json_codec.dumps({"origin": self.instance_id, "op": op, **payload})
+            self.redis_client.publish(self.invalidation_channel, message)
+        except Exception as e:
+            logger.error(f"Cache invalidation PUBLISH error ({op}): {e}")
+
+    def _handle_invalidation(self, message: Dict[str, Any]) -> None:
+        """Apply an invalidation broadcast by another worker to L1"""
+        try:
+            payload = json_codec.loads(message["data"])
+        except (json_codec.JSONDecodeError, TypeError, KeyError):
+            return
+
+        if payload.get("origin") == self.instance_id:
+            return
+
+        op = payload.get("op")
+        if op == "delete":
+            self.local.delete(payload.get("keys", []))
+        elif op == "pattern":
+            self.local.delete_pattern(payload.get("pattern", ""))
+        elif op == "tags":
+            self._merge_generations(payload.get("tags", {}))
+        elif op == "clear":
+            self.local.clear()
+
+    def _on_listener_error(self, error: BaseException, pubsub, thread) -> None:
+        """Drop L1 when the subscription breaks: broadcasts may have been missed"""
+        logger.error(f"Cache invalidation listener error: {error}")
+        if self.local is not None:
+            self.local.clear()
+        with self._tag_lock:
+            self._tag_generations.clear()
+        time.sleep(1.0)
+
+    def _start_invalidation_listener(self) -> None:
+        """Subscribe to the invalidation channel in a background thread"""
+        if self.local is None or not self.is_redis_available():
+            return
+
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation})
+            self._pubsub_thread = pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error
+            )
+        except Exception as e:
+            # Without the listener L1 entries still expire after L1_TTL
+            logger.warning(f"Cache invalidation listener not started: {e}")
+
+    def close(self) -> None:
+        """Stop the invalidation listener thread and drop queued refreshes"""
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+        # Locks of dropped refreshes expire after lock_timeout
+        self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+
     def build_key(self, prefix: str, *args, **kwargs) -> str:
         """
         Build cache key from components
@@ -27,6 +27,8 @@ class CategoryService(BaseServiceImpl):
         self.cache_prefix = "categories"
         # Categories change rarely, so longer TTL (1 hour)
         self.cache_ttl = 3600
+        # Lists and single items are all invalidated together on any write
+        self.cache_tag = self.cache_prefix
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[CategorySchema]:
         """
@@ -48,13 +50,18 @@ class CategoryService(BaseServiceImpl):
             logger.debug(f"Cache HIT: {cache_key}")
             return [CategorySchema(**c) for c in cached_categories]
 
-        # Cache miss
+        # Cache miss: snapshot the tag before querying, so a write landing
+        # during the query leaves the stored list stale
         logger.debug(f"Cache MISS: {cache_key}")
+        generations = self.cache.tag_generations([self.cache_tag])
         categories = super().get_all(skip, limit)
 
         # Cache with longer TTL
-        categories_dict = [c.model_dump() for c in categories]
-        self.cache.set(cache_key, categories_dict, ttl=self.cache_ttl)
+        if generations is not None:
+            categories_dict = [c.model_dump() for c in categories]
+            self.cache.set(
+                cache_key, categories_dict, ttl=self.cache_ttl, tags=[self.cache_tag], generations=generations
+            )
 
         return categories
 
@@ -73,9 +80,13 @@ class CategoryService(BaseServiceImpl):
             return CategorySchema(**cached_category)
 
         logger.debug(f"Cache MISS: {cache_key}")
+        generations = self.cache.tag_generations([self.cache_tag])
         category = super().get_one(id_key)
 
-        self.cache.set(cache_key, category.model_dump(), ttl=self.cache_ttl)
+        if generations is not None:
+            self.cache.set(
+                cache_key, category.model_dump(), ttl=self.cache_ttl, tags=[self.cache_tag], generations=generations
+            )
 
         return category
 
@@ -122,7 +133,5 @@ class CategoryService(BaseServiceImpl):
 
     def _invalidate_all_cache(self):
         """Invalidate all category caches"""
-        pattern = f"{self.cache_prefix}:*"
-        deleted_count = self.cache.delete_pattern(pattern)
-        if deleted_count > 0:
-            logger.info(f"Invalidated {deleted_count} category cache entries")
+        if self.cache.invalidate_tags(self.cache_tag):
+            logger.info(f"Invalidated category cache (tag '{self.cache_tag}')")
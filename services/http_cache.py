@@ -0,0 +1,216 @@
+"""
+HTTP Conditional Cache Module
+
+ETag / If-None-Match support for public catalog reads.
+
+Responses get a weak ETag computed from the hash of their JSON body, plus
+a Cache-Control policy so browsers and nginx can reuse them. The ETag is
+also stored in CacheService under the request's path and query, tagged with
+the resources it depends on. When a request's If-None-Match matches that
+stored validator, the handler returns 304 before touching the database.
+
+Write paths keep validators honest by invalidating the tags below (an O(1)
+generation bump in CacheService); validators also expire after
+VALIDATOR_TTL, which bounds staleness for writes that bypass the services.
+
+Async handlers use anot_modified / arespond / ainvalidate, which go through
+the asyncio cache API and never block the event loop on Redis.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+from config.constants import HttpCacheConfig
+from services.cache_service import cache_service
+from utils.json_codec import AppJSONResponse
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+# Product listings, search and detail (stock, price and rating aggregates)
+PRODUCTS_TAG = "http:products"
+
+
+def product_reviews_tag(product_id: int) -> str:
+    """Tag of the public review listing of a product"""
+    return f"http:reviews:product:{product_id}"
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Build a weak ETag from a response body
+
+    Weak, because compression in front of the app changes the bytes but not
+    the meaning of the representation.
+
+    Args:
+        body: Encoded response body
+
+    Returns:
+        ETag header value like W/"3f2a..."
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag (RFC 9110)
+
+    Args:
+        if_none_match: Header value (may list several tags or be "*")
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is still current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def cache_control(max_age: int) -> str:
+    """Cache-Control value for a public catalog response"""
+    return f"public, max-age={max_age}"
+
+
+class ConditionalCache:
+    """
+    Validator store and response helpers for conditional GETs
+    """
+
+    def __init__(self, cache=cache_service, prefix: str = HttpCacheConfig.KEY_PREFIX):
+        self.cache = cache
+        self.prefix = prefix
+        self.enabled = HttpCacheConfig.ENABLED
+        self.not_modified_early = 0
+        self.not_modified_late = 0
+        self.full_responses = 0
+
+    def _key(self, request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return self.cache.build_key(self.prefix, request.url.path, query)
+
+    def not_modified(self, request: Request, max_age: int) -> Optional[Response]:
+        """
+        Answer 304 from the cached validator, without running the handler
+
+        Args:
+            request: Incoming request
+            max_age: Cache-Control max-age for the route
+
+        Returns:
+            A 304 response, or None if the handler has to run
+        """
+        if not self.enabled or not request.headers.get("if-none-match"):
+            return None
+        return self._early_response(request, self.cache.get(self._key(request)), max_age)
+
+    async def anot_modified(self, request: Request, max_age: int) -> Optional[Response]:
+        """Async version of not_modified()"""
+        if not self.enabled or not request.headers.get("if-none-match"):
+            return None
+        return self._early_response(request, await self.cache.aget(self._key(request)), max_age)
+
+    def respond(self, request: Request, content: Any, max_age: int, tags: Iterable[str]) -> Response:
+        """
+        Encode a handler result with ETag and Cache-Control headers
+
+        Stores the ETag as the validator for this path and query, and still
+        answers 304 when the freshly computed ETag matches If-None-Match.
+
+        Args:
+            request: Incoming request
+            content: Result to encode (rows, dicts, pydantic models)
+            max_age: Cache-Control max-age for the route
+            tags: Tags whose invalidation makes the validator stale
+
+        Returns:
+            200 JSON response or 304
+        """
+        # Encoded once with orjson: no jsonable_encoder pass over the rows
+        response = AppJSONResponse(content=content)
+        if not self.enabled:
+            return response
+
+        etag = make_etag(response.body)
+        self.cache.set(self._key(request), etag, ttl=HttpCacheConfig.VALIDATOR_TTL, tags=list(tags))
+        return self._full_response(request, response, etag, max_age)
+
+    async def arespond(self, request: Request, content: Any, max_age: int, tags: Iterable[str]) -> Response:
+        """Async version of respond()"""
+        response = AppJSONResponse(content=content)
+        if not self.enabled:
+            return response
+
+        etag = make_etag(response.body)
+        await self.cache.aset(self._key(request), etag, ttl=HttpCacheConfig.VALIDATOR_TTL, tags=list(tags))
+        return self._full_response(request, response, etag, max_age)
+
+    def _early_response(self, request: Request, etag: Optional[str], max_age: int) -> Optional[Response]:
+        if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+            return None
+
+        self.not_modified_early += 1
+        return self._not_modified_response(etag, max_age)
+
+    def _full_response(self, request: Request, response: Response, etag: str, max_age: int) -> Response:
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified_late += 1
+            return self._not_modified_response(etag, max_age)
+
+        self.full_responses += 1
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control(max_age)
+        return response
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        Make the validators of the given tags stale
+
+        Args:
+            *tags: PRODUCTS_TAG and/or product_reviews_tag(...) values
+        """
+        if self.enabled and tags and not self.cache.invalidate_tags(*tags):
+            logger.warning(f"Could not invalidate HTTP validators for {list(tags)}")
+
+    async def ainvalidate(self, *tags: str) -> None:
+        """Async version of invalidate()"""
+        if self.enabled and tags and not await self.cache.adelete_tags(*tags):
+            logger.warning(f"Could not invalidate HTTP validators for {list(tags)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Conditional request counters
+
+        Returns:
+            304s served from the cached validator (before the database), 304s
+            after running the handler, and full 200 responses
+        """
+        return {
+            "enabled": self.enabled,
+            "not_modified_early": self.not_modified_early,
+            "not_modified_late": self.not_modified_late,
+            "full_responses": self.full_responses,
+        }
+
+    @staticmethod
+    def _not_modified_response(etag: str, max_age: int) -> Response:
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": cache_control(max_age)},
+        )
+
+
+# Global conditional cache instance
+conditional_cache = ConditionalCache()
@@ -0,0 +1,376 @@
+"""
+Idempotency Service Module
+
+Stores the first response produced for each (client, Idempotency-Key) pair so
+that retried requests replay it instead of running the handler again.
+
+Each key goes through two states:
+- in_progress: claimed by the request currently running the handler. The
+  claim carries an owner token and expires after LOCK_TTL, so a crashed
+  worker never blocks the key forever.
+- completed: holds the status code and JSON body of the first response for
+  TTL seconds.
+
+Redis is the primary store (SET NX for the claim, owner-checked Lua scripts
+to complete or release it). When Redis is not configured or fails, the
+idempotency_keys table is used instead, with the composite primary key
+playing the role of SET NX.
+
+A duplicate that arrives while the first attempt is still running polls the
+store until it completes (and replays its response) or WAIT_TIMEOUT passes.
+
+Both backends use blocking clients (sync Redis, SessionLocal), so the async
+entry points (begin, acomplete, arelease) run them in the threadpool and
+never block the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import redis
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from config import redis_config
+from config.constants import IdempotencyConfig
+from config.database import SessionLocal
+from models.idempotency_key import IdempotencyKeyModel
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+STATE_IN_PROGRESS = "in_progress"
+STATE_COMPLETED = "completed"
+
+# Overwrite the claim with the final response only if we still own it
+COMPLETE_LUA = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+if cjson.decode(current)['owner'] ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+"""
+
+# Drop the claim only if we still own it and it was not completed
+RELEASE_LUA = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+local record = cjson.decode(current)
+if record['owner'] ~= ARGV[1] or record['state'] ~= 'in_progress' then
+    return 0
+end
+return redis.call('DEL', KEYS[1])
+"""
+
+
+class IdempotencyInProgressError(Exception):
+    """Raised when a duplicate request times out waiting for the first attempt"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("A request with this Idempotency-Key is still being processed")
+        self.retry_after = retry_after
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+    pass
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """First response recorded for an idempotency key"""
+    status_code: int
+    body: Any
+
+
+@dataclass
+class IdempotencyClaim:
+    """
+    Result of IdempotencyStore.begin()
+
+    Either `replay` holds the stored response to return as-is, or the caller
+    owns the key and must finish with complete() or release().
+    """
+    client_id: int
+    key: str
+    fingerprint: str
+    owner: str
+    backend: str
+    replay: Optional[StoredResponse] = None
+
+
+def request_fingerprint(payload: Any) -> str:
+    """
+    Hash a JSON-compatible request body
+
+    Args:
+        payload: Request body (e.g. model_dump(mode="json"))
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Idempotency key store backed by Redis with a database fallback
+    """
+
+    BACKEND_REDIS = "redis"
+    BACKEND_DATABASE = "database"
+
+    def __init__(self, prefix: str = IdempotencyConfig.KEY_PREFIX):
+        self.prefix = prefix
+        self._scripts: Dict[int, Dict[str, Any]] = {}
+
+    def _redis_key(self, client_id: int, key: str) -> str:
+        return f"{self.prefix}:{client_id}:{key}"
+
+    def _redis_scripts(self, client) -> Dict[str, Any]:
+        # Scripts are bound to a client; re-register if the client was swapped
+        scripts = self._scripts.get(id(client))
+        if scripts is None:
+            scripts = {
+                "complete": client.register_script(COMPLETE_LUA),
+                "release": client.register_script(RELEASE_LUA),
+            }
+            self._scripts = {id(client): scripts}
+        return scripts
+
+    async def begin(self, client_id: int, key: str, fingerprint: str) -> IdempotencyClaim:
+        """
+        Claim an idempotency key or wait for the response of its first use
+
+        Args:
+            client_id: Authenticated client id (keys are scoped per client)
+            key: Idempotency-Key header value
+            fingerprint: request_fingerprint() of the request body
+
+        Returns:
+            IdempotencyClaim, with `replay` set when a stored response exists
+
+        Raises:
+            IdempotencyKeyMismatchError: If the key was used with another body
+            IdempotencyInProgressError: If the first attempt is still running
+                after WAIT_TIMEOUT seconds
+        """
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + IdempotencyConfig.WAIT_TIMEOUT
+
+        while True:
+            backend, record = await run_in_threadpool(self._try_claim, client_id, key, fingerprint, owner)
+            claim = IdempotencyClaim(client_id, key, fingerprint, owner, backend)
+
+            if record is None:
+                return claim
+
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyKeyMismatchError(
+                    "Idempotency-Key was already used with a different request"
+                )
+
+            if record["state"] == STATE_COMPLETED:
+                claim.replay = StoredResponse(record["status_code"], record["body"])
+                return claim
+
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError(retry_after=max(1, int(IdempotencyConfig.WAIT_TIMEOUT)))
+
+            await asyncio.sleep(IdempotencyConfig.POLL_INTERVAL)
+
+    def complete(self, claim: IdempotencyClaim, status_code: int, body: Any) -> None:
+        """
+        Store the response of a claimed key so retries replay it
+
+        Args:
+            claim: Claim returned by begin()
+            status_code: HTTP status code of the response
+            body: JSON-compatible response body
+        """
+        try:
+            if claim.backend == self.BACKEND_REDIS:
+                self._complete_redis(claim, status_code, body)
+            else:
+                self._complete_db(claim, status_code, body)
+        except Exception as e:
+            # The handler already committed; retries will wait for the claim to expire
+            logger.error(f"Could not store idempotent response for key {claim.key}: {e}")
+
+    def release(self, claim: IdempotencyClaim) -> None:
+        """
+        Drop an unfinished claim so the next retry runs the handler again
+
+        Args:
+            claim: Claim returned by begin()
+        """
+        try:
+            if claim.backend == self.BACKEND_REDIS:
+                self._redis_scripts(redis_config.get_redis_client())["release"](
+                    keys=[self._redis_key(claim.client_id, claim.key)],
+                    args=[claim.owner],
+                )
+            else:
+                with SessionLocal() as db:
+                    db.execute(
+                        delete(IdempotencyKeyModel).where(
+                            IdempotencyKeyModel.client_id == claim.client_id,
+                            IdempotencyKeyModel.key == claim.key,
+                            IdempotencyKeyModel.owner == claim.owner,
+                            IdempotencyKeyModel.status == STATE_IN_PROGRESS,
+                        )
+                    )
+                    db.commit()
+        except Exception as e:
+            logger.error(f"Could not release idempotency key {claim.key}: {e}")
+
+    async def acomplete(self, claim: IdempotencyClaim, status_code: int, body: Any) -> None:
+        """Async complete(): stores the response from the threadpool"""
+        await run_in_threadpool(self.complete, claim, status_code, body)
+
+    async def arelease(self, claim: IdempotencyClaim) -> None:
+        """Async release(): drops the claim from the threadpool"""
+        await run_in_threadpool(self.release, claim)
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired rows from the database fallback table
+
+        Returns:
+            Number of rows removed
+        """
+        with SessionLocal() as db:
+            result = db.execute(
+                delete(IdempotencyKeyModel).where(IdempotencyKeyModel.expires_at < datetime.utcnow())
+            )
+            db.commit()
+            return result.rowcount or 0
+
+    def _try_claim(self, client_id: int, key: str, fingerprint: str, owner: str):
+        """Return (backend, existing record or None if the key was claimed)"""
+        client = redis_config.get_redis_client()
+        if client is not None:
+            try:
+                return self.BACKEND_REDIS, self._claim_redis(client, client_id, key, fingerprint, owner)
+            except redis.RedisError as e:
+                logger.warning(f"Redis unavailable for idempotency keys, using database: {e}")
+
+        return self.BACKEND_DATABASE, self._claim_db(client_id, key, fingerprint, owner)
+
+    # ==================== REDIS BACKEND ====================
+
+    def _claim_redis(self, client, client_id: int, key: str, fingerprint: str, owner: str) -> Optional[Dict[str, Any]]:
+        redis_key = self._redis_key(client_id, key)
+        claim = json.dumps({"state": STATE_IN_PROGRESS, "owner": owner, "fingerprint": fingerprint})
+
+        if client.set(redis_key, claim, nx=True, ex=IdempotencyConfig.LOCK_TTL):
+            return None
+
+        current = client.get(redis_key)
+        if current is None:
+            # Released or expired between SET NX and GET: claim it on the next round
+            return {"state": STATE_IN_PROGRESS, "fingerprint": fingerprint}
+        return json.loads(current)
+
+    def _complete_redis(self, claim: IdempotencyClaim, status_code: int, body: Any) -> None:
+        record = json.dumps({
+            "state": STATE_COMPLETED,
+            "owner": claim.owner,
+            "fingerprint": claim.fingerprint,
+            "status_code": status_code,
+            "body": body,
+        }, default=str)
+        stored = self._redis_scripts(redis_config.get_redis_client())["complete"](
+            keys=[self._redis_key(claim.client_id, claim.key)],
+            args=[claim.owner, record, IdempotencyConfig.TTL],
+        )
+        if not stored:
+            logger.warning(f"Idempotency claim for key {claim.key} expired before completion")
+
+    # ==================== DATABASE BACKEND ====================
+
+    def _claim_db(self, client_id: int, key: str, fingerprint: str, owner: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+
+        with SessionLocal() as db:
+            db.add(IdempotencyKeyModel(
+                client_id=client_id,
+                key=key,
+                fingerprint=fingerprint,
+                status=STATE_IN_PROGRESS,
+                owner=owner,
+                created_at=now,
+                expires_at=now + timedelta(seconds=IdempotencyConfig.LOCK_TTL),
+            ))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.execute(
+                select(IdempotencyKeyModel).where(
+                    IdempotencyKeyModel.client_id == client_id,
+                    IdempotencyKeyModel.key == key,
+                )
+            ).scalar_one_or_none()
+
+            if row is None or row.expires_at <= now:
+                if row is not None:
+                    # Stale claim or expired response: drop it (only if nobody
+                    # else replaced it meanwhile) and claim on the next round
+                    db.execute(
+                        delete(IdempotencyKeyModel).where(
+                            IdempotencyKeyModel.client_id == client_id,
+                            IdempotencyKeyModel.key == key,
+                            IdempotencyKeyModel.owner == row.owner,
+                        )
+                    )
+                    db.commit()
+                return {"state": STATE_IN_PROGRESS, "fingerprint": fingerprint}
+
+            return {
+                "state": row.status,
+                "fingerprint": row.fingerprint,
+                "status_code": row.response_code,
+                "body": json.loads(row.response_body) if row.response_body is not None else None,
+            }
+
+    def _complete_db(self, claim: IdempotencyClaim, status_code: int, body: Any) -> None:
+        now = datetime.utcnow()
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(IdempotencyKeyModel).where(
+                    IdempotencyKeyModel.client_id == claim.client_id,
+                    IdempotencyKeyModel.key == claim.key,
+                    IdempotencyKeyModel.owner == claim.owner,
+                )
+            ).scalar_one_or_none()
+
+            if row is None:
+                logger.warning(f"Idempotency claim for key {claim.key} expired before completion")
+                return
+
+            row.status = STATE_COMPLETED
+            row.response_code = status_code
+            row.response_body = json.dumps(body, default=str)
+            row.expires_at = now + timedelta(seconds=IdempotencyConfig.TTL)
+            db.commit()
+
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore()
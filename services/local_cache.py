@@ -0,0 +1,139 @@
+"""
+Local Cache Module
+
+In-process, size-bounded LRU cache with per-entry TTL. Used as the L1 tier
+in front of Redis by CacheService, and as the only tier when Redis is not
+available (e.g. on Render).
+"""
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+class LocalCache:
+    """
+    Thread-safe LRU cache with TTL eviction
+
+    Values are stored as-is (no serialization), so callers must treat
+    cached objects as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 30):
+        """
+        Initialize local cache
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            default_ttl: Default time to live in seconds
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from local cache
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Store value in local cache
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (default: default_ttl)
+        """
+        ttl = ttl or self.default_ttl
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """
+        Delete keys from local cache
+
+        Args:
+            keys: Keys to delete
+
+        Returns:
+            Number of keys removed
+        """
+        removed = 0
+        with self._lock:
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+        return removed
+
+    def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete keys matching a glob pattern (same syntax as Redis KEYS)
+
+        Args:
+            pattern: Glob pattern (e.g., "products:*")
+
+        Returns:
+            Number of keys removed
+        """
+        with self._lock:
+            matches = [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+            for key in matches:
+                del self._data[key]
+        return len(matches)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get local cache statistics
+
+        Returns:
+            Dictionary with hits, misses, size and eviction counters
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
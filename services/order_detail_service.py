@@ -1,6 +1,10 @@
 import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
 
+from models.order import OrderModel
 from models.order_detail import OrderDetailModel
 from models.product import ProductModel
 from repositories.order_detail_repository import OrderDetailRepository
@@ -106,6 +110,155 @@ class OrderDetailService(BaseServiceImpl):
             logger.error(f"Error creating order detail: {e}")
             raise
 
+    def lock_products(self, product_ids: Iterable[int]) -> Dict[int, ProductModel]:
+        """
+        Load and lock every product of an order in a single query
+
+        Rows are locked (SELECT ... FOR UPDATE) in ascending id order, so two
+        orders sharing products always acquire their locks in the same order
+        and cannot deadlock. The locks are held until the caller commits.
+
+        Args:
+            product_ids: Product IDs referenced by the order (duplicates allowed)
+
+        Returns:
+            Mapping of product id to locked ProductModel (missing ids are absent)
+        """
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+
+        stmt = (
+            select(ProductModel)
+            .where(ProductModel.id_key.in_(ids))
+            .order_by(ProductModel.id_key)
+            .with_for_update()
+        )
+        products = self._product_repository.session.scalars(stmt).all()
+        return {product.id_key: product for product in products}
+
+    def save_batch(self, order_id: int, lines: List[Dict]) -> None:
+        """
+        Insert all order details and deduct stock without committing
+
+        Products must already be locked and validated with lock_products().
+        Details are written with one bulk INSERT and stock is deducted with a
+        single UPDATE, so the caller can commit the whole order at once.
+
+        Args:
+            order_id: ID of the (flushed) order the details belong to
+            lines: Dicts with product_id, quantity and price
+        """
+        if not lines:
+            return
+
+        session = self._repository.session
+
+        session.execute(
+            insert(OrderDetailModel),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": line["product_id"],
+                    "quantity": line["quantity"],
+                    "price": line["price"],
+                }
+                for line in lines
+            ]
+        )
+
+        quantities: Dict[int, int] = {}
+        for line in lines:
+            quantities[line["product_id"]] = quantities.get(line["product_id"], 0) + line["quantity"]
+
+        session.execute(
+            update(ProductModel)
+            .where(ProductModel.id_key.in_(quantities.keys()))
+            .values(stock=ProductModel.stock - case(quantities, value=ProductModel.id_key))
+            .execution_options(synchronize_session=False)
+        )
+
+        logger.info(
+            f"Created {len(lines)} order details for order {order_id} "
+            f"and deducted stock for {len(quantities)} products"
+        )
+
+    def get_order_view(self, order_id: int) -> Optional[Tuple[OrderModel, List[Tuple[OrderDetailModel, Optional[str]]]]]:
+        """
+        Load an order with its details and product names in a single query
+
+        Args:
+            order_id: Order ID
+
+        Returns:
+            Tuple of (order, [(detail, product_name or None)]), or None if the
+            order does not exist
+        """
+        stmt = (
+            select(OrderModel, OrderDetailModel, ProductModel.name)
+            .outerjoin(OrderDetailModel, OrderDetailModel.order_id == OrderModel.id_key)
+            .outerjoin(ProductModel, ProductModel.id_key == OrderDetailModel.product_id)
+            .where(OrderModel.id_key == order_id)
+            .order_by(OrderDetailModel.id_key)
+        )
+        rows = self._repository.session.execute(stmt).all()
+        if not rows:
+            return None
+
+        order = rows[0][0]
+        details = [(detail, product_name) for _, detail, product_name in rows if detail is not None]
+        return order, details
+
+    def restore_stock(self, order_id: int) -> Tuple[int, int]:
+        """
+        Give back the stock of every line of an order without committing
+
+        The products are locked first with lock_products() (ascending id
+        order, like order creation), then quantities are summed per product
+        and applied with one set-based UPDATE ... FROM, so the cost does not
+        depend on the number of lines and concurrent cancellations or orders
+        sharing products cannot deadlock.
+
+        Args:
+            order_id: Order ID
+
+        Returns:
+            Tuple of (lines whose product was restored, total lines)
+        """
+        session = self._repository.session
+
+        line_product_ids = session.scalars(
+            select(OrderDetailModel.product_id).where(OrderDetailModel.order_id == order_id)
+        ).all()
+        total_lines = len(line_product_ids)
+
+        locked = self.lock_products(line_product_ids)
+        restorable_lines = sum(1 for product_id in line_product_ids if product_id in locked)
+        if not restorable_lines:
+            return 0, total_lines
+
+        quantities = (
+            select(
+                OrderDetailModel.product_id.label("product_id"),
+                func.sum(OrderDetailModel.quantity).label("quantity")
+            )
+            .where(OrderDetailModel.order_id == order_id)
+            .group_by(OrderDetailModel.product_id)
+            .subquery()
+        )
+        result = session.execute(
+            update(ProductModel)
+            .where(ProductModel.id_key == quantities.c.product_id)
+            .values(stock=ProductModel.stock + quantities.c.quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+        logger.info(
+            f"Restored stock for {result.rowcount} products "
+            f"({restorable_lines}/{total_lines} lines) of order {order_id}"
+        )
+        return restorable_lines, total_lines
+
     def update(self, id_key: int, schema: OrderDetailSchema) -> OrderDetailSchema:
         """
         Update an order detail with validation and atomic stock management
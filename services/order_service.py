@@ -3,7 +3,6 @@ from typing import Dict, Any
 from sqlalchemy.orm import Session
 from models.enums import DeliveryMethod, Status
 import logging
-import random
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +11,7 @@ from models.order_detail import OrderDetailModel
 from models.client import ClientModel
 from models.bill import BillModel
 from models.enums import PaymentType
+from services.bill_number_service import next_bill_number
 
 class OrderService:
     def __init__(self, db: Session):
@@ -60,7 +60,7 @@ class OrderService:
             self.db.commit()
             
             try:
-                bill_number = f"FACT-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+                bill_number = next_bill_number(self.db)
                 total_amount = float(order_data.get('total', 0.0))
                 subtotal = total_amount / 1.21  #  21% IVA
                 
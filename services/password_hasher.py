@@ -0,0 +1,182 @@
+"""
+Password Hasher Module
+
+Runs PBKDF2 password hashing on a bounded thread pool so login/register
+handlers never block the event loop. hashlib.pbkdf2_hmac releases the GIL
+while it iterates, so threads give real parallelism here.
+
+The executor admits at most WORKERS running + MAX_QUEUE waiting jobs. When
+it is saturated new jobs are rejected immediately with HashingBusyError
+(mapped to 429 by the controllers) instead of piling up latency for every
+caller.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.constants import PasswordHashConfig
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing executor is saturated"""
+
+    def __init__(self, retry_after: int = PasswordHashConfig.RETRY_AFTER):
+        super().__init__("Password hashing executor is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordHashExecutor:
+    """
+    Bounded executor for CPU-heavy password hashing
+
+    Tracks queue depth, wait time and rejections so the pool can be sized
+    from real login traffic.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PasswordHashConfig.WORKERS,
+        max_queue: int = PasswordHashConfig.MAX_QUEUE
+    ):
+        """
+        Initialize the executor (threads are started lazily)
+
+        Args:
+            max_workers: Number of hashing threads
+            max_queue: Jobs allowed to wait for a thread before rejecting
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise HashingBusyError()
+            self._pending += 1
+            self.submitted += 1
+            if self._pending > self.peak_pending:
+                self.peak_pending = self._pending
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a hashing function on the pool
+
+        Args:
+            fn: Blocking function to run
+            *args: Positional arguments for fn
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            HashingBusyError: If the executor is saturated
+        """
+        self._acquire()
+        submitted_at = time.perf_counter()
+
+        def job() -> Any:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                wait = started_at - submitted_at
+                self.wait_total += wait
+                if wait > self.wait_max:
+                    self.wait_max = wait
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.run_total += time.perf_counter() - started_at
+
+        try:
+            future = self._get_executor().submit(job)
+        except BaseException:
+            self._release()
+            raise
+        # The slot follows the job, not this coroutine: if the caller is
+        # cancelled (client disconnect) a running job keeps its thread, so
+        # the slot is freed only when the job finishes or is dropped unstarted
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            result = await asyncio.wrap_future(future)
+            with self._lock:
+                self.completed += 1
+            return result
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics
+
+        Returns:
+            Dictionary with queue depth, throughput and wait time figures
+        """
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(0, self._pending - self._running),
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait": {
+                    "avg_ms": round(self.wait_total / finished * 1000, 3) if finished else 0.0,
+                    "max_ms": round(self.wait_max * 1000, 3),
+                },
+                "avg_run_ms": round(self.run_total / finished * 1000, 3) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Global password hashing executor
+password_hasher = PasswordHashExecutor()
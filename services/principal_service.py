@@ -0,0 +1,189 @@
+"""
+Principal Service Module
+
+Resolves the authenticated client (principal) behind a JWT. Principals are
+cached per client id for a short TTL, so authenticated requests only pay a
+signature check instead of a database round-trip.
+
+Cached principals are invalidated explicitly: any committed ORM update or
+delete of a ClientModel (profile changes, deactivation, removal) drops the
+entry, and CacheService broadcasts the delete to every worker's L1.
+"""
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException, status
+from jose import jwt, JWTError
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from config.constants import CacheConfig
+from models.client import ClientModel
+from services.cache_service import cache_service
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
+ALGORITHM = "HS256"
+
+# Session.info key collecting client ids written in the current transaction
+_DIRTY_CLIENTS_KEY = "principal_cache_dirty_clients"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Authenticated client as seen by route handlers
+
+    Exposes the same attribute names as ClientModel for the fields handlers
+    use, so it can replace the ORM instance returned by get_current_user.
+    """
+    id_key: int
+    email: str
+    name: str
+    lastname: str
+    phone: Optional[str] = None
+    is_active: bool = True
+
+    @property
+    def is_admin(self) -> bool:
+        return self.id_key == 0
+
+    @classmethod
+    def from_model(cls, client: ClientModel) -> "Principal":
+        return cls(
+            id_key=client.id_key,
+            email=client.email,
+            name=client.name,
+            lastname=client.lastname,
+            phone=client.phone,
+            is_active=bool(client.is_active),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def decode_client_id(token: str) -> int:
+    """
+    Validate a JWT and extract the client id from its subject
+
+    Args:
+        token: Bearer token
+
+    Returns:
+        Client id (the 'sub' claim)
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or malformed
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired"
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    subject = payload.get("sub")
+    if subject is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: missing 'sub' field"
+        )
+
+    try:
+        return int(subject)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: 'sub' must be a number"
+        )
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of active clients keyed by client id
+
+    Uses the shared two-tier CacheService (in-process L1 in front of Redis).
+    Only active clients are cached; misses and inactive clients always go to
+    the database.
+    """
+
+    def __init__(self, ttl: int = CacheConfig.PRINCIPAL_TTL):
+        self.cache = cache_service
+        self.cache_prefix = "auth:principal"
+        self.ttl = ttl
+
+    def _key(self, client_id: int) -> str:
+        return self.cache.build_key(self.cache_prefix, id=client_id)
+
+    def get(self, client_id: int, db: Session) -> Optional[Principal]:
+        """
+        Get an active client, from cache or database
+
+        Args:
+            client_id: Client id from the token
+            db: Database session (only used on a cache miss)
+
+        Returns:
+            Principal, or None if the client does not exist or is inactive
+        """
+        cached = self.cache.get(self._key(client_id))
+        if cached is not None:
+            return Principal(**cached)
+
+        client = db.scalars(
+            select(ClientModel).where(
+                ClientModel.id_key == client_id,
+                ClientModel.is_active == True
+            )
+        ).first()
+        if client is None:
+            return None
+
+        principal = Principal.from_model(client)
+        self.cache.set(self._key(client_id), principal.to_dict(), ttl=self.ttl)
+        return principal
+
+    def invalidate(self, client_id: int) -> None:
+        """
+        Drop a cached principal on every worker
+
+        Args:
+            client_id: Client id
+        """
+        self.cache.delete(self._key(client_id))
+        logger.debug(f"Principal cache invalidated for client {client_id}")
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(ClientModel, "after_update")
+@event.listens_for(ClientModel, "after_delete")
+def _track_client_write(mapper, connection, target) -> None:
+    """Remember written clients; the cache is only touched once the commit succeeds"""
+    session = Session.object_session(target)
+    if session is not None and target.id_key is not None:
+        session.info.setdefault(_DIRTY_CLIENTS_KEY, set()).add(target.id_key)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_clients(session: Session) -> None:
+    dirty: Set[int] = session.info.pop(_DIRTY_CLIENTS_KEY, set())
+    for client_id in dirty:
+        principal_cache.invalidate(client_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_clients(session: Session) -> None:
+    session.info.pop(_DIRTY_CLIENTS_KEY, None)
@@ -0,0 +1,387 @@
+"""
+Product Search Service
+
+Full-text search for /products/search with two backends:
+
+- PostgreSQL: a generated `search_vector` tsvector column (name weighted
+  above description) with a GIN index. PostgreSQL recomputes the column on
+  every INSERT/UPDATE, so it never drifts from the product row. Results are
+  ranked with ts_rank_cd and every term matches as a prefix ("zapa" finds
+  "zapatilla").
+- Other databases (SQLite, test runs): an in-process inverted index with
+  the same tokenization, prefix matching and name-over-description ranking.
+  It is built lazily from the products table and updated by the product
+  write paths through index_product()/remove_product().
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from repositories.product_repository import PRODUCT_COLUMNS
+from repositories.review_repository import PRODUCT_RATING_COLUMNS_SQL, PRODUCT_RATING_JOIN_SQL
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+# 'simple' keeps words unstemmed, so prefix queries behave predictably for
+# Spanish and English product names alike
+TS_CONFIG = "simple"
+
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+SEARCH_SCHEMA_DDL = (
+    f"""
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase, accent-free search tokens
+
+    Args:
+        value: Text to tokenize
+
+    Returns:
+        List of tokens (may contain duplicates)
+    """
+    if not value:
+        return []
+    normalized = unicodedata.normalize("NFKD", value.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(normalized)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Build a prefix-matching to_tsquery() expression from user input
+
+    Only \\w+ tokens are kept, so the result never contains tsquery operators
+    supplied by the user.
+
+    Args:
+        query: Raw search string
+
+    Returns:
+        Expression like "zapa:* & roja:*", or None if there are no tokens
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def ensure_search_schema(bind) -> bool:
+    """
+    Create the search_vector column and GIN index if they are missing
+
+    Tables are created with create_all() at startup, which never alters
+    existing tables, so the column is added here idempotently as well as in
+    the Alembic migration.
+
+    Args:
+        bind: Engine or connection
+
+    Returns:
+        True if the schema is in place (or not needed for this database)
+    """
+    if bind.dialect.name != "postgresql":
+        return True
+
+    try:
+        with bind.begin() as conn:
+            for statement in SEARCH_SCHEMA_DDL:
+                conn.execute(text(statement))
+        return True
+    except Exception as e:
+        logger.error(f"Could not create product search schema: {e}")
+        return False
+
+
+class InvertedIndex:
+    """
+    Thread-safe in-process inverted index over product name/description
+
+    Postings map token -> {product_id: weight}. A sorted token list allows
+    prefix lookups with bisect instead of scanning the whole vocabulary.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_tokens: Dict[int, Set[str]] = {}
+        self._vocabulary: List[str] = []
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def add(self, product_id: int, name: Optional[str], description: Optional[str]) -> None:
+        """
+        Index (or re-index) a product
+
+        Args:
+            product_id: Product ID
+            name: Product name
+            description: Product description
+        """
+        weights: Dict[str, float] = defaultdict(float)
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+
+        with self._lock:
+            self._remove_locked(product_id)
+            for token, weight in weights.items():
+                if token not in self._postings:
+                    bisect.insort(self._vocabulary, token)
+                self._postings[token][product_id] = weight
+            self._doc_tokens[product_id] = set(weights)
+
+    def remove(self, product_id: int) -> None:
+        """
+        Remove a product from the index
+
+        Args:
+            product_id: Product ID
+        """
+        with self._lock:
+            self._remove_locked(product_id)
+
+    def _remove_locked(self, product_id: int) -> None:
+        for token in self._doc_tokens.pop(product_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+    def clear(self) -> None:
+        """Drop every indexed product"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._vocabulary.clear()
+            self.loaded = False
+
+    def search(self, query: str) -> Dict[int, float]:
+        """
+        Score products matching every query term as a prefix
+
+        Args:
+            query: Raw search string
+
+        Returns:
+            Mapping of product_id to score (higher is better)
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        scores: Optional[Dict[int, float]] = None
+        with self._lock:
+            for term in terms:
+                term_scores: Dict[int, float] = defaultdict(float)
+                position = bisect.bisect_left(self._vocabulary, term)
+                while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+                    token = self._vocabulary[position]
+                    # Exact word matches rank above prefix matches
+                    boost = 1.0 if token == term else 0.5
+                    for product_id, weight in self._postings[token].items():
+                        term_scores[product_id] += weight * boost
+                    position += 1
+
+                if scores is None:
+                    scores = dict(term_scores)
+                else:
+                    scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+
+                if not scores:
+                    return {}
+
+        return scores or {}
+
+
+class ProductSearchService:
+    """
+    Product full-text search with PostgreSQL and in-process backends
+
+    The backend is chosen per call from the session's dialect, so the same
+    instance serves the app (PostgreSQL) and SQLite-based runs.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._load_lock = threading.Lock()
+
+    def search(self, db: Session, query: str, skip: int = 0, limit: int = 12) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Search in-stock products, best matches first
+
+        Args:
+            db: Database session
+            query: Raw search string (empty lists products by name)
+            skip: Number of results to skip
+            limit: Maximum number of results
+
+        Returns:
+            Tuple of (product dicts, total number of matches)
+        """
+        if not tokenize(query):
+            return self._list_by_name(db, skip, limit)
+
+        if db.get_bind().dialect.name == "postgresql":
+            return self._search_postgres(db, query, skip, limit)
+        return self._search_index(db, query, skip, limit)
+
+    def index_product(self, product_id: int, name: Optional[str], description: Optional[str]) -> None:
+        """
+        Keep the in-process index in sync after a product insert/update
+
+        PostgreSQL maintains search_vector itself, so this only matters for
+        the fallback backend (and is a cheap no-op until it has been loaded).
+
+        Args:
+            product_id: Product ID
+            name: Product name
+            description: Product description
+        """
+        if self.index.loaded:
+            self.index.add(product_id, name, description)
+
+    def remove_product(self, product_id: int) -> None:
+        """
+        Drop a deleted product from the in-process index
+
+        Args:
+            product_id: Product ID
+        """
+        if self.index.loaded:
+            self.index.remove(product_id)
+
+    def _list_by_name(self, db: Session, skip: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        rows = db.execute(
+            text(f"""
+                SELECT {PRODUCT_COLUMNS}, {PRODUCT_RATING_COLUMNS_SQL}
+                FROM products {PRODUCT_RATING_JOIN_SQL}
+                WHERE stock > 0
+                ORDER BY name, id_key
+                LIMIT :limit OFFSET :skip
+            """),
+            {"skip": skip, "limit": limit}
+        ).mappings().all()
+        total = db.execute(text("SELECT COUNT(*) FROM products WHERE stock > 0")).scalar()
+        return [self._to_dict(row) for row in rows], total
+
+    def _search_postgres(self, db: Session, query: str, skip: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        tsquery = build_tsquery(query)
+        params = {"tsquery": tsquery, "skip": skip, "limit": limit}
+
+        # count(*) OVER () returns the total with the page: one GIN bitmap scan
+        rows = db.execute(
+            text(f"""
+                SELECT {PRODUCT_COLUMNS}, {PRODUCT_RATING_COLUMNS_SQL},
+                       ts_rank_cd(search_vector, q) AS rank,
+                       count(*) OVER () AS total_count
+                FROM products {PRODUCT_RATING_JOIN_SQL}
+                CROSS JOIN to_tsquery('{TS_CONFIG}', :tsquery) AS q
+                WHERE search_vector @@ q
+                  AND stock > 0
+                ORDER BY rank DESC, id_key
+                LIMIT :limit OFFSET :skip
+            """),
+            params
+        ).mappings().all()
+
+        if rows:
+            total = rows[0]["total_count"]
+        elif skip > 0:
+            # Page past the end: the window count is not available
+            total = db.execute(
+                text(f"""
+                    SELECT COUNT(*) FROM products
+                    WHERE search_vector @@ to_tsquery('{TS_CONFIG}', :tsquery)
+                      AND stock > 0
+                """),
+                {"tsquery": tsquery}
+            ).scalar()
+        else:
+            total = 0
+
+        return [self._to_dict(row) for row in rows], total
+
+    def _search_index(self, db: Session, query: str, skip: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        self._ensure_loaded(db)
+
+        scores = self.index.search(query)
+        if not scores:
+            return [], 0
+
+        # Stock changes with every order, so it is filtered in the database
+        in_stock = db.execute(
+            text("SELECT id_key FROM products WHERE stock > 0 AND id_key IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(scores)}
+        ).scalars().all()
+
+        ranked = sorted(in_stock, key=lambda pid: (-scores[pid], pid))
+        page_ids = ranked[skip:skip + limit]
+        if not page_ids:
+            return [], len(ranked)
+
+        rows = db.execute(
+            text(
+                f"SELECT {PRODUCT_COLUMNS}, {PRODUCT_RATING_COLUMNS_SQL} "
+                f"FROM products {PRODUCT_RATING_JOIN_SQL} WHERE id_key IN :ids"
+            ).bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": page_ids}
+        ).mappings().all()
+        by_id = {row["id_key"]: row for row in rows}
+
+        products = [self._to_dict(by_id[pid]) for pid in page_ids if pid in by_id]
+        return products, len(ranked)
+
+    def _ensure_loaded(self, db: Session) -> None:
+        """Build the in-process index from the products table on first use"""
+        if self.index.loaded:
+            return
+
+        with self._load_lock:
+            if self.index.loaded:
+                return
+            rows = db.execute(text("SELECT id_key, name, description FROM products")).all()
+            for product_id, name, description in rows:
+                self.index.add(product_id, name, description)
+            self.index.loaded = True
+            logger.info(f"Product search index built with {len(rows)} products")
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        product = {key: row[key] for key in row.keys() if key not in ("rank", "total_count")}
+        if product.get("price") is not None:
+            product["price"] = float(product["price"])
+        return product
+
+
+# Global search service instance
+product_search_service = ProductSearchService()
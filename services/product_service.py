@@ -1,12 +1,17 @@
 """Product service with Redis caching integration and sanitized logging."""
 import logging
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from models.product import ProductModel
 from schemas.product_schema import ProductSchema, ProductCreateSchema, ProductUpdateSchema 
+from config.constants import CacheConfig
+from config.database import SessionLocal
 from repositories.product_repository import ProductRepository
 from services.base_service_impl import BaseServiceImpl
 from services.cache_service import cache_service
+from services.product_search_service import product_search_service
+from services.http_cache import PRODUCTS_TAG
+from utils.pagination import COUNT_ESTIMATED, COUNT_EXACT, encode_cursor
 from utils.logging_utils import get_sanitized_logger
 
 logger = get_sanitized_logger(__name__)
@@ -24,6 +29,11 @@ class ProductService(BaseServiceImpl):
         )
         self.cache = cache_service
         self.cache_prefix = "products"
+        # All paginated lists share one tag so a write invalidates them in O(1)
+        self.list_tag = f"{self.cache_prefix}:list"
+        # Catalog reads also depend on stock (orders) and ratings (reviews),
+        # whose write paths bump PRODUCTS_TAG
+        self.catalog_tags = [self.list_tag, PRODUCTS_TAG]
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ProductSchema]: 
         """
@@ -37,21 +47,19 @@ class ProductService(BaseServiceImpl):
             limit=limit
         )
 
-        # Try to get from cache
-        cached_products = self.cache.get(cache_key)
-        if cached_products is not None:
-            logger.debug(f"Cache HIT: {cache_key}")
-            # Convert dict list back to ProductSchema list
-            return [ProductSchema(**p) for p in cached_products]
-
-        # Cache miss - get from database
-        logger.debug(f"Cache MISS: {cache_key}")
-        products = super().get_all(skip, limit)
-
-        products_dict = [p.model_dump() for p in products]
-        self.cache.set(cache_key, products_dict)
+        # get_or_set snapshots the tag generation before querying, so a write
+        # landing during the query leaves the stored page stale
+        products = self.cache.get_or_set(
+            cache_key,
+            self._loader(lambda repository: [
+                p.model_dump() for p in repository.find_all(skip=skip, limit=limit)
+            ]),
+            ttl=CacheConfig.PRODUCT_LIST_TTL,
+            tags=[self.list_tag]
+        )
 
-        return products
+        # Convert dict list back to ProductSchema list
+        return [ProductSchema(**p) for p in products]
 
     def get_one(self, id_key: int) -> ProductSchema:  
         """
@@ -65,20 +73,157 @@ class ProductService(BaseServiceImpl):
             logger.debug(f"Cache HIT: {cache_key}")
             return ProductSchema(**cached_product)
 
-        # Get from database
+        # Get from database (stock changes with orders: tag with the catalog)
         logger.debug(f"Cache MISS: {cache_key}")
+        generations = self.cache.tag_generations(self.catalog_tags)
         product = super().get_one(id_key)
 
         # Cache the result
-        self.cache.set(cache_key, product.model_dump())
+        if generations is not None:
+            self.cache.set(cache_key, product.model_dump(), tags=self.catalog_tags, generations=generations)
 
         return product
 
+    def get_many(self, ids: List[int]) -> List[ProductSchema]:
+        """
+        Get several products by ID with caching
+
+        Cached products are fetched in one round-trip (MGET); only the
+        misses are loaded from the database, with a single IN query, and
+        written back in one pipeline under the catalog tags (orders change
+        stock). Ids without a product are skipped.
+        """
+        ids = list(dict.fromkeys(ids))
+        keys = {id_key: self.cache.build_key(self.cache_prefix, "id", id=id_key) for id_key in ids}
+
+        cached = self.cache.get_many(keys.values())
+        products: Dict[int, ProductSchema] = {
+            id_key: ProductSchema(**cached[key]) for id_key, key in keys.items() if key in cached
+        }
+
+        missing = [id_key for id_key in ids if id_key not in products]
+        logger.debug(f"Products cache: {len(products)} hits, {len(missing)} misses")
+        if missing:
+            generations = self.cache.tag_generations(self.catalog_tags)
+            loaded = self.repository.find_many(missing)
+            products.update((product.id_key, product) for product in loaded)
+            if loaded and generations is not None:
+                self.cache.set_many(
+                    {keys[product.id_key]: product.model_dump() for product in loaded},
+                    tags=self.catalog_tags,
+                    generations=generations
+                )
+
+        return [products[id_key] for id_key in ids if id_key in products]
+
+    def get_catalog_page(
+        self,
+        skip: int = 0,
+        limit: int = 12,
+        after_id: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a page of in-stock products (with ratings) with caching
+
+        Returns:
+            Tuple of (product dicts, next_cursor or None on the last page)
+        """
+        cache_key = self.cache.build_key(
+            self.cache_prefix, "catalog", skip=skip, limit=limit, after=after_id
+        )
+
+        def load(repository: ProductRepository) -> Dict[str, Any]:
+            # One extra row tells whether there is another page
+            products = repository.find_catalog_page(limit + 1, skip, after_id)
+            next_cursor = None
+            if len(products) > limit:
+                products = products[:limit]
+                next_cursor = encode_cursor(products[-1]["id_key"])
+            return {"products": products, "next_cursor": next_cursor}
+
+        page = self.cache.get_or_set(
+            cache_key, self._loader(load), ttl=CacheConfig.PRODUCT_LIST_TTL, tags=self.catalog_tags
+        )
+        return page["products"], page["next_cursor"]
+
+    def count_catalog(self, count: str = COUNT_EXACT) -> Optional[int]:
+        """
+        Get the number of in-stock products with caching
+
+        Args:
+            count: "exact" (COUNT), "estimated" (planner estimate of the
+                same in-stock filter, exact as a fallback) or "none"
+
+        Returns:
+            Total, or None when count is "none"
+        """
+        if count not in (COUNT_EXACT, COUNT_ESTIMATED):
+            return None
+
+        cache_key = self.cache.build_key(self.cache_prefix, "count", mode=count)
+
+        def load(repository: ProductRepository) -> int:
+            total = repository.estimate_in_stock() if count == COUNT_ESTIMATED else None
+            return total if total is not None else repository.count_in_stock()
+
+        return self.cache.get_or_set(
+            cache_key, self._loader(load), ttl=CacheConfig.PRODUCT_LIST_TTL, tags=self.catalog_tags
+        )
+
+    def get_catalog_item(self, id_key: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a product (with ratings) with caching
+
+        Unknown ids are cached too, until the next product write.
+
+        Returns:
+            Product dict, or None if it does not exist
+        """
+        cache_key = self.cache.build_key(self.cache_prefix, "catalog", id=id_key)
+        return self.cache.get_or_set(
+            cache_key,
+            self._loader(lambda repository: repository.find_catalog_item(id_key)),
+            ttl=CacheConfig.PRODUCT_ITEM_TTL,
+            tags=self.catalog_tags
+        )
+
+    def search(self, query: str, skip: int = 0, limit: int = 12) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Full-text search of in-stock products with caching
+
+        Returns:
+            Tuple of (product dicts, total number of matches)
+        """
+        cache_key = self.cache.build_key(self.cache_prefix, "search", q=query, skip=skip, limit=limit)
+
+        def load(repository: ProductRepository) -> Dict[str, Any]:
+            products, total = product_search_service.search(repository.session, query, skip, limit)
+            return {"products": products, "total": total}
+
+        result = self.cache.get_or_set(
+            cache_key, self._loader(load), ttl=CacheConfig.PRODUCT_LIST_TTL, tags=self.catalog_tags
+        )
+        return result["products"], result["total"]
+
+    @staticmethod
+    def _loader(read: Callable[[ProductRepository], Any]) -> Callable[[], Any]:
+        """
+        get_or_set callback running `read` on its own session
+
+        Stale entries are refreshed in the background, after the request
+        (and its session) may be gone, so loaders never use self.repository.
+        """
+        def load() -> Any:
+            with SessionLocal() as db:
+                return read(ProductRepository(db))
+        return load
+
     def save(self, schema: ProductCreateSchema) -> ProductSchema: 
         """
         Create new product and invalidate list cache
         """
         product = super().save(schema)
+        product_search_service.index_product(product.id_key, product.name, product.description)
 
         # Invalidate list cache (all paginated lists)
         self._invalidate_list_cache()
@@ -89,13 +234,11 @@ class ProductService(BaseServiceImpl):
         """
         Update product with transactional cache invalidation
         """
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
-
         try:
             product = super().update(id_key, schema)
+            product_search_service.index_product(id_key, product.name, product.description)
 
-            self.cache.delete(cache_key)
-            self._invalidate_list_cache()
+            self.invalidate_product(id_key)
 
             logger.info(f"Product {id_key} updated and cache invalidated successfully")
             return product
@@ -126,15 +269,21 @@ class ProductService(BaseServiceImpl):
 
         logger.info(f"Deleting product {id_key} (no sales history)")
         super().delete(id_key)
+        product_search_service.remove_product(id_key)
 
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
-        self.cache.delete(cache_key)
+        self.invalidate_product(id_key)
 
+    def invalidate_product(self, id_key: int) -> None:
+        """
+        Drop every cached read of a product after a write
+
+        Removes the product's own entry and invalidates all lists, searches,
+        counts and catalog entries (plus the HTTP validators) by tag.
+        """
+        self.cache.delete(self.cache.build_key(self.cache_prefix, "id", id=id_key))
         self._invalidate_list_cache()
 
     def _invalidate_list_cache(self):
-        """Invalidate all product list caches"""
-        pattern = f"{self.cache_prefix}:list:*"
-        deleted_count = self.cache.delete_pattern(pattern)
-        if deleted_count > 0:
-            logger.info(f"Invalidated {deleted_count} product list cache entries")
\ No newline at end of file
+        """Invalidate all product list caches and the HTTP validators of catalog reads"""
+        if self.cache.invalidate_tags(self.list_tag, PRODUCTS_TAG):
+            logger.info(f"Invalidated product list cache (tag '{self.list_tag}')")
\ No newline at end of file
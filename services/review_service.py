@@ -7,10 +7,11 @@ from models.product import ProductModel
 from models.order import OrderModel
 from models.order_detail import OrderDetailModel  
 from models.enums import Status
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from datetime import datetime
 from sqlalchemy.orm import Session
+from services.http_cache import PRODUCTS_TAG, conditional_cache, product_reviews_tag
 
 class ReviewService:
     def __init__(self, 
@@ -92,7 +93,9 @@ class ReviewService:
                 updated_at=datetime.now()
             )
             
-            return self.review_repo.create(review)
+            created = self.review_repo.create(review)
+            self._invalidate_http_cache(review_data.product_id)
+            return created
             
         except HTTPException:
             raise
@@ -112,7 +115,11 @@ class ReviewService:
     def get_all_reviews(self, skip: int = 0, limit: int = 100) -> List[ReviewModel]:
         """Obtener todas las reseñas."""
         from models.review import ReviewModel
-        return self.db.query(ReviewModel).offset(skip).limit(limit).all()
+        return self.db.query(ReviewModel).order_by(ReviewModel.id_key).offset(skip).limit(limit).all()
+
+    def get_reviews_page(self, cursor: Optional[str], limit: int, product_id: Optional[int] = None) -> Tuple[List[ReviewModel], Optional[str]]:
+        """Obtener una página de reseñas por cursor (keyset) y el cursor siguiente."""
+        return self.review_repo.get_page(cursor, limit, product_id)
     
     def get_product_reviews(self, product_id: int) -> List[ReviewModel]:
         """Obtener todas las reseñas de un producto (público)."""
@@ -143,11 +150,13 @@ class ReviewService:
                 detail="No tienes permiso para actualizar esta review"
             )
         
-        return self.review_repo.update(
+        updated = self.review_repo.update(
             review_id=review_id,
             rating=update_data.rating,
             comment=update_data.comment
         )
+        self._invalidate_http_cache(review.product_id)
+        return updated
     
     def delete_review(self, review_id: int, client_id: int) -> bool:
         """Eliminar una reseña (solo el cliente que la creó o admin)."""
@@ -166,34 +175,39 @@ class ReviewService:
                 detail="No tienes permiso para eliminar esta review"
             )
         
-        return self.review_repo.delete(review_id)
+        product_id = review.product_id
+        deleted = self.review_repo.delete(review_id)
+        self._invalidate_http_cache(product_id)
+        return deleted
     
     def get_product_rating_summary(self, product_id: int) -> dict:
-        """Obtener resumen de calificaciones de un producto (público)."""
-        avg_rating = self.review_repo.get_product_average_rating(product_id)
-        review_count = self.review_repo.get_product_review_count(product_id)
-        
+        """Obtener resumen de calificaciones de un producto (público).
+
+        Lee el agregado precalculado (una fila por producto) en lugar de
+        recorrer todas las reseñas.
+        """
+        aggregate = self.review_repo.get_rating_aggregate(product_id)
+        if aggregate is None or not aggregate.review_count:
+            return {
+                "average_rating": 0,
+                "review_count": 0,
+                "rating_distribution": {str(i): 0 for i in range(1, 6)}
+            }
+
         return {
-            "average_rating": avg_rating or 0,
-            "review_count": review_count or 0,
-            "rating_distribution": self._get_rating_distribution(product_id)
+            "average_rating": aggregate.average_rating,
+            "review_count": aggregate.review_count,
+            "rating_distribution": aggregate.distribution
         }
     
-    def _get_rating_distribution(self, product_id: int) -> dict:
-        """Obtener distribución de calificaciones (privado)."""
-        distribution = {}
-        reviews = self.review_repo.get_by_product(product_id)
-        
-        for i in range(1, 6):
-            count = sum(1 for review in reviews if review.rating == i)
-            distribution[str(i)] = count
-        
-        return distribution
-    
     def get_reviews_by_order_and_client(self, order_id: int, client_id: int) -> List[ReviewModel]:
         """Obtener reseñas de una orden específica para un cliente."""
         from models.review import ReviewModel
         return self.db.query(ReviewModel).filter(
             ReviewModel.order_id == order_id,
             ReviewModel.client_id == client_id
-        ).all()
\ No newline at end of file
+        ).all()
+
+    def _invalidate_http_cache(self, product_id: int) -> None:
+        """Las reseñas cambian el listado del producto y su calificación en el catálogo."""
+        conditional_cache.invalidate(product_reviews_tag(product_id), PRODUCTS_TAG)
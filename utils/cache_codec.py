@@ -0,0 +1,208 @@
+"""
+Cache Codec Utilities
+
+Binary encoding of CacheService entries: a serializer (orjson or msgpack)
+plus optional compression (zlib, or lz4 when installed) for payloads above
+a size threshold.
+
+Every encoded entry starts with a 4-byte header:
+
+    MAGIC (0xCA) | format version | serializer id | compression id
+
+so the serializer, compression or the layout itself can change while old
+entries are still in Redis. Entries without the header (plain JSON text
+written before this codec existed) are decoded as JSON, and entries with an
+unknown version raise CacheCodecError, which CacheService treats as a miss.
+"""
+import datetime
+import decimal
+import enum
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from config.constants import CacheConfig
+from utils import json_codec
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+MAGIC = 0xCA
+FORMAT_VERSION = 1
+HEADER_SIZE = 4
+
+
+class CacheCodecError(Exception):
+    """Raised when a cached payload cannot be decoded by this version"""
+    pass
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Same representations orjson produces, so both serializers round-trip alike
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+# id -> (name, dumps, loads)
+SERIALIZERS: Dict[int, Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    1: ("orjson", json_codec.dumps, json_codec.loads),
+}
+
+# id -> (name, compress(data, level), decompress)
+COMPRESSORS: Dict[int, Tuple[str, Optional[Callable[[bytes, int], bytes]], Optional[Callable[[bytes], bytes]]]] = {
+    0: ("none", None, None),
+    1: ("zlib", zlib.compress, zlib.decompress),
+}
+
+try:
+    import msgpack
+
+    SERIALIZERS[2] = (
+        "msgpack",
+        lambda value: msgpack.packb(value, default=_msgpack_default, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+    )
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+
+    COMPRESSORS[2] = (
+        "lz4",
+        lambda data, level: lz4.frame.compress(data, compression_level=max(0, level)),
+        lz4.frame.decompress,
+    )
+except ImportError:
+    pass
+
+
+def _find(registry: Dict[int, tuple], name: str) -> Optional[int]:
+    return next((key for key, entry in registry.items() if entry[0] == name), None)
+
+
+class CacheCodec:
+    """
+    Encoder/decoder for cache entries
+
+    Decoding does not depend on the configured serializer and compression:
+    the header says how each entry was written, so workers running with
+    different settings (e.g. during a rollout) still read each other's entries.
+    """
+
+    def __init__(
+        self,
+        serializer: str = CacheConfig.CODEC,
+        compression: str = CacheConfig.COMPRESSION,
+        threshold: int = CacheConfig.COMPRESS_THRESHOLD,
+        level: int = CacheConfig.COMPRESSION_LEVEL
+    ):
+        """
+        Initialize the codec
+
+        Args:
+            serializer: "orjson" or "msgpack"
+            compression: "zlib", "lz4" or "none"
+            threshold: Compress payloads of at least this many bytes
+            level: Compression level
+        """
+        self.serializer_id = _find(SERIALIZERS, serializer)
+        if self.serializer_id is None:
+            logger.warning(f"Cache serializer '{serializer}' not available, using orjson")
+            self.serializer_id = _find(SERIALIZERS, "orjson")
+
+        self.compression_id = _find(COMPRESSORS, compression)
+        if self.compression_id is None:
+            logger.warning(f"Cache compression '{compression}' not available, using zlib")
+            self.compression_id = _find(COMPRESSORS, "zlib")
+
+        self.threshold = threshold
+        self.level = level
+
+    @property
+    def name(self) -> str:
+        """Serializer and compression in use, e.g. "orjson+zlib" """
+        return f"{SERIALIZERS[self.serializer_id][0]}+{COMPRESSORS[self.compression_id][0]}"
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a value with header, compressing it above the threshold
+
+        Args:
+            value: Value to cache
+
+        Returns:
+            Encoded bytes
+
+        Raises:
+            TypeError: If the value contains an unsupported type
+        """
+        payload = SERIALIZERS[self.serializer_id][1](value)
+
+        compression_id = 0
+        compress = COMPRESSORS[self.compression_id][1]
+        if compress is not None and len(payload) >= self.threshold:
+            compressed = compress(payload, self.level)
+            # Already dense payloads may grow: keep whichever is smaller
+            if len(compressed) < len(payload):
+                payload, compression_id = compressed, self.compression_id
+
+        return bytes((MAGIC, FORMAT_VERSION, self.serializer_id, compression_id)) + payload
+
+    def decode(self, data: Any) -> Any:
+        """
+        Decode an encoded entry (or a legacy JSON / plain text value)
+
+        Args:
+            data: Bytes read from Redis
+
+        Returns:
+            Decoded value
+
+        Raises:
+            CacheCodecError: If the header names an unknown version,
+                serializer or compression
+        """
+        if isinstance(data, str):
+            data = data.encode()
+
+        if len(data) < HEADER_SIZE or data[0] != MAGIC:
+            return self._decode_legacy(data)
+
+        version, serializer_id, compression_id = data[1], data[2], data[3]
+        if version != FORMAT_VERSION or serializer_id not in SERIALIZERS or compression_id not in COMPRESSORS:
+            raise CacheCodecError(
+                f"Unsupported cache entry format (version {version}, "
+                f"serializer {serializer_id}, compression {compression_id})"
+            )
+
+        payload = data[HEADER_SIZE:]
+        decompress = COMPRESSORS[compression_id][2]
+        if decompress is not None:
+            payload = decompress(payload)
+        return SERIALIZERS[serializer_id][2](payload)
+
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Any:
+        try:
+            return json_codec.loads(data)
+        except json_codec.JSONDecodeError:
+            # Raw string values were stored as-is
+            return data.decode("utf-8", errors="replace")
+
+
+# Codec configured through CacheConfig (CACHE_CODEC / CACHE_COMPRESSION)
+cache_codec = CacheCodec()
@@ -0,0 +1,76 @@
+"""
+JSON Codec Utilities
+
+orjson-based encoding shared by HTTP responses and CacheService.
+
+orjson serializes datetime, date, UUID, Enum and dataclasses natively, so
+handlers can return database rows without converting each field first.
+Decimal values (NUMERIC columns) and pydantic models go through the default
+hook below.
+"""
+import decimal
+from typing import Any, Union
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+JSONDecodeError = orjson.JSONDecodeError
+
+# Non-string dict keys (e.g. rating distributions keyed by int) become strings
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        JSON bytes
+
+    Raises:
+        TypeError: If the value contains an unsupported type
+    """
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decode JSON
+
+    Args:
+        data: JSON bytes or string
+
+    Returns:
+        Decoded value
+
+    Raises:
+        JSONDecodeError: If the data is not valid JSON
+    """
+    return orjson.loads(data)
+
+
+class AppJSONResponse(ORJSONResponse):
+    """
+    Default response class of the app
+
+    Encodes with dumps(), so Decimal and pydantic values are accepted as
+    well. Handlers that build their own response can skip jsonable_encoder
+    entirely by returning this class directly.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
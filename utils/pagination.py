@@ -0,0 +1,223 @@
+"""
+Keyset Pagination Utilities
+
+Cursor-based pagination over (sort_key, id_key). Instead of OFFSET, each
+page starts right after the last row of the previous one, so every page is a
+single index range scan regardless of how deep the client has paged.
+
+Cursors are opaque base64url tokens; clients must pass back the
+`next_cursor` they received and never build one themselves.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_NONE = "none"
+
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Build an opaque cursor from the sort key values of the last row
+
+    Args:
+        *values: Sort key values, ending with id_key
+
+    Returns:
+        URL-safe cursor token
+    """
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor token
+        size: Expected number of sort key values
+
+    Returns:
+        Tuple of sort key values
+
+    Raises:
+        InvalidCursorError: If the token is malformed or has the wrong shape
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor shape")
+        return tuple(_decode_value(v) for v in values)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_condition(
+    columns: Sequence[ColumnElement],
+    values: Sequence[Any],
+    descending: bool = False
+) -> ColumnElement:
+    """
+    Row-value comparison that selects rows strictly after a cursor
+
+    Args:
+        columns: Sort columns, ending with the id column
+        values: Cursor values for those columns
+        descending: Whether the listing is sorted in descending order
+
+    Returns:
+        SQL expression like (date, id_key) < (:date, :id_key)
+    """
+    left = tuple_(*columns)
+    right = tuple_(*values)
+    return left < right if descending else left > right
+
+
+def paginate(
+    stmt: Select,
+    columns: Sequence[ColumnElement],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False
+) -> Select:
+    """
+    Apply keyset pagination to a SELECT
+
+    Fetches limit + 1 rows so page_results() can tell whether a next page
+    exists without a COUNT.
+
+    Args:
+        stmt: Base statement (filters already applied)
+        columns: Sort columns, ending with the id column
+        cursor: Cursor from the previous page (None for the first page)
+        limit: Page size
+        descending: Sort in descending order
+
+    Returns:
+        Statement with keyset filter, ORDER BY and LIMIT applied
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    if cursor:
+        stmt = stmt.where(keyset_condition(columns, decode_cursor(cursor, len(columns)), descending))
+
+    order_by = [column.desc() for column in columns] if descending else list(columns)
+    return stmt.order_by(*order_by).limit(limit + 1)
+
+
+def page_results(rows: Sequence[Any], limit: int, *attributes: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the extra row fetched by paginate() and build the next cursor
+
+    Args:
+        rows: Rows returned by the paginated statement
+        limit: Page size
+        *attributes: Attribute names of the sort columns, ending with id_key
+
+    Returns:
+        Tuple of (page rows, next_cursor or None on the last page)
+    """
+    if limit < 1:
+        return [], None
+
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(*(getattr(last, attr) for attr in attributes))
+
+
+def estimated_count_query(table_name: str):
+    """
+    Planner row estimate for a table (PostgreSQL only)
+
+    Reads pg_class.reltuples, which is kept up to date by VACUUM/ANALYZE, so
+    the total is approximate but costs a single catalog lookup. Returns -1
+    for tables that were never analyzed.
+
+    Args:
+        table_name: Table name
+
+    Returns:
+        Executable text clause yielding one integer
+    """
+    return text(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+    ).bindparams(table_name=table_name)
+
+
+def estimated_count(session, table_name: str, stmt: Optional[Select] = None) -> Optional[int]:
+    """
+    Approximate row count of a table (or of a filtered query) from planner statistics
+
+    A listing that filters rows (e.g. only in-stock products) must pass its
+    filtered query as `stmt`: the total is then the planner's row estimate
+    for that query (EXPLAIN, which plans without executing it) instead of
+    the whole table's pg_class.reltuples, so it counts the same rows the
+    listing pages over.
+
+    Works with a sync Session; from an AsyncSession use
+    `await db.run_sync(estimated_count, table_name, stmt)`.
+
+    Args:
+        session: SQLAlchemy Session
+        table_name: Table name
+        stmt: Filtered SELECT the total must match (default: every row)
+
+    Returns:
+        Estimated row count, or None when no estimate is available
+        (non-PostgreSQL database or table never analyzed)
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    # Without statistics the planner's estimates are guesses too
+    estimate = session.execute(estimated_count_query(table_name)).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    if stmt is None:
+        return int(estimate)
+
+    sql = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (TypeError, KeyError, IndexError, ValueError):
+        return None